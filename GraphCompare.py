@@ -3,103 +3,96 @@
 import pandas as pd
 import matplotlib.pyplot as plt
 
-# ================================
-# Load datasets
-# ================================
-races = pd.read_csv("data/races.csv", on_bad_lines="skip")
-qualifying = pd.read_csv("data/qualifying.csv")
-drivers = pd.read_csv("data/drivers.csv")
-constructors = pd.read_csv("data/constructors.csv")
-circuits = pd.read_csv("data/circuits.csv")
-
-# ================================
-# Merge datasets for analysis
-# ================================
-qualifying = qualifying.merge(races, on="raceId", how="left", suffixes=("", "_race"))
-qualifying = qualifying.merge(drivers, on="driverId", how="left", suffixes=("", "_driver"))
-qualifying = qualifying.merge(constructors, on="constructorId", how="left", suffixes=("", "_constructor"))
-qualifying = qualifying.merge(circuits, on="circuitId", how="left", suffixes=("", "_circuit"))
-
-# ================================
-# User inputs
-# ================================
-user_circuit = input("Enter circuit name (e.g., 'Silverstone'): ").strip()
-user_year = int(input("Enter year (e.g., 2023): ").strip())
-user_drivers = input("Enter driver surnames separated by commas (e.g., 'Verstappen,Leclerc,Hamilton'): ").split(",")
-user_drivers = [d.strip().capitalize() for d in user_drivers]
-
-# ================================
-# Filter data
-# ================================
-circuit_data = qualifying[
-    (qualifying["name_circuit"].str.contains(user_circuit, case=False, na=False)) &
-    (qualifying["year"] == user_year) &
-    (qualifying["surname"].isin(user_drivers))
-]
-
-if circuit_data.empty:
-    print(f"No qualifying data found for {user_circuit} in {user_year} for drivers {user_drivers}.")
-    exit()
-
-# ================================
-# Time conversion helpers
-# ================================
-def time_to_seconds(t):
-    if pd.isna(t):
-        return None
-    parts = t.split(":")
-    if len(parts) == 2:
-        mins, rest = parts
-        return float(mins) * 60 + float(rest)
-    return None
-
-def seconds_to_time(s):
-    if s is None: 
-        return None
-    mins = int(s // 60)
-    secs = s % 60
-    return f"{mins}:{secs:06.3f}"
-
-# Convert Q1/Q2/Q3 into seconds
-for q in ["q1", "q2", "q3"]:
-    circuit_data[q] = circuit_data[q].apply(time_to_seconds)
-
-# ================================
-# Build progression data
-# ================================
-progression_data = {}
-
-for _, row in circuit_data.iterrows():
-    driver = row["surname"]
-    q1, q2, q3 = row["q1"], row["q2"], row["q3"]
-    progression_data[driver] = [q1, q2, q3]
-
-# ================================
-# Plot with Annotations
-# ================================
-plt.figure(figsize=(12, 6))
-
-labels = ["Q1", "Q2", "Q3"]
-
-for driver, times in progression_data.items():
-    plt.plot(labels, times, marker="o", label=driver)
-
-    # Add text annotations at each point
-    for i, t in enumerate(times):
-        if t is not None:
-            plt.text(
-                labels[i], t, seconds_to_time(t),
-                fontsize=9, ha="left", va="bottom"
-            )
-
-plt.title(f"Qualifying Progression (Q1→Q2→Q3) at {user_circuit} ({user_year})")
-plt.xlabel("Qualifying Sessions")
-plt.ylabel("Lap Time (M:SS.mmm)")
-plt.legend()
-plt.grid(True)
-
-# Format y-axis ticks to lap time format
-yticks = plt.gca().get_yticks()
-plt.gca().set_yticklabels([seconds_to_time(y) for y in yticks])
-
-plt.show()
+from annotations import batch_markers, point_labels
+from charts import ChartData, NoDataError
+from instrumentation import stages
+from timing import ms_to_seconds, seconds_to_time
+
+
+def plot_quali_progression(data: ChartData, circuit: str, year: int, drivers: list[str]):
+    qualifying = data.qualifying  # pre-joined dataset, indexed by year, circuit, race and driver
+    user_circuit, user_year = circuit, int(year)
+    user_drivers = [d.strip().capitalize() for d in drivers]
+    stage = stages("chart.quali-progression")
+
+    # ================================
+    # Filter data
+    # ================================
+    stage("filter")
+    circuit_data = qualifying.rows(
+        years=[user_year],
+        circuit_ids=qualifying.find_circuits(user_circuit),
+        driver_ids=qualifying.find_drivers(user_drivers),
+    )
+
+    if circuit_data.empty:
+        raise NoDataError(f"No qualifying data found for {user_circuit} in {user_year} for drivers {user_drivers}.")
+
+    # ================================
+    # Lap times (already parsed to milliseconds in the enriched table)
+    # ================================
+    for q in ["q1", "q2", "q3"]:
+        circuit_data[q] = ms_to_seconds(circuit_data[f"{q}_ms"])
+
+    # ================================
+    # Build progression data
+    # ================================
+    stage("build")
+    progression_data = {}
+
+    for _, row in circuit_data.iterrows():
+        driver = row["surname"]
+        q1, q2, q3 = row["q1"], row["q2"], row["q3"]
+        progression_data[driver] = [q1, q2, q3]
+
+    # ================================
+    # Plot with Annotations
+    # ================================
+    stage("plot")
+    fig = plt.figure(figsize=(12, 6))
+    point_text = point_labels()
+
+    labels = ["Q1", "Q2", "Q3"]
+
+    for driver, times in progression_data.items():
+        plt.plot(labels, times, marker="o", label=driver)
+
+        # Add text annotations at each point
+        for i, t in enumerate(times):
+            if pd.notna(t):
+                point_text.text(
+                    labels[i], t, seconds_to_time(t),
+                    fontsize=9, ha="left", va="bottom"
+                )
+
+    batch_markers()
+
+    plt.title(f"Qualifying Progression (Q1→Q2→Q3) at {user_circuit} ({user_year})")
+    plt.xlabel("Qualifying Sessions")
+    plt.ylabel("Lap Time (M:SS.mmm)")
+    plt.legend()
+    plt.grid(True)
+
+    # Format y-axis ticks to lap time format
+    yticks = plt.gca().get_yticks()
+    plt.gca().set_yticklabels([seconds_to_time(y) for y in yticks])
+
+    stage.end()
+    return fig
+
+
+if __name__ == "__main__":
+    # ================================
+    # User inputs
+    # ================================
+    user_circuit = input("Enter circuit name (e.g., 'Silverstone'): ").strip()
+    user_year = int(input("Enter year (e.g., 2023): ").strip())
+    user_drivers = input("Enter driver surnames separated by commas (e.g., 'Verstappen,Leclerc,Hamilton'): ").split(",")
+
+    try:
+        plot_quali_progression(ChartData(), user_circuit, user_year, user_drivers)
+    except NoDataError as e:
+        print(e)
+        exit()
+
+    plt.show()
@@ -1,110 +1,103 @@
 #This file gives Qualifying comparison of multiple drivers across 1 track for multiple uears.
+#Several tracks at once ("Monaco,Baku" or a group like "street") give one small panel per track.
 
 import pandas as pd
 import matplotlib.pyplot as plt
 
-# ================================
-# Load datasets
-# ================================
-races = pd.read_csv("data/races.csv", on_bad_lines="skip")
-qualifying = pd.read_csv("data/qualifying.csv")
-drivers = pd.read_csv("data/drivers.csv")
-constructors = pd.read_csv("data/constructors.csv")
-circuits = pd.read_csv("data/circuits.csv")
-
-# ================================
-# Merge datasets for analysis
-# ================================
-qualifying = qualifying.merge(races, on="raceId", how="left", suffixes=("", "_race"))
-qualifying = qualifying.merge(drivers, on="driverId", how="left", suffixes=("", "_driver"))
-qualifying = qualifying.merge(constructors, on="constructorId", how="left", suffixes=("", "_constructor"))
-qualifying = qualifying.merge(circuits, on="circuitId", how="left", suffixes=("", "_circuit"))
-
-# ================================
-# User inputs
-# ================================
-user_circuit = input("Enter circuit name (e.g., 'Monza'): ").strip()
-user_years = input("Enter years separated by commas (e.g., '2020,2021,2022'): ").split(",")
-user_years = [int(y.strip()) for y in user_years]
-user_drivers = input("Enter driver surnames separated by commas (e.g., 'Verstappen,Hamilton,Leclerc'): ").split(",")
-user_drivers = [d.strip().capitalize() for d in user_drivers]
-
-# ================================
-# Time conversion helpers
-# ================================
-def time_to_seconds(t):
-    if pd.isna(t):
-        return None
-    parts = t.split(":")
-    if len(parts) == 2:
-        mins, rest = parts
-        return float(mins) * 60 + float(rest)
-    return None
-
-def seconds_to_time(s):
-    if s is None: 
-        return None
-    mins = int(s // 60)
-    secs = s % 60
-    return f"{mins}:{secs:06.3f}"
-
-# ================================
-# Collect best quali times per driver/year
-# ================================
-results = []
-
-for year in user_years:
-    year_data = qualifying[
-        (qualifying["year"] == year) &
-        (qualifying["name_circuit"].str.contains(user_circuit, case=False, na=False)) &
-        (qualifying["surname"].isin(user_drivers))
-    ]
-
-    if year_data.empty:
-        print(f"No qualifying data found for {user_circuit} in {year}.")
-        continue
-
-    for _, row in year_data.iterrows():
-        driver = row["surname"]
-        # take best available quali session time (priority Q3 > Q2 > Q1)
-        times = [time_to_seconds(row["q3"]), time_to_seconds(row["q2"]), time_to_seconds(row["q1"])]
-        best_time = next((t for t in times if t is not None), None)
-
-        if best_time is not None:
-            results.append({"Driver": driver, "Year": year, "BestTime": best_time})
-
-# ================================
-# Convert results to DataFrame
-# ================================
-df = pd.DataFrame(results)
-
-if df.empty:
-    print("No valid qualifying times found for given input.")
-    exit()
-
-# ================================
-# Plotting
-# ================================
-plt.figure(figsize=(12, 6))
-
-for driver in user_drivers:
-    driver_data = df[df["Driver"] == driver]
-    plt.plot(driver_data["Year"], driver_data["BestTime"], marker="o", label=driver)
-
-    # Annotate with actual lap times
-    for _, row in driver_data.iterrows():
-        plt.text(
-            row["Year"], row["BestTime"] - 0.15,  # slight downward offset
-            seconds_to_time(row["BestTime"]),
-            fontsize=9, ha="center", va="top"
+from charts import ChartData, NoDataError
+from comparison import compare, is_multi, plot_small_multiples
+from instrumentation import stages
+from timing import ms_to_seconds, seconds_to_time
+
+
+def plot_quali_years(data: ChartData, circuit: str, years: list[int], drivers: list[str]):
+    user_circuit = circuit
+    user_years = [int(y) for y in years]
+    user_drivers = [d.strip().capitalize() for d in drivers]
+    stage = stages("chart.quali-years")
+
+    # ================================
+    # Collect best quali times per driver/year (one grouped query for all years, see comparison.py)
+    # ================================
+    stage("filter")
+    frame = compare(data, user_circuit, user_years, user_drivers, metric="quali", case=True)
+
+    for year in user_years:
+        if year not in set(frame["year"]):
+            print(f"No qualifying data found for {user_circuit} in {year}.")
+
+    # best_q_ms already holds the best available session time (priority Q3 > Q2 > Q1)
+    frame = frame[frame["best_q_ms"].notna()]
+
+    if is_multi(user_circuit):
+        # Several circuits (or a group like "street"): one small panel per circuit
+        if frame.empty:
+            raise NoDataError("No valid qualifying times found for given input.")
+        stage("plot")
+        fig = plot_small_multiples(
+            frame.assign(best_time=ms_to_seconds(frame["best_q_ms"])), "best_time",
+            f"Qualifying Comparison at {user_circuit} ({', '.join(map(str, user_years))})",
+            "Best Qualifying Time (M:SS.mmm)", formatter=seconds_to_time,
         )
-
-plt.title(f"Qualifying Comparison at {user_circuit} ({', '.join(map(str, user_years))})")
-plt.xlabel("Year")
-plt.ylabel("Best Qualifying Time (M:SS.mmm)")
-plt.legend()
-plt.grid(True)
-# Format y-axis to lap time format
-yticks = plt.gca().get_yticks()
-plt.gca().set_yticklabels([seconds_to_time(y) for y in yticks])
-plt.show()
+        stage.end()
+        return fig
+
+    # ================================
+    # Convert results to DataFrame
+    # ================================
+    df = pd.DataFrame({
+        "Driver": frame["driver"],
+        "Year": frame["year"],
+        "BestTime": ms_to_seconds(frame["best_q_ms"]),
+    })
+
+    if df.empty:
+        raise NoDataError("No valid qualifying times found for given input.")
+
+    # ================================
+    # Plotting
+    # ================================
+    stage("plot")
+    fig = plt.figure(figsize=(12, 6))
+
+    for driver in user_drivers:
+        driver_data = df[df["Driver"] == driver]
+        plt.plot(driver_data["Year"], driver_data["BestTime"], marker="o", label=driver)
+
+        # Annotate with actual lap times
+        for _, row in driver_data.iterrows():
+            plt.text(
+                row["Year"], row["BestTime"] - 0.15,  # slight downward offset
+                seconds_to_time(row["BestTime"]),
+                fontsize=9, ha="center", va="top"
+            )
+
+    plt.title(f"Qualifying Comparison at {user_circuit} ({', '.join(map(str, user_years))})")
+    plt.xlabel("Year")
+    plt.ylabel("Best Qualifying Time (M:SS.mmm)")
+    plt.legend()
+    plt.grid(True)
+    # Format y-axis to lap time format
+    yticks = plt.gca().get_yticks()
+    plt.gca().set_yticklabels([seconds_to_time(y) for y in yticks])
+
+    stage.end()
+    return fig
+
+
+if __name__ == "__main__":
+    # ================================
+    # User inputs
+    # ================================
+    user_circuit = input("Enter circuit name(s) (e.g., 'Monza', 'Monaco,Baku' or 'street'): ").strip()
+    user_years = input("Enter years separated by commas (e.g., '2020,2021,2022'): ").split(",")
+    user_years = [int(y.strip()) for y in user_years]
+    user_drivers = input("Enter driver surnames separated by commas (e.g., 'Verstappen,Hamilton,Leclerc'): ").split(",")
+
+    try:
+        plot_quali_years(ChartData(), user_circuit, user_years, user_drivers)
+    except NoDataError as e:
+        print(e)
+        exit()
+
+    plt.show()
@@ -0,0 +1,161 @@
+#This file draws the per-point labels and markers of the line charts, one Text/marker per point by default.
+#Fast mode (F1_FAST_CHARTS=1, cli --fast) batches them into one artist per axes and skips overlapping labels.
+
+import os
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+import numpy as np
+from matplotlib import rcParams
+from matplotlib.artist import Artist
+from matplotlib.backends.backend_agg import RendererAgg
+from matplotlib.colors import to_rgba
+from matplotlib.font_manager import FontProperties
+
+FAST_ENV = "F1_FAST_CHARTS"
+STAMP_CACHE_SIZE = 4096
+
+# Per thread / task, so concurrent renders (app sessions, render workers) never see each other's mode
+_fast = ContextVar("fast_labels",
+                   default=os.environ.get(FAST_ENV, "").strip().lower() in ("1", "true", "yes", "on"))
+
+# Offset of the anchor point from the text box, as a fraction of its width / height (like Text's ha/va)
+_HA = {"left": 0.0, "center": 0.5, "right": 1.0}
+_VA = {"bottom": 0.0, "center": 0.5, "top": 1.0}
+
+# (text, size, colour, dpi, antialiased) → (RGBA pixels with a 1px margin, width, height, descent)
+_stamps = {}
+
+
+def fast_enabled() -> bool:
+    return _fast.get()
+
+
+@contextmanager
+def label_mode(fast: bool | None):
+    if fast is None:
+        yield
+        return
+    token = _fast.set(bool(fast))
+    try:
+        yield
+    finally:
+        _fast.reset(token)
+
+
+def _stamp(renderer, s: str, prop: FontProperties, color: tuple) -> tuple:
+    antialiased = rcParams["text.antialiased"]
+    key = (s, prop.get_size_in_points(), color, renderer.dpi, antialiased)
+    if key not in _stamps:
+        if len(_stamps) >= STAMP_CACHE_SIZE:
+            _stamps.clear()
+        width, height, descent = renderer.get_text_width_height_descent(s, prop, ismath=False)
+        canvas = RendererAgg(int(np.ceil(width)) + 2, int(np.ceil(height)) + 2, renderer.dpi)
+        gc = canvas.new_gc()
+        gc.set_foreground(color, isRGBA=True)
+        gc.set_antialiased(antialiased)
+        canvas.draw_text(gc, 1, canvas.height - 1 - descent, s, prop, 0.0)  # Agg measures y from the top
+        gc.restore()
+        _stamps[key] = (np.asarray(canvas.buffer_rgba())[::-1].copy(), width, height, descent)  # rows bottom-up
+    return _stamps[key]
+
+
+# Every label of one axes as one artist; a label overlapping one already drawn is skipped at draw time.
+class LabelLayer(Artist):
+    zorder = 3  # same as Text, so labels still sit on top of the lines
+
+    def __init__(self, padding: float = 1.0):
+        super().__init__()
+        self.padding = padding  # pixels kept free around each label
+        self.set_in_layout(False)  # tight_layout doesn't need to measure labels drawn inside the axes
+        self._labels = []  # (x, y, text, fontsize, ha, va, color)
+        self._fonts = {}
+        self.drawn = 0  # labels actually drawn by the last draw()
+
+    def text(self, x, y, s, fontsize=None, ha: str = "left", va: str = "baseline", color=None, **_ignored):
+        self._labels.append((self.axes.convert_xunits(x), self.axes.convert_yunits(y), str(s),
+                             fontsize, ha, va, color))
+        self.stale = True
+        return self
+
+    def _font(self, size) -> FontProperties:
+        if size not in self._fonts:
+            self._fonts[size] = FontProperties(size=size)
+        return self._fonts[size]
+
+    def draw(self, renderer):
+        if not self.get_visible() or not self._labels:
+            return
+        points = self.get_transform().transform(np.array([(x, y) for x, y, *_ in self._labels], dtype=float))
+        boxes = np.empty((len(self._labels), 4))  # x0, y0, x1, y1 of every drawn label, display pixels
+        kept = 0
+        pad = self.padding
+
+        stamped = isinstance(renderer, RendererAgg)  # PNG; vector output keeps real text
+        flip_height = renderer.get_canvas_width_height()[1] if renderer.flipy() else None
+        renderer.open_group("point-labels", gid=self.get_gid())
+        gc = renderer.new_gc()
+        gc.set_antialiased(rcParams["text.antialiased"])
+        for (px, py), (_x, _y, s, size, ha, va, color) in zip(points, self._labels):
+            if not (np.isfinite(px) and np.isfinite(py)) or not s:
+                continue
+            prop = self._font(size)
+            rgba = to_rgba(color if color is not None else rcParams["text.color"])
+            if stamped:
+                image, width, height, descent = _stamp(renderer, s, prop, rgba)
+            else:
+                width, height, descent = renderer.get_text_width_height_descent(s, prop, ismath=False)
+            x0 = px - width * _HA.get(ha, 0.0)
+            y0 = py - descent if va == "baseline" else py - height * _VA.get(va, 0.0)
+            box = (x0 - pad, y0 - pad, x0 + width + pad, y0 + height + pad)
+            if kept and np.any((boxes[:kept, 0] < box[2]) & (boxes[:kept, 2] > box[0])
+                               & (boxes[:kept, 1] < box[3]) & (boxes[:kept, 3] > box[1])):
+                continue
+            boxes[kept] = box
+            kept += 1
+            if stamped:
+                renderer.draw_image(gc, round(x0) - 1, round(y0) - 1, image)
+                continue
+            gc.set_foreground(rgba, isRGBA=True)
+            baseline = y0 + descent
+            renderer.draw_text(gc, x0, baseline if flip_height is None else flip_height - baseline, s, prop, 0.0,
+                               ismath=False)
+        gc.restore()
+        renderer.close_group("point-labels")
+        self.drawn = kept
+        self.stale = False
+
+
+# Fast mode only: the markers of every line as one scatter per marker style (legend handles keep theirs).
+def batch_markers(ax=None) -> list:
+    if not _fast.get():
+        return []
+    if ax is None:
+        import matplotlib.pyplot as plt
+        ax = plt.gca()
+    groups = {}  # (marker, size, edge width) → points, face colours, edge colours
+    for line in ax.get_lines():
+        if line.get_marker() in (None, "None", "none", "", " ") or line.get_markevery() is not None:
+            continue
+        xy = line.get_xydata()
+        xy = xy[np.isfinite(xy).all(axis=1)]
+        points, faces, edges = groups.setdefault(
+            (line.get_marker(), line.get_markersize(), line.get_markeredgewidth()), ([], [], []))
+        points.append(xy)
+        faces += [line.get_markerfacecolor()] * len(xy)
+        edges += [line.get_markeredgecolor()] * len(xy)
+        line.set_markevery([])  # line drawn without markers, legend handle keeps its marker
+    return [
+        ax.scatter(*np.concatenate(points).T, s=size ** 2, marker=marker, c=faces, edgecolors=edges,
+                   linewidths=width, zorder=2)
+        for (marker, size, width), (points, faces, edges) in groups.items() if faces
+    ]
+
+
+def point_labels(ax=None):
+    if ax is None:
+        import matplotlib.pyplot as plt
+        ax = plt.gca()
+    if not _fast.get():
+        return ax
+    return ax.add_artist(LabelLayer())
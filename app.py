@@ -0,0 +1,204 @@
+#This file is the Streamlit dashboard with every graph script plus the qualifying predictor. Run: streamlit run app.py
+
+import io
+import os
+import time
+import threading
+
+import matplotlib
+matplotlib.use("Agg")  # headless; must run before pyplot is imported anywhere in this process
+
+import streamlit as st
+
+from annotations import fast_enabled
+from charts import CHARTS, ChartData, NoDataError, render
+from cli import CHART_HELP
+from model_registry import list_versions, resolve_model_path, version_name
+from qualifying_predictor import MODEL_PATH, QualifyingPredictor, rank_predictions
+
+# Charts built from the qualifying table; the rest use race results
+QUALI_CHARTS = {"quali-progression", "quali-years"}
+# The chart scripts draw through pyplot's global current figure; Streamlit runs each session in its own thread
+RENDER_LOCK = threading.Lock()
+
+
+# ================================
+# Shared, process-wide resources
+# ================================
+@st.cache_resource(show_spinner="Loading race data…")
+def chart_data() -> ChartData:
+    return ChartData().preload()
+
+
+@st.cache_resource(max_entries=1, show_spinner="Loading model…")
+def predictor(model_path: str, mtime: float) -> QualifyingPredictor:
+    # mtime is part of the cache key: a retrained/promoted model is picked up on the next run,
+    # and max_entries=1 lets the previous one go
+    return QualifyingPredictor.load(model_path)
+
+
+def model_mtime(path: str) -> float:
+    if os.path.isdir(path):
+        path = os.path.join(path, "meta.json")
+    return os.path.getmtime(path) if os.path.exists(path) else 0.0
+
+
+# ================================
+# Cached option lists (small frames derived from the shared tables)
+# ================================
+def table_index(chart: str):
+    data = chart_data()
+    return data.qualifying if chart in QUALI_CHARTS else data.results
+
+
+@st.cache_data
+def years_for(chart: str) -> list[int]:
+    years = table_index(chart).year
+    return sorted({int(y) for y in years if y > 0}, reverse=True)
+
+
+@st.cache_data
+def circuit_names(chart: str, years: tuple[int, ...]) -> list[str]:
+    index = table_index(chart)
+    ids = index.df.iloc[index.lookup(years=list(years))]["circuitId"].unique().tolist()
+    names = index.circuits[index.circuits["circuitId"].isin(ids)]["name_circuit"].astype(str)
+    return sorted(names)
+
+
+@st.cache_data
+def driver_surnames(chart: str, years: tuple[int, ...], circuit: str | None) -> list[str]:
+    index = table_index(chart)
+    circuit_ids = index.find_circuits(circuit) if circuit else None
+    rows = index.df.iloc[index.lookup(years=list(years), circuit_ids=circuit_ids)]
+    return sorted(rows["surname"].dropna().astype(str).unique())
+
+
+@st.cache_data
+def circuit_labels() -> dict[int, str]:
+    circuits = chart_data().qualifying.circuits
+    return dict(zip(circuits["circuitId"].astype(int), circuits["name_circuit"].astype(str)))
+
+
+# ================================
+# Cached outputs
+# ================================
+@st.cache_data(max_entries=256, show_spinner=False)
+def chart_png(chart: str, params: tuple, fast: bool = False, dpi: int | None = None) -> bytes:
+    import matplotlib.pyplot as plt
+
+    params = {k: list(v) if isinstance(v, tuple) else v for k, v in params}
+    data = chart_data()
+    buf = io.BytesIO()
+    with RENDER_LOCK:
+        fig = render(chart, data, fast=fast, **params)
+        fig.savefig(buf, format="png", dpi=dpi)
+        plt.close(fig)
+    return buf.getvalue()
+
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def ranked_predictions(model_path: str, mtime: float, circuit_ids: tuple[int, ...], years: tuple[int, ...]):
+    return rank_predictions(predictor(model_path, mtime).predict(circuit_ids, years))
+
+
+# ================================
+# Pages
+# ================================
+def charts_page() -> None:
+    chart = st.sidebar.selectbox("Chart", list(CHARTS), format_func=lambda c: CHART_HELP[c])
+    expected = CHARTS[chart][2]
+
+    year_options = years_for(chart)
+    if "years" in expected:
+        years = st.sidebar.multiselect("Years", year_options, default=year_options[:3])
+    else:
+        years = [st.sidebar.selectbox("Year", year_options)]
+    years = tuple(sorted(years))
+
+    circuit = None
+    if "circuit" in expected:
+        circuits = circuit_names(chart, years)
+        if not circuits:
+            st.info("Pick at least one year with races.")
+            return
+        circuit = st.sidebar.selectbox("Circuit", circuits)
+
+    drivers = st.sidebar.multiselect("Drivers", driver_surnames(chart, years, circuit))
+    if not years or not drivers:
+        st.info("Pick the years and drivers to compare in the sidebar.")
+        return
+
+    params = {"drivers": tuple(drivers)}
+    if circuit is not None:
+        params["circuit"] = circuit
+    if "years" in expected:
+        params["years"] = years
+    else:
+        params["year"] = years[0]
+
+    # Fast labels skip the ones that would overlap; worth it on full-grid season charts
+    fast = st.sidebar.checkbox("Fast labels", value=fast_enabled())
+    dpi = st.sidebar.select_slider("Resolution (dpi)", options=[60, 80, 100, 150, 200], value=100)
+
+    start = time.perf_counter()
+    try:
+        png = chart_png(chart, tuple(sorted(params.items())), fast, dpi)
+    except NoDataError as e:
+        st.warning(str(e))
+        return
+    st.image(png)
+    st.caption(f"{CHART_HELP[chart]} · {(time.perf_counter() - start) * 1000:.0f} ms")
+
+
+def prediction_page() -> None:
+    versions = [None] + [version_name(v) for v in reversed(list_versions())]
+    version = st.sidebar.selectbox("Model", versions, format_func=lambda v: MODEL_PATH if v is None else v)
+    model_path = resolve_model_path(version)
+    if not os.path.exists(model_path):
+        st.error(f"{model_path} not found. Run train_qualifying_model.py first.")
+        return
+    mtime = model_mtime(model_path)
+    model = predictor(model_path, mtime)
+
+    labels = circuit_labels()
+    known = [int(c) for c in model.known_circuits()]
+    circuit_ids = st.sidebar.multiselect("Circuits", known, default=known[:1],
+                                         format_func=lambda c: f"{labels.get(c, 'Circuit')} ({c})")
+    years = st.sidebar.multiselect("Seasons", list(range(2030, 1999, -1)), default=[2025])
+    top_k = st.sidebar.slider("How many to show", 1, max(len(model.grid), 1), min(10, max(len(model.grid), 1)))
+    if not circuit_ids or not years:
+        st.info("Pick at least one circuit and one season in the sidebar.")
+        return
+
+    start = time.perf_counter()
+    ranked = ranked_predictions(model_path, mtime, tuple(circuit_ids), tuple(years))
+    for (circuit_id, year), block in ranked.groupby(["circuitId", "year"], sort=False):
+        st.subheader(f"📍 {labels.get(int(circuit_id), 'Circuit')} ({circuit_id}) — {year}")
+        table = block[["driver_name", "constructor_name", "predicted_position"]].head(top_k).reset_index(drop=True)
+        table["predicted_position"] = table["predicted_position"].round(2)
+        table.index += 1
+        st.dataframe(table, use_container_width=True)
+    st.caption(f"{len(ranked)} prediction(s) · {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    if not model.skipped.empty:
+        st.warning("Not predicted (unknown to the model, retrain after ingesting their races):")
+        st.dataframe(model.skipped, hide_index=True)
+
+
+def main() -> None:
+    st.set_page_config(page_title="F1 Stats", page_icon="🏎️", layout="wide")
+    st.title("🏎️ F1 Stats")
+
+    page = st.sidebar.radio("View", ["Charts", "Qualifying prediction"])
+    if st.sidebar.button("Reload data & model"):
+        # After prepare/ingest/train: drop every cached table, model and rendered chart
+        st.cache_resource.clear()
+        st.cache_data.clear()
+
+    if page == "Charts":
+        charts_page()
+    else:
+        prediction_page()
+
+
+main()
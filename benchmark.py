@@ -0,0 +1,312 @@
+#This file benchmarks load, merge, filter, charts, training and prediction on data/ and synthetic 10×/100× copies.
+#Usage: python benchmark.py [--scales 1,10,100] [-o out.json] | python benchmark.py --compare before.json after.json
+
+import os
+import gc
+import sys
+import json
+import time
+import platform
+import argparse
+import resource
+import statistics
+import subprocess
+import tracemalloc
+import warnings
+
+import matplotlib
+matplotlib.use("Agg")  # charts are built headlessly
+warnings.filterwarnings("ignore", category=UserWarning)  # tick-label warnings from the charts would drown the table
+
+from data_cache import DATA_DIR, load_table, read_csv_typed
+from synthetic_data import make_scaled_dataset
+
+TABLES = ["qualifying", "results", "races", "drivers", "constructors", "circuits"]
+
+# Chart jobs that exist in the real data (and therefore in every synthetic copy too)
+CHART_JOBS = {
+    "quali-progression": {"circuit": "Silverstone", "year": 2023, "drivers": ["Verstappen", "Leclerc", "Hamilton"]},
+    "quali-years": {"circuit": "Monza", "years": [2021, 2022, 2023], "drivers": ["Verstappen", "Leclerc"]},
+    "race-grid": {"circuit": "Monza", "year": 2023, "drivers": ["Leclerc", "Sainz", "Verstappen"]},
+    "race-years": {"circuit": "Silverstone", "years": [2019, 2020, 2021, 2022, 2023], "drivers": ["Hamilton", "Verstappen"]},
+    "season-positions": {"year": 2021, "drivers": ["Verstappen", "Hamilton"]},
+    "season-points": {"year": 2021, "drivers": ["Verstappen", "Hamilton", "Bottas"]},
+}
+
+# Index filters: (years, circuit pattern, driver surnames)
+FILTER_QUERIES = [
+    ([2023], "Silverstone", ["Verstappen", "Leclerc"]),
+    ([2019, 2020, 2021, 2022, 2023], "Monza", ["Hamilton"]),
+    (None, "Monaco", None),
+    ([2021], None, ["Verstappen", "Hamilton", "Bottas"]),
+]
+
+
+def max_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+# ================================
+# Stages
+# ================================
+class BenchContext:
+    def __init__(self, data_dir: str, n_estimators: int):
+        self.data_dir = data_dir
+        self.n_estimators = n_estimators
+        self.model = None
+        self.encoders = None
+
+
+def stage_csv_load(ctx: BenchContext):
+    for name in TABLES:
+        read_csv_typed(os.path.join(ctx.data_dir, f"{name}.csv"), name)
+
+
+def stage_cache_load(ctx: BenchContext):
+    for name in TABLES:
+        load_table(name, ctx.data_dir)
+
+
+def stage_merge_qualifying(ctx: BenchContext):
+    from enriched_tables import build_enriched
+    build_enriched("qualifying", ctx.data_dir)
+
+
+def stage_merge_results(ctx: BenchContext):
+    from enriched_tables import build_enriched
+    build_enriched("results", ctx.data_dir)
+
+
+def stage_index_build(ctx: BenchContext):
+    from data_index import TableIndex
+    from enriched_tables import load_enriched
+    for kind in ("qualifying", "results"):
+        TableIndex(load_enriched(kind, ctx.data_dir))
+
+
+def stage_filter(ctx: BenchContext):
+    from data_index import get_index
+    for kind in ("qualifying", "results"):
+        index = get_index(kind, ctx.data_dir)
+        for years, circuit, drivers in FILTER_QUERIES:
+            index.rows(
+                years=years,
+                circuit_ids=index.find_circuits(circuit) if circuit else None,
+                driver_ids=index.find_drivers(drivers) if drivers else None,
+            )
+
+
+def chart_stage(name: str):
+    def run(ctx: BenchContext):
+        import io
+        import matplotlib.pyplot as plt
+        from charts import ChartData, render
+
+        fig = render(name, ChartData(ctx.data_dir), **CHART_JOBS[name])
+        fig.savefig(io.BytesIO(), format="png")
+        plt.close(fig)
+    return run
+
+
+def training_frame(data_dir: str):
+    import pandas as pd
+    from encoders import EncoderSet
+    from enriched_tables import load_enriched_qualifying
+
+    df = load_enriched_qualifying(data_dir).rename(columns={"surname": "driver_name", "name_constructor": "constructor_name"})
+    df = df[["driver_name", "constructor_name", "circuitId", "year", "position"]].copy()
+    df["position"] = pd.to_numeric(df["position"], errors="coerce")
+    df = df.dropna(subset=["position"])
+
+    encoders = EncoderSet.fit(df)
+    for col in encoders:
+        df[col] = encoders[col].transform(df[col])
+    df["year"] = df["year"].astype("int64")
+    df["position"] = df["position"].astype("float64")
+    return df, encoders
+
+
+def stage_train(ctx: BenchContext):
+    # Mirrors train_qualifying_model.py (same split, same forest settings)
+    from sklearn.ensemble import RandomForestRegressor
+    from sklearn.model_selection import train_test_split
+
+    df, encoders = training_frame(ctx.data_dir)
+    X = df[["driver_name", "constructor_name", "circuitId", "year"]]
+    X_train, _, y_train, _ = train_test_split(X, df["position"], test_size=0.2, random_state=42)
+    model = RandomForestRegressor(n_estimators=ctx.n_estimators, random_state=42)
+    model.fit(X_train, y_train)
+    ctx.model, ctx.encoders = model, encoders
+
+
+def stage_predict(ctx: BenchContext):
+    # predict_qualifying.py's batched path: the current grid at every known circuit for one season
+    import pandas as pd
+    from qualifying_predictor import QualifyingPredictor, GRID_PATH
+
+    if ctx.model is None:
+        stage_train(ctx)
+    predictor = QualifyingPredictor(ctx.model, ctx.encoders, pd.read_csv(GRID_PATH))
+    predictor.predict(predictor.known_circuits(), [2025])
+
+
+STAGES = {
+    "csv_load": stage_csv_load,
+    "cache_load": stage_cache_load,
+    "merge_qualifying": stage_merge_qualifying,
+    "merge_results": stage_merge_results,
+    "index_build": stage_index_build,
+    "filter": stage_filter,
+    **{f"chart:{name}": chart_stage(name) for name in CHART_JOBS},
+    "train": stage_train,
+    "predict": stage_predict,
+}
+
+
+# ================================
+# Measurement
+# ================================
+def measure(func, ctx: BenchContext, repeat: int) -> dict:
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        func(ctx)
+        times.append(time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    func(ctx)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "min_s": round(min(times), 5),
+        "median_s": round(statistics.median(times), 5),
+        "runs": repeat,
+        "peak_alloc_mb": round(peak / (1024 * 1024), 2),
+        "max_rss_mb": round(max_rss_mb(), 1),
+    }
+
+
+def dataset_rows(data_dir: str) -> dict:
+    rows = {}
+    for name in ("qualifying", "results"):
+        with open(os.path.join(data_dir, f"{name}.csv"), "rb") as f:
+            rows[name] = sum(1 for _ in f) - 1
+    return rows
+
+
+def run_dataset(data_dir: str, stages: list[str], repeat: int, n_estimators: int) -> dict:
+    ctx = BenchContext(data_dir, n_estimators)
+    # Warm the caches once so the "load" stages measure the steady state, not the first build
+    for name in TABLES:
+        load_table(name, data_dir)
+
+    results = {}
+    for name in stages:
+        results[name] = measure(STAGES[name], ctx, repeat)
+        print(f"   {name:<26} {results[name]['min_s']:>9.4f}s   peak {results[name]['peak_alloc_mb']:>8.1f} MB")
+    return {"data_dir": data_dir, "rows": dataset_rows(data_dir), "stages": results}
+
+
+def git_revision() -> str | None:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=10)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run_benchmarks(scales: list[int], stages: list[str], repeat: int, n_estimators: int) -> dict:
+    import numpy as np
+    import pandas as pd
+    import sklearn
+
+    report = {
+        "meta": {
+            "revision": git_revision(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "sklearn": sklearn.__version__,
+            "cpus": os.cpu_count(),
+            "repeat": repeat,
+            "n_estimators": n_estimators,
+        },
+        "datasets": {},
+    }
+    for scale in scales:
+        data_dir = DATA_DIR if scale == 1 else make_scaled_dataset(scale)
+        print(f"📊 x{scale} ({data_dir})")
+        report["datasets"][f"x{scale}"] = run_dataset(data_dir, stages, repeat, n_estimators)
+    return report
+
+
+# ================================
+# Comparing two runs
+# ================================
+def compare(before: dict, after: dict, threshold: float, min_seconds: float) -> list[str]:
+    regressions = []
+    for dataset, new in after["datasets"].items():
+        old = before["datasets"].get(dataset)
+        if old is None:
+            continue
+        print(f"📊 {dataset}")
+        for stage, n in new["stages"].items():
+            o = old["stages"].get(stage)
+            if o is None:
+                continue
+            ratio = n["min_s"] / o["min_s"] if o["min_s"] > 0 else float("inf")
+            # Ignore sub-noise-floor stages: a 2 ms → 3 ms jump is not a regression
+            slower = ratio > 1 + threshold and n["min_s"] - o["min_s"] > min_seconds
+            flag = "❌" if slower else "✅"
+            print(f"{flag} {stage:<26} {o['min_s']:>9.4f}s → {n['min_s']:>9.4f}s  ({ratio:5.2f}×)"
+                  f"   peak {o['peak_alloc_mb']:.1f} → {n['peak_alloc_mb']:.1f} MB")
+            if slower:
+                regressions.append(f"{dataset}/{stage}")
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the F1 pipeline on real and synthetic data")
+    parser.add_argument("--scales", default="1,10,100", help="Comma-separated dataset sizes (1 = data/ as shipped)")
+    parser.add_argument("--stages", help=f"Comma-separated subset of: {', '.join(STAGES)}")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--n-estimators", type=int, default=100, help="Forest size for the train stage")
+    parser.add_argument("-o", "--output", default="bench_results.json")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"), help="Compare two result files instead")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed slowdown before failing (0.2 = 20%%)")
+    parser.add_argument("--min-seconds", type=float, default=0.005, help="Ignore differences below this")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        with open(args.compare[0]) as f:
+            before = json.load(f)
+        with open(args.compare[1]) as f:
+            after = json.load(f)
+        regressions = compare(before, after, args.threshold, args.min_seconds)
+        if regressions:
+            print(f"❌ {len(regressions)} regression(s): {', '.join(regressions)}")
+            return 1
+        print("✅ No regressions")
+        return 0
+
+    stages = args.stages.split(",") if args.stages else list(STAGES)
+    unknown = [s for s in stages if s not in STAGES]
+    if unknown:
+        parser.error(f"unknown stage(s): {', '.join(unknown)}")
+
+    scales = [int(s) for s in args.scales.split(",")]
+    report = run_benchmarks(scales, stages, args.repeat, args.n_estimators)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"✅ Results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
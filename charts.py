@@ -0,0 +1,120 @@
+#This file is the shared plumbing for the graph scripts: pre-loaded data, the chart registry and saving to disk.
+
+import os
+import importlib
+from functools import cached_property
+
+from data_cache import DATA_DIR
+from instrumentation import span
+
+
+class NoDataError(ValueError):
+    pass
+
+
+# ================================
+# Pre-loaded data shared by all charts
+# ================================
+# Tables load on first use and are kept; years narrows to those seasons, chunksize (or F1_CHUNKSIZE) streams the CSVs.
+class ChartData:
+    def __init__(self, data_dir: str = DATA_DIR, years=None, chunksize: int | None = None):
+        from streaming import env_chunksize
+        self.data_dir = data_dir
+        self.years = None if years is None else sorted({int(y) for y in years})
+        self.chunksize = chunksize or env_chunksize()
+
+    def _index(self, kind: str):
+        from data_index import TableIndex, get_index
+        if self.chunksize is None:
+            index = get_index(kind, self.data_dir)
+            if self.years is None:
+                return index
+            df = index.df.iloc[index.lookup(years=self.years)].reset_index(drop=True)
+            if df.empty:
+                raise NoDataError(f"No {kind} rows for season(s) {', '.join(map(str, self.years))}")
+            with span("data.index_build", table=kind, rows=len(df)):
+                return TableIndex(df)
+
+        from enriched_tables import lean_columns
+        from streaming import DEFAULT_CHUNKSIZE, load_streamed
+        try:
+            df = load_streamed(kind, self.years, self.chunksize or DEFAULT_CHUNKSIZE, self.data_dir,
+                               lean_columns(kind, "charts"))
+        except ValueError as e:
+            raise NoDataError(str(e)) from None
+        with span("data.index_build", table=kind, rows=len(df)):
+            return TableIndex(df)
+
+    @cached_property
+    def qualifying(self):
+        return self._index("qualifying")
+
+    @cached_property
+    def results(self):
+        return self._index("results")
+
+    @cached_property
+    def season_results(self):
+        # Enriched results plus readable status text when data/status.csv exists
+        from data_cache import load_table
+        results = self.results.df
+        if os.path.exists(os.path.join(self.data_dir, "status.csv")):
+            status_df = load_table("status", self.data_dir)
+            results = results.merge(status_df[["statusId", "status"]], on="statusId", how="left")
+        return results
+
+    @cached_property
+    def points_cube(self):
+        # Cumulative points for every season, built once and cached on disk (points_cube.py)
+        from points_cube import PointsCube
+        return PointsCube.load(self.data_dir)
+
+    def preload(self) -> "ChartData":
+        self.qualifying, self.results, self.season_results
+        return self
+
+
+# ================================
+# Chart registry: name → (module, function, parameters)
+# ================================
+# Modules are imported lazily so the scripts can import this file without a cycle
+CHARTS = {
+    "quali-progression": ("GraphCompare", "plot_quali_progression", ["circuit", "year", "drivers"]),
+    "quali-years": ("QualiCompare", "plot_quali_years", ["circuit", "years", "drivers"]),
+    "race-grid": ("RaceGraph", "plot_race_grid", ["circuit", "year", "drivers"]),
+    "race-years": ("manyracesgraph", "plot_race_years", ["circuit", "years", "drivers"]),
+    "season-positions": ("SeasonCompare", "plot_season_positions", ["year", "drivers"]),
+    "season-points": ("SeasonPointsCompare", "plot_season_points", ["year", "drivers"]),
+    "race-pace": ("lap_times", "plot_race_pace", ["circuit", "year", "drivers"]),
+    "race-gaps": ("lap_times", "plot_race_gaps", ["circuit", "year", "drivers"]),
+    "stint-degradation": ("lap_times", "plot_stint_degradation", ["circuit", "year", "drivers"]),
+}
+
+
+def chart_function(name: str):
+    if name not in CHARTS:
+        raise ValueError(f"Unknown chart '{name}'. Choose from: {', '.join(CHARTS)}")
+    module, func, _ = CHARTS[name]
+    return getattr(importlib.import_module(module), func)
+
+
+def render(name: str, data: ChartData, fast: bool | None = None, **params):
+    from annotations import label_mode
+
+    func = chart_function(name)
+    _, _, expected = CHARTS[name]
+    missing = [p for p in expected if p not in params]
+    if missing:
+        raise ValueError(f"Chart '{name}' is missing parameter(s): {', '.join(missing)}")
+    with span(f"chart.{name}", fast=fast), label_mode(fast):
+        return func(data, **{p: params[p] for p in expected})
+
+
+def save_figure(fig, path: str, dpi: int | None = None) -> str:
+    import matplotlib.pyplot as plt
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with span("chart.save", format=os.path.splitext(path)[1].lstrip(".")):
+        fig.savefig(path, dpi=dpi)
+    plt.close(fig)
+    return path
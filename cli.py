@@ -0,0 +1,152 @@
+#This file is the non-interactive entry point for every graph script, plus a batch runner (cli.py batch jobs.json).
+#Usage: python cli.py season-points --year 2021 --drivers Verstappen,Hamilton -o out/2021.png
+
+import os
+import sys
+import json
+import time
+import argparse
+
+CHART_HELP = {
+    "quali-progression": "Q1 → Q2 → Q3 lap times at one circuit in one year (GraphCompare.py)",
+    "quali-years": "Best qualifying time at one circuit across years (QualiCompare.py)",
+    "race-grid": "Grid start → race finish at one circuit in one year (RaceGraph.py)",
+    "race-years": "Finishing position at one circuit across years (manyracesgraph.py)",
+    "season-positions": "Race-by-race positions across a season (SeasonCompare.py)",
+    "season-points": "Cumulative points across a season (SeasonPointsCompare.py)",
+    "race-pace": "Lap times through one race (lap_times.py, needs data/lap_times.csv)",
+    "race-gaps": "Gap to the leader lap by lap (lap_times.py, needs data/lap_times.csv)",
+    "stint-degradation": "Lap time trend per tyre stint (lap_times.py, needs data/lap_times.csv)",
+}
+FAST_HELP = "Fast point labels: batched, overlapping ones skipped (default: F1_FAST_CHARTS, else off)"
+
+
+def split_list(value: str) -> list[str]:
+    return [v.strip() for v in value.split(",") if v.strip()]
+
+
+def split_years(value: str) -> list[int]:
+    return [int(v) for v in split_list(value)]
+
+
+# ================================
+# Job files
+# ================================
+def read_jobs(path: str) -> list[dict]:
+    with open(path, encoding="utf-8") as f:
+        text = f.read().strip()
+    if text.startswith("["):
+        return json.loads(text)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def normalize_job(job: dict, out_dir: str | None = None, fmt: str | None = None) -> dict:
+    job = dict(job)
+    if isinstance(job.get("drivers"), str):
+        job["drivers"] = split_list(job["drivers"])
+    if isinstance(job.get("years"), str):
+        job["years"] = split_years(job["years"])
+
+    if "output" not in job:
+        # e.g. race-grid_monza_2023.png
+        parts = [job["chart"], str(job.get("circuit", "")).lower().replace(" ", "-"),
+                 str(job.get("year", "-".join(map(str, job.get("years", [])))))]
+        job["output"] = "_".join(p for p in parts if p) + f".{fmt or 'png'}"
+    elif fmt and not os.path.splitext(job["output"])[1]:
+        job["output"] += f".{fmt}"
+    if out_dir and not os.path.isabs(job["output"]):
+        job["output"] = os.path.join(out_dir, job["output"])
+    return job
+
+
+def print_report(report: list[dict], seconds: float) -> None:
+    failed = [r for r in report if not r["ok"]]
+    for r in failed:
+        print(f"❌ {r['chart']} → {r['output']}: {r['error']}")
+    rate = len(report) / seconds if seconds > 0 else 0.0
+    print(f"✅ {len(report) - len(failed)} chart(s) written, {len(failed)} failed in {seconds:.1f}s ({rate:.1f} charts/s)")
+
+
+# ================================
+# Argument parsing
+# ================================
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="F1 stat graphs without input() prompts")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def chart_parser(name: str, circuit: bool, multi_year: bool):
+        p = sub.add_parser(name, help=CHART_HELP[name])
+        if circuit:
+            help_text = "Circuit name (substring match)"
+            if multi_year:
+                help_text += '; several comma-separated, or a group such as "street", give one panel per circuit'
+            p.add_argument("--circuit", required=True, help=help_text)
+        if multi_year:
+            p.add_argument("--years", required=True, type=split_years, help="Comma-separated years")
+        else:
+            p.add_argument("--year", required=True, type=int)
+        p.add_argument("--drivers", required=True, type=split_list, help="Comma-separated driver names")
+        p.add_argument("-o", "--output", help="Write to this .png/.svg file instead of opening a window")
+        p.add_argument("--dpi", type=int, help="Output resolution (default: matplotlib's savefig.dpi)")
+        p.add_argument("--fast", action="store_true", default=None, help=FAST_HELP)
+
+    chart_parser("quali-progression", circuit=True, multi_year=False)
+    chart_parser("quali-years", circuit=True, multi_year=True)
+    chart_parser("race-grid", circuit=True, multi_year=False)
+    chart_parser("race-years", circuit=True, multi_year=True)
+    chart_parser("season-positions", circuit=False, multi_year=False)
+    chart_parser("season-points", circuit=False, multi_year=False)
+    chart_parser("race-pace", circuit=True, multi_year=False)
+    chart_parser("race-gaps", circuit=True, multi_year=False)
+    chart_parser("stint-degradation", circuit=True, multi_year=False)
+
+    b = sub.add_parser("batch", help="Render every chart in a job file, loading the data once")
+    b.add_argument("jobs", help="JSON list or JSON Lines file of chart specs")
+    b.add_argument("--out-dir", help="Directory for relative output paths")
+    b.add_argument("--format", choices=["png", "svg"], help="Default format when a job has no extension")
+    b.add_argument("--dpi", type=int, help="Output resolution (default: matplotlib's savefig.dpi)")
+    b.add_argument("--fast", action="store_true", default=None, help=FAST_HELP)
+    b.add_argument("--workers", type=int, help="Worker processes (default: one per CPU core, 1 = no pool)")
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+
+    # Headless rendering whenever we write files; must happen before pyplot is imported
+    if args.command == "batch" or args.output:
+        import matplotlib
+        matplotlib.use("Agg")
+
+    from charts import ChartData, NoDataError, render, save_figure
+    from instrumentation import span
+
+    data = ChartData()
+
+    if args.command == "batch":
+        from render_pool import render_parallel
+
+        jobs = [normalize_job(j, args.out_dir, args.format) for j in read_jobs(args.jobs)]
+        start = time.perf_counter()
+        with span("cli.batch", jobs=len(jobs), workers=args.workers):
+            report = render_parallel(jobs, workers=args.workers, data=data, dpi=args.dpi, fast=args.fast)
+        print_report(report, time.perf_counter() - start)
+        return 0 if all(r["ok"] for r in report) else 1
+
+    params = {k: v for k, v in vars(args).items() if k not in ("command", "output", "dpi", "fast")}
+    try:
+        fig = render(args.command, data, fast=args.fast, **params)
+    except NoDataError as e:
+        print(e)
+        return 1
+
+    if args.output:
+        print(f"✅ Saved {save_figure(fig, args.output, dpi=args.dpi)}")
+    else:
+        import matplotlib.pyplot as plt
+        plt.show()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
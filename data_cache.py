@@ -0,0 +1,227 @@
+#This file converts the raw CSVs in data/ into typed cache files. Run it directly to rebuild: python data_cache.py
+
+import os
+import json
+import pandas as pd
+
+from instrumentation import span
+
+try:
+    import pyarrow  # noqa: F401  (Parquet engine)
+    CACHE_FORMAT = "parquet"
+except ImportError:
+    CACHE_FORMAT = "pickle"  # pandas-native fallback, still keeps dtypes
+
+DATA_DIR = "data"
+CACHE_DIRNAME = "cache"
+
+# Bump this whenever the schemas below change, so old cache files get rebuilt
+SCHEMA_VERSION = 1
+
+# ================================
+# Table schemas
+# ================================
+# Every column not listed here stays a nullable string. "\N" always becomes a real null.
+TABLE_SCHEMAS = {
+    "races": {
+        "int": ["raceId", "year", "round", "circuitId"],
+        "category": ["name"],
+        "date": ["date", "fp1_date", "fp2_date", "fp3_date", "quali_date", "sprint_date"],
+    },
+    "results": {
+        "int": ["resultId", "raceId", "driverId", "constructorId", "number", "grid", "position",
+                "positionOrder", "laps", "milliseconds", "fastestLap", "rank", "statusId"],
+        "float": ["points", "fastestLapSpeed"],
+        "category": ["positionText"],
+    },
+    "qualifying": {
+        "int": ["qualifyId", "raceId", "driverId", "constructorId", "number", "position"],
+    },
+    "drivers": {
+        "int": ["driverId", "number"],
+        "category": ["forename", "surname", "code", "nationality"],
+        "date": ["dob"],
+    },
+    "constructors": {
+        "int": ["constructorId"],
+        "category": ["name", "nationality"],
+    },
+    "circuits": {
+        "int": ["circuitId", "alt"],
+        "float": ["lat", "lng"],
+        "category": ["name", "location", "country"],
+    },
+    "driver_standings": {
+        "int": ["driverStandingsId", "raceId", "driverId", "position", "wins"],
+        "float": ["points"],
+        "category": ["positionText"],
+    },
+    "constructor_standings": {
+        "int": ["constructorStandingsId", "raceId", "constructorId", "position", "wins"],
+        "float": ["points"],
+        "category": ["positionText"],
+    },
+    "status": {
+        "int": ["statusId"],
+        "category": ["status"],
+    },
+    # Optional tables, not shipped: sprint points (points_cube.py), laps and stops (lap_times.py)
+    "sprint_results": {
+        "int": ["resultId", "raceId", "driverId", "constructorId", "number", "grid", "position",
+                "positionOrder", "laps", "milliseconds", "fastestLap", "statusId"],
+        "float": ["points"],
+        "category": ["positionText"],
+    },
+    "lap_times": {
+        "int": ["raceId", "driverId", "lap", "position", "milliseconds"],
+    },
+    "pit_stops": {
+        "int": ["raceId", "driverId", "stop", "lap", "milliseconds"],
+    },
+}
+
+# Tables the original scripts read with on_bad_lines="skip"
+SKIP_BAD_LINES = {"races", "results"}
+
+# Too big to cache as one frame; read in chunks instead (lap_times.py keeps its own per-race cache)
+STREAM_ONLY = {"lap_times"}
+
+
+# ================================
+# CSV → typed DataFrame
+# ================================
+def csv_options(name: str) -> dict:
+    return {
+        "dtype": str,
+        "keep_default_na": False,
+        "na_values": ["\\N", ""],
+        "on_bad_lines": "skip" if name in SKIP_BAD_LINES else "error",
+    }
+
+
+def read_csv_typed(path: str, name: str) -> pd.DataFrame:
+    return apply_schema(pd.read_csv(path, **csv_options(name)), name)
+
+
+def iter_csv_typed(path: str, name: str, chunksize: int, usecols=None):
+    with pd.read_csv(path, chunksize=chunksize, usecols=usecols, **csv_options(name)) as reader:
+        for chunk in reader:
+            yield apply_schema(chunk, name)
+
+
+def apply_schema(df: pd.DataFrame, name: str) -> pd.DataFrame:
+    schema = TABLE_SCHEMAS.get(name, {})
+    for col in schema.get("int", []):
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype("Int64")
+    for col in schema.get("float", []):
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype("Float64")
+    for col in schema.get("date", []):
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], errors="coerce")
+    for col in schema.get("category", []):
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+
+    typed = set().union(*schema.values()) if schema else set()
+    for col in df.columns:
+        if col not in typed:
+            df[col] = df[col].astype("string")
+    return df
+
+
+# ================================
+# Cache bookkeeping
+# ================================
+def cache_paths(name: str, data_dir: str) -> tuple[str, str]:
+    cache_dir = os.path.join(data_dir, CACHE_DIRNAME)
+    ext = "parquet" if CACHE_FORMAT == "parquet" else "pkl"
+    return os.path.join(cache_dir, f"{name}.{ext}"), os.path.join(cache_dir, f"{name}.json")
+
+
+def source_fingerprint(path: str) -> dict:
+    st = os.stat(path)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def _is_fresh(src: str, manifest_path: str, cache_path: str) -> bool:
+    if not (os.path.exists(cache_path) and os.path.exists(manifest_path)):
+        return False
+    try:
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return False
+    return (
+        manifest.get("schema_version") == SCHEMA_VERSION
+        and manifest.get("format") == CACHE_FORMAT
+        and manifest.get("source") == source_fingerprint(src)
+    )
+
+
+def write_frame(df: pd.DataFrame, path: str) -> None:
+    # Write to a temp file first so a crashed run never leaves a half-written cache behind
+    tmp = path + ".tmp"
+    if CACHE_FORMAT == "parquet":
+        df.to_parquet(tmp, index=False)
+    else:
+        df.to_pickle(tmp)
+    os.replace(tmp, path)
+
+
+def read_frame(path: str) -> pd.DataFrame:
+    if CACHE_FORMAT == "parquet":
+        return pd.read_parquet(path)
+    return pd.read_pickle(path)
+
+
+def build_table(name: str, data_dir: str = DATA_DIR) -> pd.DataFrame:
+    src = os.path.join(data_dir, f"{name}.csv")
+    cache_path, manifest_path = cache_paths(name, data_dir)
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+
+    with span("data.csv_load", table=name):
+        df = read_csv_typed(src, name)
+    write_frame(df, cache_path)
+    with open(manifest_path, "w") as f:
+        json.dump({
+            "schema_version": SCHEMA_VERSION,
+            "format": CACHE_FORMAT,
+            "source": source_fingerprint(src),
+            "rows": len(df),
+        }, f, indent=2)
+    return df
+
+
+# ================================
+# Public loaders
+# ================================
+def load_table(name: str, data_dir: str = DATA_DIR) -> pd.DataFrame:
+    src = os.path.join(data_dir, f"{name}.csv")
+    if not os.path.exists(src):
+        raise FileNotFoundError(f"Source table not found: {src}")
+
+    cache_path, manifest_path = cache_paths(name, data_dir)
+    if _is_fresh(src, manifest_path, cache_path):
+        try:
+            with span("data.cache_load", table=name):
+                return read_frame(cache_path)
+        except Exception:
+            pass  # unreadable cache file → fall through and rebuild it
+    return build_table(name, data_dir)
+
+
+def load_tables(*names: str, data_dir: str = DATA_DIR) -> tuple[pd.DataFrame, ...]:
+    return tuple(load_table(n, data_dir) for n in names)
+
+
+def rebuild_cache(data_dir: str = DATA_DIR) -> None:
+    for name in TABLE_SCHEMAS:
+        if name not in STREAM_ONLY and os.path.exists(os.path.join(data_dir, f"{name}.csv")):
+            df = build_table(name, data_dir)
+            print(f"✅ Cached {name}: {len(df)} rows ({CACHE_FORMAT})")
+
+
+if __name__ == "__main__":
+    rebuild_cache()
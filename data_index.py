@@ -0,0 +1,111 @@
+#This file adds small (circuit, year, driver) indexes over the enriched qualifying/results tables.
+
+import functools
+
+import numpy as np
+import pandas as pd
+
+from data_cache import DATA_DIR
+from enriched_tables import load_lean
+from instrumentation import span
+
+# (year, circuitId) is packed into one sortable int64 key: year * CIRCUIT_SPAN + circuitId
+CIRCUIT_SPAN = 1_000_000
+
+
+def _int_column(df: pd.DataFrame, col: str) -> np.ndarray:
+    return df[col].to_numpy(dtype=np.int64, na_value=-1)
+
+
+# Lookups return row positions in the table's original order, same rows as the equivalent boolean mask.
+class TableIndex:
+    def __init__(self, df: pd.DataFrame):
+        self.df = df.reset_index(drop=True)
+        self.year = _int_column(self.df, "year")
+        self.circuit = _int_column(self.df, "circuitId")
+        self.race = _int_column(self.df, "raceId")
+        self.driver = _int_column(self.df, "driverId")
+
+        # Sorted index: positions ordered by (year, circuitId), searched with searchsorted
+        key = self.year * CIRCUIT_SPAN + self.circuit
+        self._order = np.argsort(key, kind="stable")
+        self._sorted_key = key[self._order]
+
+        # Hash indexes: value → positions
+        self._by_race = self.df.groupby("raceId").indices
+        self._by_driver = self.df.groupby("driverId").indices
+        self._by_circuit = self.df.groupby("circuitId").indices
+
+        # Small dimension tables for resolving names → ids
+        self.circuits = self.df[["circuitId", "name_circuit"]].drop_duplicates("circuitId").reset_index(drop=True)
+        self.drivers = (
+            self.df[["driverId", "forename", "surname", "code"]].drop_duplicates("driverId").reset_index(drop=True)
+        )
+
+    # ================================
+    # Name resolution (scans only the small dimension tables)
+    # ================================
+    def find_circuits(self, pattern: str, case: bool = False) -> list[int]:
+        names = self.circuits["name_circuit"].astype("string")
+        mask = names.str.contains(pattern, case=case, na=False)
+        return self.circuits.loc[mask.to_numpy(dtype=bool), "circuitId"].astype(int).tolist()
+
+    def find_drivers(self, names, key: str = "surname", case: bool = True) -> list[int]:
+        values = self.drivers[key].astype("string")
+        wanted = list(names)
+        if not case:
+            values = values.str.lower()
+            wanted = [n.lower() for n in wanted]
+        mask = values.isin(wanted)
+        return self.drivers.loc[mask.to_numpy(dtype=bool), "driverId"].astype(int).tolist()
+
+    # ================================
+    # Lookups
+    # ================================
+    def _key_range(self, lo_key: int, hi_key: int) -> np.ndarray:
+        lo = np.searchsorted(self._sorted_key, lo_key, side="left")
+        hi = np.searchsorted(self._sorted_key, hi_key, side="left")
+        return self._order[lo:hi]
+
+    def _from_hash(self, table: dict, values) -> np.ndarray:
+        parts = [table[v] for v in values if v in table]
+        return np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
+
+    def lookup(self, years=None, circuit_ids=None, race_ids=None, driver_ids=None) -> np.ndarray:
+        # Start from the most selective index available
+        if race_ids is not None:
+            pos = self._from_hash(self._by_race, race_ids)
+        elif years is not None and circuit_ids is not None:
+            parts = [
+                self._key_range(y * CIRCUIT_SPAN + c, y * CIRCUIT_SPAN + c + 1)
+                for y in years for c in circuit_ids
+            ]
+            pos = np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
+        elif years is not None:
+            parts = [self._key_range(y * CIRCUIT_SPAN, (y + 1) * CIRCUIT_SPAN) for y in years]
+            pos = np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
+        elif circuit_ids is not None:
+            pos = self._from_hash(self._by_circuit, circuit_ids)
+        elif driver_ids is not None:
+            pos = self._from_hash(self._by_driver, driver_ids)
+        else:
+            pos = np.arange(len(self.df))
+
+        # Narrow the (already small) candidate set by the remaining keys
+        if years is not None:
+            pos = pos[np.isin(self.year[pos], list(years))]
+        if circuit_ids is not None:
+            pos = pos[np.isin(self.circuit[pos], list(circuit_ids))]
+        if driver_ids is not None:
+            pos = pos[np.isin(self.driver[pos], list(driver_ids))]
+        return np.sort(pos)
+
+    def rows(self, **filters) -> pd.DataFrame:
+        return self.df.iloc[self.lookup(**filters)]
+
+
+@functools.lru_cache(maxsize=None)
+def get_index(kind: str, data_dir: str = DATA_DIR) -> TableIndex:
+    df = load_lean(kind, "charts", data_dir)
+    with span("data.index_build", table=kind, rows=len(df)):
+        return TableIndex(df)
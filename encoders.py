@@ -0,0 +1,145 @@
+#This file holds the append-only label encoders for drivers, constructors and circuits (model/encoders.json).
+#Run python encoders.py once to migrate the old *_encoder.pkl files.
+
+import os
+import sys
+import json
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import LabelEncoder
+
+ENCODERS_PATH = "model/encoders.json"
+ENCODERS_VERSION = 1
+
+# Column → legacy pickle, in the order the model's features use them
+LEGACY_PATHS = {
+    "driver_name": "model/driver_encoder.pkl",
+    "constructor_name": "model/constructor_encoder.pkl",
+    "circuitId": "model/circuit_encoder.pkl",
+}
+UNKNOWN_POLICIES = ("error", "mask")
+
+
+# First fit sorts like LabelEncoder (old models keep their codes); later labels are only ever appended.
+class StableLabelEncoder(LabelEncoder):
+    @classmethod
+    def from_encoder(cls, encoder: LabelEncoder) -> "StableLabelEncoder":
+        if isinstance(encoder, cls):
+            return encoder
+        stable = cls()
+        stable.classes_ = np.asarray(encoder.classes_)
+        return stable
+
+    @classmethod
+    def from_labels(cls, labels) -> "StableLabelEncoder":
+        stable = cls()
+        values = list(labels)
+        stable.classes_ = np.asarray(values, dtype=object if values and isinstance(values[0], str) else None)
+        return stable
+
+    def _index(self) -> pd.Index:
+        # Built once and reused; codes are append-only, so a length change is the only way it goes stale
+        index = getattr(self, "_lookup", None)
+        if index is None or len(index) != len(self.classes_):
+            index = self._lookup = pd.Index(self.classes_)
+        return index
+
+    def fit(self, y):
+        self.classes_ = np.sort(np.asarray(pd.unique(pd.Series(np.asarray(y)).dropna())))
+        self._lookup = None
+        return self
+
+    def fit_transform(self, y):
+        return self.fit(y).transform(y)
+
+    def extend(self, y) -> list:
+        values = pd.unique(pd.Series(np.asarray(y)).dropna())
+        new = [v for v, code in zip(values, self._index().get_indexer(values)) if code == -1]
+        if new:
+            # Fixed-width string arrays would truncate longer names, so text labels are kept as objects
+            dtype = object if self.classes_.dtype.kind in "OUS" else self.classes_.dtype
+            self.classes_ = np.concatenate([self.classes_.astype(dtype), np.asarray(new, dtype=dtype)])
+        return new
+
+    def lookup(self, y) -> np.ndarray:
+        return self._index().get_indexer(np.asarray(y)).astype(np.int64)
+
+    def transform(self, y):
+        values = np.asarray(y)
+        codes = self.lookup(values)
+        if (codes == -1).any():
+            unseen = pd.unique(values[codes == -1])
+            raise ValueError(f"y contains previously unseen labels: {', '.join(map(str, unseen))}")
+        return codes
+
+    def inverse_transform(self, y):
+        return self.classes_[np.asarray(y, dtype=np.int64)]
+
+
+# ================================
+# All three encoders as one artifact
+# ================================
+class EncoderSet:
+    def __init__(self, encoders: dict[str, LabelEncoder]):
+        self.encoders = {col: StableLabelEncoder.from_encoder(enc) for col, enc in encoders.items()}
+
+    def __getitem__(self, column: str) -> StableLabelEncoder:
+        return self.encoders[column]
+
+    def __iter__(self):
+        return iter(self.encoders)
+
+    @classmethod
+    def fit(cls, df: pd.DataFrame, columns=tuple(LEGACY_PATHS)) -> "EncoderSet":
+        return cls({col: StableLabelEncoder().fit(df[col]) for col in columns})
+
+    # unknown="error" raises on unseen labels, unknown="mask" gives them -1 and known=False.
+    def encode(self, column: str, values, unknown: str = "error") -> tuple[np.ndarray, np.ndarray]:
+        if unknown not in UNKNOWN_POLICIES:
+            raise ValueError(f"Unknown-label policy must be one of {UNKNOWN_POLICIES}, got '{unknown}'")
+        codes = self.encoders[column].lookup(values)
+        known = codes != -1
+        if unknown == "error" and not known.all():
+            unseen = pd.unique(np.asarray(values)[~known])
+            raise ValueError(f"Unknown {column} label(s): {', '.join(map(str, unseen))}")
+        return codes, known
+
+    def save(self, path: str = ENCODERS_PATH) -> None:
+        payload = {
+            "version": ENCODERS_VERSION,
+            # Labels listed in code order: a label's position is its code
+            "columns": {col: enc.classes_.tolist() for col, enc in self.encoders.items()},
+        }
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False, indent=1)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str = ENCODERS_PATH) -> "EncoderSet":
+        if not os.path.exists(path):
+            # Older checkouts only have the three pickles
+            if path == ENCODERS_PATH and all(os.path.exists(p) for p in LEGACY_PATHS.values()):
+                return cls.from_legacy()
+            raise FileNotFoundError(f"{path} not found. Run prepare_qualifying_data.py (or python encoders.py to migrate).")
+        with open(path, encoding="utf-8") as f:
+            payload = json.load(f)
+        if payload.get("version") != ENCODERS_VERSION:
+            raise ValueError(f"{path} has encoder format {payload.get('version')}, expected {ENCODERS_VERSION}")
+        return cls({col: StableLabelEncoder.from_labels(labels) for col, labels in payload["columns"].items()})
+
+    @classmethod
+    def from_legacy(cls, paths: dict[str, str] = LEGACY_PATHS) -> "EncoderSet":
+        import joblib
+        return cls({col: joblib.load(p) for col, p in paths.items()})
+
+
+if __name__ == "__main__":
+    missing = [p for p in LEGACY_PATHS.values() if not os.path.exists(p)]
+    if missing:
+        print(f"❌ Nothing to migrate, missing: {', '.join(missing)}")
+        sys.exit(1)
+    EncoderSet.from_legacy().save()
+    print(f"✅ Encoders migrated to {ENCODERS_PATH} (the old .pkl files can be deleted)")
@@ -0,0 +1,242 @@
+#This file builds the pre-joined enriched_qualifying / enriched_results tables the graph scripts read, cached in data/cache/.
+
+import os
+import json
+
+import numpy as np
+import pandas as pd
+
+from data_cache import (
+    DATA_DIR, CACHE_FORMAT, cache_paths, source_fingerprint, write_frame, read_frame, load_table,
+)
+from instrumentation import span
+from timing import add_qualifying_times, add_race_times
+
+# Bump this whenever the column lists below change
+ENRICHED_VERSION = 2
+
+# Source tables each enriched table is built from (used for staleness checks)
+SOURCES = ["races", "drivers", "constructors", "circuits"]
+
+# Only the columns the scripts actually use.
+# Names follow the old merge suffixes: "name" is the race, "name_constructor" / "name_circuit" the others.
+RACE_COLUMNS = ["raceId", "year", "round", "circuitId", "name"]
+DRIVER_COLUMNS = ["driverId", "forename", "surname", "code"]
+CONSTRUCTOR_COLUMNS = ["constructorId", "name"]
+CIRCUIT_COLUMNS = ["circuitId", "name"]
+
+ENRICHED_TABLES = {
+    "qualifying": {
+        "fact": "qualifying",
+        "columns": ["raceId", "driverId", "constructorId", "position", "q1", "q2", "q3"],
+        # Raw time strings are parsed to integer ms at build time, then dropped
+        "derive": add_qualifying_times,
+        "drop": ["q1", "q2", "q3"],
+    },
+    "results": {
+        "fact": "results",
+        "columns": ["raceId", "driverId", "constructorId", "grid", "positionOrder", "positionText",
+                    "points", "statusId", "time", "fastestLapTime"],
+        "derive": add_race_times,
+        "drop": ["time", "fastestLapTime"],
+    },
+}
+
+
+# ================================
+# Build
+# ================================
+def _source_fingerprints(fact: str, data_dir: str) -> dict:
+    return {
+        name: source_fingerprint(os.path.join(data_dir, f"{name}.csv"))
+        for name in [fact] + SOURCES
+    }
+
+
+def load_dimensions(data_dir: str = DATA_DIR) -> dict:
+    return {
+        "races": load_table("races", data_dir)[RACE_COLUMNS],
+        "drivers": load_table("drivers", data_dir)[DRIVER_COLUMNS],
+        "constructors": load_table("constructors", data_dir)[CONSTRUCTOR_COLUMNS].rename(columns={"name": "name_constructor"}),
+        "circuits": load_table("circuits", data_dir)[CIRCUIT_COLUMNS].rename(columns={"name": "name_circuit"}),
+    }
+
+
+def join_dimensions(fact_df, dims: dict):
+    df = fact_df.merge(dims["races"], on="raceId", how="left")
+    df = df.merge(dims["drivers"], on="driverId", how="left")
+    df = df.merge(dims["constructors"], on="constructorId", how="left")
+    df = df.merge(dims["circuits"], on="circuitId", how="left")
+    return df
+
+
+def _join(fact_df, data_dir: str):
+    return join_dimensions(fact_df, load_dimensions(data_dir))
+
+
+def build_enriched(kind: str, data_dir: str = DATA_DIR):
+    spec = ENRICHED_TABLES[kind]
+    fact = load_table(spec["fact"], data_dir)[spec["columns"]]
+    with span("data.merge", table=kind):
+        df = _join(fact, data_dir)
+    with span("data.parse_times", table=kind):
+        df = spec["derive"](df).drop(columns=spec["drop"])
+
+    cache_path, manifest_path = cache_paths(f"enriched_{kind}", data_dir)
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    write_frame(df, cache_path)
+    with open(manifest_path, "w") as f:
+        json.dump({
+            "enriched_version": ENRICHED_VERSION,
+            "format": CACHE_FORMAT,
+            "sources": _source_fingerprints(spec["fact"], data_dir),
+            "rows": len(df),
+        }, f, indent=2)
+    return df
+
+
+def is_stale(kind: str, data_dir: str = DATA_DIR) -> bool:
+    cache_path, manifest_path = cache_paths(f"enriched_{kind}", data_dir)
+    if not (os.path.exists(cache_path) and os.path.exists(manifest_path)):
+        return True
+    try:
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return True
+    return (
+        manifest.get("enriched_version") != ENRICHED_VERSION
+        or manifest.get("format") != CACHE_FORMAT
+        or manifest.get("sources") != _source_fingerprints(ENRICHED_TABLES[kind]["fact"], data_dir)
+    )
+
+
+# ================================
+# Public loaders
+# ================================
+def load_enriched(kind: str, data_dir: str = DATA_DIR):
+    if kind not in ENRICHED_TABLES:
+        raise ValueError(f"Unknown enriched table '{kind}'. Choose from: {', '.join(ENRICHED_TABLES)}")
+
+    if not is_stale(kind, data_dir):
+        cache_path, _ = cache_paths(f"enriched_{kind}", data_dir)
+        try:
+            with span("data.cache_load", table=f"enriched_{kind}"):
+                return read_frame(cache_path)
+        except Exception:
+            pass  # unreadable cache file → rebuild below
+    return build_enriched(kind, data_dir)
+
+
+# ================================
+# Lean loading: declared columns per use case, downcast dtypes
+# ================================
+# Columns each consumer reads, per table. A use case missing for a table means "every enriched column".
+COLUMN_SETS = {
+    "charts": {},
+    "training": {
+        "qualifying": ["raceId", "year", "round", "circuitId", "surname", "name_constructor", "position"],
+        "results": ["year", "surname", "name_constructor"],
+    },
+    "features": {
+        "qualifying": ["raceId", "driverId", "constructorId", "year", "round", "circuitId", "position",
+                       "surname", "name_constructor"],
+    },
+    "points": {
+        "results": ["raceId", "year", "round", "driverId", "constructorId", "points"],
+    },
+}
+
+INT_DOWNCASTS = ["int8", "int16", "int32"]
+
+
+def downcast(df: pd.DataFrame) -> pd.DataFrame:
+    out = {}
+    for col in df.columns:
+        s = df[col]
+        if pd.api.types.is_integer_dtype(s.dtype) and s.notna().any():
+            lo, hi = int(s.min()), int(s.max())
+            nullable = isinstance(s.dtype, pd.api.extensions.ExtensionDtype)
+            for dtype in INT_DOWNCASTS:
+                info = np.iinfo(dtype)
+                if info.min <= lo and hi <= info.max:
+                    if np.dtype(dtype).itemsize < s.dtype.itemsize:
+                        s = s.astype(dtype.capitalize() if nullable else dtype)
+                    break
+        elif pd.api.types.is_string_dtype(s.dtype) and not isinstance(s.dtype, pd.CategoricalDtype):
+            s = s.astype("category")
+        out[col] = s
+    return pd.DataFrame(out, index=df.index)
+
+
+def lean_columns(kind: str, use_case: str | None) -> list[str] | None:
+    if use_case is None:
+        return None
+    if use_case not in COLUMN_SETS:
+        raise ValueError(f"Unknown use case '{use_case}'. Choose from: {', '.join(COLUMN_SETS)}")
+    return COLUMN_SETS[use_case].get(kind)
+
+
+# Downcast ints keep their values but not their width: cast up before cumsum-style arithmetic.
+def load_lean(kind: str, use_case: str | None = None, data_dir: str = DATA_DIR):
+    with span("data.load_lean", table=kind, use_case=use_case):
+        df = load_enriched(kind, data_dir)
+        columns = lean_columns(kind, use_case)
+        if columns is not None:
+            df = df[columns]
+        return downcast(df)
+
+
+def memory_mb(df: pd.DataFrame) -> float:
+    return round(df.memory_usage(deep=True).sum() / (1024 * 1024), 2)
+
+
+def wide_merge(kind: str, data_dir: str = DATA_DIR) -> pd.DataFrame:
+    def raw(name):
+        return pd.read_csv(os.path.join(data_dir, f"{name}.csv"), on_bad_lines="skip")
+
+    df = raw(ENRICHED_TABLES[kind]["fact"]).merge(raw("races"), on="raceId", how="left")
+    df = df.merge(raw("drivers"), on="driverId", how="left", suffixes=("", "_driver"))
+    df = df.merge(raw("constructors"), on="constructorId", how="left", suffixes=("", "_constructor"))
+    return df.merge(raw("circuits"), on="circuitId", how="left", suffixes=("", "_circuit"))
+
+
+def memory_report(data_dir: str = DATA_DIR) -> pd.DataFrame:
+    rows = []
+    for kind in ENRICHED_TABLES:
+        wide = wide_merge(kind, data_dir)
+        rows.append({"table": kind, "load": "wide merge", "columns": wide.shape[1], "rows": len(wide),
+                     "memory_mb": memory_mb(wide)})
+        del wide
+        enriched = load_enriched(kind, data_dir)
+        rows.append({"table": kind, "load": "enriched", "columns": enriched.shape[1], "rows": len(enriched),
+                     "memory_mb": memory_mb(enriched)})
+        for use_case, tables in COLUMN_SETS.items():
+            if use_case != "charts" and kind not in tables:
+                continue
+            lean = load_lean(kind, use_case, data_dir)
+            rows.append({"table": kind, "load": f"lean:{use_case}", "columns": lean.shape[1], "rows": len(lean),
+                         "memory_mb": memory_mb(lean)})
+    report = pd.DataFrame(rows)
+    wide_mb = report.groupby("table")["memory_mb"].transform("first")
+    report["vs_wide"] = (report["memory_mb"] / wide_mb).map("{:.0%}".format)
+    return report
+
+
+def load_enriched_qualifying(data_dir: str = DATA_DIR):
+    return load_enriched("qualifying", data_dir)
+
+
+def load_enriched_results(data_dir: str = DATA_DIR):
+    return load_enriched("results", data_dir)
+
+
+if __name__ == "__main__":
+    import sys
+
+    if "--memory" in sys.argv[1:]:
+        print(memory_report().to_string(index=False))
+        raise SystemExit(0)
+    for kind in ENRICHED_TABLES:
+        df = build_enriched(kind)
+        print(f"✅ Built enriched_{kind}: {len(df)} rows, {len(df.columns)} columns")
@@ -0,0 +1,250 @@
+#This file builds and caches per-(raceId, driverId) model features in data/cache/features.parquet, appending new races only.
+#Usage: python feature_store.py [--rebuild]
+
+import os
+import json
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from data_cache import DATA_DIR, CACHE_FORMAT, cache_paths, load_table, read_frame, source_fingerprint, write_frame
+from enriched_tables import load_lean
+from instrumentation import span
+
+FEATURES_VERSION = 1
+ROLLING_WINDOW = 5
+# Stand-in for "no history yet" (debut, first visit to a circuit): roughly a midfield grid slot
+DEBUT_POSITION = 15.0
+
+KEY_COLUMNS = ["raceId", "driverId", "constructorId", "year", "round", "circuitId"]
+FEATURE_COLUMNS = [
+    "driver_points_before", "constructor_points_before",
+    "quali_pos_avg", "teammate_gap_avg",
+    "circuit_pos_avg", "circuit_starts",
+]
+SOURCES = ["qualifying", "races", "driver_standings", "constructor_standings"]
+
+
+# ================================
+# Inputs
+# ================================
+def _base(data_dir: str) -> pd.DataFrame:
+    q = load_lean("qualifying", "features", data_dir)
+    q = q.loc[q["position"].notna(), KEY_COLUMNS + ["position", "surname", "name_constructor"]]
+    q = q.astype({c: "int64" for c in KEY_COLUMNS}).astype({"position": "float64"})
+    return q.sort_values(["year", "round", "position"], kind="stable").reset_index(drop=True)
+
+
+def _standings(kind: str, data_dir: str) -> pd.DataFrame:
+    key = "driverId" if kind == "driver" else "constructorId"
+    races = load_table("races", data_dir)[["raceId", "year", "round"]].dropna()
+    s = load_table(f"{kind}_standings", data_dir)[["raceId", key, "points"]].dropna(subset=["raceId", key])
+    s = s.merge(races, on="raceId", how="inner")
+    return s.astype({key: "int64", "year": "int64", "round": "int64", "points": "float64"})
+
+
+def _points_before(rows: pd.DataFrame, standings: pd.DataFrame, key: str) -> np.ndarray:
+    # Latest standings strictly before this round, same season; nothing yet → 0 points
+    left = rows[[key, "year", "round"]].reset_index().sort_values("round", kind="stable")
+    right = standings[[key, "year", "round", "points"]].sort_values("round", kind="stable")
+    merged = pd.merge_asof(left, right, on="round", by=[key, "year"], allow_exact_matches=False)
+    return merged.set_index("index")["points"].reindex(rows.index).fillna(0.0).to_numpy()
+
+
+def _past_rolling_mean(values: pd.Series, groups: pd.Series, window: int) -> pd.Series:
+    # Mean of the previous `window` values in each group, excluding the current row
+    shifted = values.groupby(groups).shift(1)
+    rolled = shifted.groupby(groups).rolling(window, min_periods=1).mean()
+    return rolled.reset_index(level=0, drop=True).reindex(values.index)
+
+
+# ================================
+# Feature computation
+# ================================
+def compute_features(base: pd.DataFrame, driver_standings: pd.DataFrame,
+                     constructor_standings: pd.DataFrame, window: int = ROLLING_WINDOW) -> pd.DataFrame:
+    df = base[KEY_COLUMNS + ["position"]].copy()
+
+    df["driver_points_before"] = _points_before(df, driver_standings, "driverId")
+    df["constructor_points_before"] = _points_before(df, constructor_standings, "constructorId")
+
+    df["quali_pos_avg"] = _past_rolling_mean(df["position"], df["driverId"], window).fillna(DEBUT_POSITION)
+
+    # Gap to the average of the other car(s) of the same team in the same session
+    team = df.groupby(["raceId", "constructorId"])["position"]
+    others = team.transform("count") - 1
+    gap = df["position"] - (team.transform("sum") - df["position"]) / others.where(others > 0)
+    df["teammate_gap_avg"] = _past_rolling_mean(gap, df["driverId"], window).fillna(0.0)
+
+    at_circuit = df.groupby(["driverId", "circuitId"])["position"]
+    starts = at_circuit.cumcount()
+    df["circuit_starts"] = starts.astype("int64")
+    df["circuit_pos_avg"] = ((at_circuit.cumsum() - df["position"]) / starts.where(starts > 0)).fillna(DEBUT_POSITION)
+
+    return df[KEY_COLUMNS + FEATURE_COLUMNS]
+
+
+# ================================
+# Store
+# ================================
+def _store_paths(data_dir: str) -> tuple[str, str]:
+    return cache_paths("features", data_dir)
+
+
+def _fingerprints(data_dir: str) -> dict:
+    return {name: source_fingerprint(os.path.join(data_dir, f"{name}.csv")) for name in SOURCES}
+
+
+def _read_store(data_dir: str, window: int) -> pd.DataFrame | None:
+    path, manifest_path = _store_paths(data_dir)
+    if not (os.path.exists(path) and os.path.exists(manifest_path)):
+        return None
+    try:
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        if (manifest.get("features_version") != FEATURES_VERSION or manifest.get("window") != window
+                or manifest.get("format") != CACHE_FORMAT):
+            return None
+        return read_frame(path)
+    except Exception:
+        return None  # unreadable store → rebuild
+
+
+def _write_store(df: pd.DataFrame, data_dir: str, window: int) -> None:
+    path, manifest_path = _store_paths(data_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    write_frame(df, path)
+    with open(manifest_path, "w") as f:
+        json.dump({
+            "features_version": FEATURES_VERSION,
+            "window": window,
+            "format": CACHE_FORMAT,
+            "sources": _fingerprints(data_dir),
+            "rows": len(df),
+        }, f, indent=2)
+
+
+def update_features(data_dir: str = DATA_DIR, window: int = ROLLING_WINDOW, rebuild: bool = False) -> tuple[pd.DataFrame, dict]:
+    base = _base(data_dir)
+    stored = None if rebuild else _read_store(data_dir, window)
+
+    if stored is not None:
+        _, manifest_path = _store_paths(data_dir)
+        with open(manifest_path) as f:
+            if json.load(f).get("sources") == _fingerprints(data_dir):
+                return stored, {"mode": "fresh", "races": 0}
+
+    known = set(stored["raceId"].unique().tolist()) if stored is not None else set()
+    current = set(base["raceId"].unique().tolist())
+    driver_standings = _standings("driver", data_dir)
+    constructor_standings = _standings("constructor", data_dir)
+
+    if stored is None or not known < current:
+        # First build, no new races (so an existing race or its standings changed), or races
+        # disappeared → recompute everything
+        with span("features.compute", mode="full", rows=len(base)):
+            features = compute_features(base, driver_standings, constructor_standings, window)
+        info = {"mode": "full", "races": len(current)}
+    else:
+        new_races = current - known
+        # Only the new races' rows are computed, from the history of the drivers in them
+        # (every race they took part in, so teammate gaps in those races are complete)
+        drivers = base.loc[base["raceId"].isin(new_races), "driverId"].unique()
+        history = base[base["raceId"].isin(base.loc[base["driverId"].isin(drivers), "raceId"])]
+        with span("features.compute", mode="incremental", rows=len(history)):
+            new = compute_features(history.reset_index(drop=True), driver_standings, constructor_standings, window)
+        new = new[new["raceId"].isin(new_races)]
+        features = pd.concat([stored, new], ignore_index=True) if len(new) else stored
+        info = {"mode": "incremental", "races": len(new_races)}
+
+    _write_store(features, data_dir, window)
+    return features, info
+
+
+def load_features(data_dir: str = DATA_DIR, window: int = ROLLING_WINDOW) -> pd.DataFrame:
+    return update_features(data_dir, window)[0]
+
+
+# ================================
+# Training / prediction helpers
+# ================================
+# Rows whose driver/constructor/circuit the encoders don't know are left out.
+def training_frame(encoders, data_dir: str = DATA_DIR) -> pd.DataFrame:
+    q = load_lean("qualifying", "features", data_dir)
+    q = q.loc[q["position"].notna(), ["raceId", "driverId", "surname", "name_constructor", "circuitId", "year", "position"]]
+    q = q.rename(columns={"surname": "driver_name", "name_constructor": "constructor_name"})
+    q = q.merge(load_features(data_dir)[["raceId", "driverId"] + FEATURE_COLUMNS],
+                on=["raceId", "driverId"], how="left", validate="one_to_one")
+
+    known = np.ones(len(q), dtype=bool)
+    for col in ["driver_name", "constructor_name", "circuitId"]:
+        codes, ok = encoders.encode(col, q[col].to_numpy(), unknown="mask")
+        q[col] = codes
+        known &= ok
+    q = q.loc[known].drop(columns=["raceId", "driverId"]).reset_index(drop=True)
+    return q.astype({"year": "int64", "position": "int64"})
+
+
+class UpcomingFeatures:
+    def __init__(self, data_dir: str = DATA_DIR, window: int = ROLLING_WINDOW):
+        base = _base(data_dir)
+        # The most recent driver/team with each name (e.g. Max, not Jos, Verstappen)
+        self.driver_ids = base.drop_duplicates("surname", keep="last").set_index("surname")["driverId"]
+        self.constructor_ids = (base.drop_duplicates("name_constructor", keep="last")
+                                .set_index("name_constructor")["constructorId"])
+
+        self.recent_pos = base.groupby("driverId").tail(window).groupby("driverId")["position"].mean()
+        team = base.groupby(["raceId", "constructorId"])["position"]
+        others = team.transform("count") - 1
+        gaps = base.assign(gap=base["position"] - (team.transform("sum") - base["position"]) / others.where(others > 0))
+        gaps = gaps.dropna(subset=["gap"])
+        self.recent_gap = gaps.groupby("driverId").tail(window).groupby("driverId")["gap"].mean()
+        self.circuit_hist = base.groupby(["driverId", "circuitId"])["position"].agg(["mean", "count"])
+
+        self.driver_points = self._final_points(_standings("driver", data_dir), "driverId")
+        self.constructor_points = self._final_points(_standings("constructor", data_dir), "constructorId")
+
+    @staticmethod
+    def _final_points(standings: pd.DataFrame, key: str) -> pd.Series:
+        # Points after the latest round of each season, indexed by (year, id)
+        last = standings.sort_values(["year", "round"]).drop_duplicates(["year", key], keep="last")
+        return last.set_index(["year", key])["points"]
+
+    def frame(self, grid: pd.DataFrame, circuit_ids, years) -> pd.DataFrame:
+        d_ids = grid["driver_name"].map(self.driver_ids).to_numpy()
+        c_ids = grid["constructor_name"].map(self.constructor_ids).to_numpy()
+        quali_pos_avg = pd.Series(d_ids).map(self.recent_pos).fillna(DEBUT_POSITION).to_numpy()
+        teammate_gap_avg = pd.Series(d_ids).map(self.recent_gap).fillna(0.0).to_numpy()
+
+        blocks = []
+        for circuit in circuit_ids:
+            hist = self.circuit_hist.reindex(pd.MultiIndex.from_arrays([d_ids, np.full(len(d_ids), int(circuit))]))
+            for year in years:
+                year_index = np.full(len(d_ids), int(year))
+                blocks.append(pd.DataFrame({
+                    "driver_points_before": self.driver_points.reindex(
+                        pd.MultiIndex.from_arrays([year_index, d_ids])).fillna(0.0).to_numpy(),
+                    "constructor_points_before": self.constructor_points.reindex(
+                        pd.MultiIndex.from_arrays([year_index, c_ids])).fillna(0.0).to_numpy(),
+                    "quali_pos_avg": quali_pos_avg,
+                    "teammate_gap_avg": teammate_gap_avg,
+                    "circuit_pos_avg": hist["mean"].fillna(DEBUT_POSITION).to_numpy(),
+                    "circuit_starts": hist["count"].fillna(0).astype("int64").to_numpy(),
+                }))
+        if not blocks:
+            return pd.DataFrame(columns=FEATURE_COLUMNS)
+        return pd.concat(blocks, ignore_index=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build or update the cached feature store")
+    parser.add_argument("--rebuild", action="store_true", help="Recompute every row")
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    args = parser.parse_args()
+
+    features, info = update_features(args.data_dir, rebuild=args.rebuild)
+    if info["mode"] == "fresh":
+        print(f"✅ Feature store is up to date ({len(features)} rows)")
+    else:
+        print(f"✅ Feature store {info['mode']} update: {info['races']} race(s), {len(features)} rows total")
@@ -0,0 +1,163 @@
+#This file appends new race rounds to model/cleaned_qualifying.csv without re-running prepare_qualifying_data.py.
+#Usage: python ingest_round.py --init (once), then --latest or --race-id 1121,1122 [--keep-grid]
+
+import os
+import sys
+import json
+import argparse
+
+import pandas as pd
+
+from data_cache import DATA_DIR
+from encoders import ENCODERS_PATH, EncoderSet
+from enriched_tables import load_lean
+from instrumentation import span
+from qualifying_predictor import GRID_PATH
+
+CLEANED_PATH = "model/cleaned_qualifying.csv"
+LEDGER_PATH = "model/ingested_races.json"
+
+CLEANED_COLUMNS = ["driver_name", "constructor_name", "circuitId", "year", "position"]
+
+
+# ================================
+# Ledger of ingested races
+# ================================
+def count_rows(path: str) -> int:
+    with open(path, "rb") as f:
+        return max(sum(1 for _ in f) - 1, 0)
+
+
+def read_ledger(path: str = LEDGER_PATH) -> dict:
+    if not os.path.exists(path):
+        raise FileNotFoundError(
+            f"{path} not found. Run 'python ingest_round.py --init' once after prepare_qualifying_data.py."
+        )
+    with open(path) as f:
+        return json.load(f)
+
+
+def write_ledger(race_ids, rows: int, path: str = LEDGER_PATH) -> None:
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump({"race_ids": sorted(int(r) for r in race_ids), "rows": rows}, f, indent=2)
+    os.replace(tmp, path)
+
+
+# ================================
+# Cleaning (same rules as prepare_qualifying_data.py)
+# ================================
+def clean_rows(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.rename(columns={"surname": "driver_name", "name_constructor": "constructor_name"})
+    df = df[["raceId", "year", "round"] + [c for c in CLEANED_COLUMNS if c != "year"]].copy()
+    df["position"] = pd.to_numeric(df["position"], errors="coerce")
+    return df.dropna(subset=["position"])
+
+
+def latest_grid(rows: pd.DataFrame) -> pd.DataFrame:
+    last = rows.sort_values(["year", "round"]).iloc[-1]
+    race = rows[rows["raceId"] == last["raceId"]].sort_values("position")
+    return race[["driver_name", "constructor_name"]].drop_duplicates().reset_index(drop=True)
+
+
+# ================================
+# Ingest
+# ================================
+def init_ledger(data_dir: str = DATA_DIR) -> int:
+    if not os.path.exists(CLEANED_PATH):
+        raise FileNotFoundError(f"{CLEANED_PATH} not found. Run prepare_qualifying_data.py first.")
+    race_ids = load_lean("qualifying", "training", data_dir)["raceId"].dropna().unique()
+    write_ledger(race_ids, count_rows(CLEANED_PATH))
+    return len(race_ids)
+
+
+def ingest(race_ids=None, data_dir: str = DATA_DIR, refresh_grid: bool = True) -> dict:
+    ledger = read_ledger()
+    rows_on_disk = count_rows(CLEANED_PATH)
+    if rows_on_disk != ledger["rows"]:
+        # e.g. a previous run died between appending rows and updating the ledger
+        raise RuntimeError(
+            f"{CLEANED_PATH} has {rows_on_disk} rows but the ledger expects {ledger['rows']}. "
+            "Re-run prepare_qualifying_data.py and 'ingest_round.py --init'."
+        )
+
+    quali = load_lean("qualifying", "training", data_dir)
+    done = set(ledger["race_ids"])
+    if race_ids is None:
+        wanted = set(quali["raceId"].dropna().unique().tolist()) - done
+    else:
+        wanted = set(race_ids)
+        already = sorted(wanted & done)
+        if already:
+            raise ValueError(f"Race(s) already ingested: {', '.join(map(str, already))}")
+        missing = sorted(wanted - set(quali["raceId"].dropna().unique().tolist()))
+        if missing:
+            raise ValueError(f"No qualifying rows in {data_dir}/qualifying.csv for race(s): {', '.join(map(str, missing))}")
+
+    summary = {"races": sorted(wanted), "rows": 0, "new_labels": {}, "grid": None}
+    if not wanted:
+        return summary
+
+    rows = clean_rows(quali[quali["raceId"].isin(wanted)])
+    rows = rows.sort_values(["year", "round", "position"], kind="stable")
+
+    # Extend the encoders (append-only) and encode the new rows
+    with span("ingest.encode", races=len(wanted), rows=len(rows)):
+        encoded = rows[CLEANED_COLUMNS].copy()
+        encoders = EncoderSet.load()
+        for col in encoders:
+            new = encoders[col].extend(rows[col])
+            if new:
+                summary["new_labels"][col] = [str(v) for v in new]
+            encoded[col] = encoders[col].transform(rows[col])
+
+    # Encoders first: rows on disk must never reference codes that aren't saved yet
+    with span("ingest.write", rows=len(encoded)):
+        encoders.save(ENCODERS_PATH)
+        encoded.to_csv(CLEANED_PATH, mode="a", header=False, index=False)
+        write_ledger(done | wanted, rows_on_disk + len(encoded))
+    summary["rows"] = len(encoded)
+
+    if refresh_grid:
+        grid = latest_grid(rows)
+        grid.to_csv(GRID_PATH, index=False)
+        summary["grid"] = len(grid)
+    return summary
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Append new race rounds to the cleaned qualifying dataset")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--race-id", type=lambda s: [int(r) for r in s.split(",") if r.strip()],
+                       help="Comma-separated raceIds to ingest")
+    group.add_argument("--latest", action="store_true", help="Ingest every race not ingested yet")
+    group.add_argument("--init", action="store_true", help="Mark every race currently in the data as ingested")
+    parser.add_argument("--keep-grid", action="store_true", help=f"Don't refresh {GRID_PATH}")
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    args = parser.parse_args(argv)
+
+    try:
+        if args.init:
+            n = init_ledger(args.data_dir)
+            print(f"✅ Ledger created: {n} race(s) marked as ingested in {LEDGER_PATH}")
+            return 0
+        summary = ingest(args.race_id, args.data_dir, refresh_grid=not args.keep_grid)
+    except (FileNotFoundError, ValueError, RuntimeError) as e:
+        print(f"❌ {e}")
+        return 1
+
+    if not summary["races"]:
+        print("✅ Nothing to ingest, every race is already in the dataset")
+        return 0
+    print(f"✅ Ingested {len(summary['races'])} race(s), {summary['rows']} row(s) appended to {CLEANED_PATH}")
+    for col, labels in summary["new_labels"].items():
+        print(f"🆕 New {col} label(s): {', '.join(labels)}")
+    if summary["grid"] is not None:
+        print(f"✅ {GRID_PATH} refreshed from the latest round ({summary['grid']} pairs)")
+    if summary["new_labels"]:
+        print("⚠️ The current model has never seen the new labels; retrain to use them.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
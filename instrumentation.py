@@ -0,0 +1,182 @@
+#This file is the stage-level tracing (wall time, CPU time, peak RSS), off unless F1_TRACE=1 or F1_TRACE=<file.jsonl>.
+
+import os
+import sys
+import json
+import time
+import atexit
+import functools
+import threading
+
+try:
+    import resource
+except ImportError:  # Windows: no getrusage, peak RSS is reported as 0
+    resource = None
+
+TRACE_ENV = "F1_TRACE"
+
+
+def peak_rss_mb() -> float:
+    if resource is None:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+# ================================
+# Tracer
+# ================================
+class Tracer:
+    def __init__(self, target: str | None):
+        self.enabled = bool(target) and target.lower() not in ("0", "false", "off", "no")
+        self.path = target if self.enabled and target not in ("1", "true", "on", "yes", "stderr") else None
+        self.totals = {}  # span name → [count, wall_ms, cpu_ms, peak_rss_mb, depth], in first-seen order
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._summary_registered = False
+
+    def _stack(self) -> list[str]:
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    def emit(self, record: dict) -> None:
+        line = json.dumps(record, default=str)
+        with self._lock:
+            if self.path:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(line + "\n")
+            else:
+                print(line, file=sys.stderr)
+
+    def open(self, name: str, depth: int) -> None:
+        # Summary rows appear in the order stages start, so children print under their parent
+        with self._lock:
+            if not self._summary_registered:
+                atexit.register(self.print_summary)
+                self._summary_registered = True
+            self.totals.setdefault(name, [0, 0.0, 0.0, 0.0, depth])
+
+    def record(self, name: str, wall_ms: float, cpu_ms: float, peak: float) -> None:
+        with self._lock:
+            total = self.totals[name]
+            total[0] += 1
+            total[1] += wall_ms
+            total[2] += cpu_ms
+            total[3] = max(total[3], peak)
+
+    def print_summary(self) -> None:
+        if not self.totals:
+            return
+        print(f"\n⏱️ Trace summary (pid {os.getpid()})", file=sys.stderr)
+        print(f"   {'stage':<40}{'calls':>6}{'wall ms':>11}{'cpu ms':>11}{'peak RSS MB':>13}", file=sys.stderr)
+        for name, (count, wall, cpu, peak, depth) in self.totals.items():
+            if not count:
+                continue  # opened but never closed (e.g. a stage cut short by an exception)
+            label = "  " * depth + name
+            print(f"   {label:<40}{count:>6}{wall:>11.1f}{cpu:>11.1f}{peak:>13.1f}", file=sys.stderr)
+
+
+_tracer = Tracer(os.environ.get(TRACE_ENV))
+
+
+def configure(target: str | None) -> Tracer:
+    global _tracer
+    _tracer = Tracer(target)
+    return _tracer
+
+
+def enabled() -> bool:
+    return _tracer.enabled
+
+
+# ================================
+# Spans
+# ================================
+class _Span:
+    __slots__ = ("name", "attrs", "tracer", "push", "depth", "parent", "_wall", "_cpu", "_peak")
+
+    def __init__(self, tracer: Tracer, name: str, attrs: dict, push: bool = True):
+        # push=False: a leaf that never becomes the parent of other spans (used by stages)
+        self.tracer, self.name, self.attrs, self.push = tracer, name, attrs, push
+
+    def __enter__(self) -> "_Span":
+        stack = self.tracer._stack()
+        self.parent = stack[-1] if stack else None
+        self.depth = len(stack)
+        if self.push:
+            stack.append(self.name)
+        self.tracer.open(self.name, self.depth)
+        self._peak = peak_rss_mb()
+        self._cpu = time.process_time()
+        self._wall = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        wall_ms = (time.perf_counter() - self._wall) * 1000
+        cpu_ms = (time.process_time() - self._cpu) * 1000
+        peak = peak_rss_mb()
+        if self.push:
+            self.tracer._stack().pop()
+        record = {
+            "span": self.name, "parent": self.parent, "depth": self.depth, "pid": os.getpid(),
+            "wall_ms": round(wall_ms, 3), "cpu_ms": round(cpu_ms, 3),
+            "peak_rss_mb": round(peak, 1), "peak_rss_delta_mb": round(peak - self._peak, 1),
+            **self.attrs,
+        }
+        if exc_type is not None:
+            record["error"] = exc_type.__name__
+        self.tracer.emit(record)
+        self.tracer.record(self.name, wall_ms, cpu_ms, peak)
+        return False
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+def span(name: str, **attrs):
+    if not _tracer.enabled:
+        return _NO_SPAN
+    return _Span(_tracer, name, attrs)
+
+
+def traced(name: str | None = None):
+    def wrap(func):
+        label = name or func.__qualname__
+
+        @functools.wraps(func)
+        def inner(*args, **kwargs):
+            with span(label):
+                return func(*args, **kwargs)
+        return inner
+    return wrap
+
+
+# Each call closes the previous stage and opens the next; a stage left open by an exception isn't reported.
+class stages:
+    __slots__ = ("prefix", "_current")
+
+    def __init__(self, prefix: str):
+        self.prefix = prefix
+        self._current = None
+
+    def __call__(self, name: str, **attrs) -> None:
+        self.end()
+        if _tracer.enabled:
+            self._current = _Span(_tracer, f"{self.prefix}.{name}", attrs, push=False)
+            self._current.__enter__()
+
+    def end(self) -> None:
+        if self._current is not None:
+            self._current.__exit__(None, None, None)
+            self._current = None
@@ -0,0 +1,385 @@
+#This file is the lap-by-lap layer (race pace, gaps, stint degradation), built from data/lap_times.csv into per-race .npy files.
+#Usage: python lap_times.py ingest | info | pace | gaps | degradation --circuit Monza --year 2021 ...
+
+import os
+import sys
+import json
+import argparse
+import functools
+
+import numpy as np
+
+from charts import ChartData, NoDataError
+from data_cache import CACHE_DIRNAME, DATA_DIR, load_table, source_fingerprint
+from instrumentation import span, stages
+from streaming import DEFAULT_CHUNKSIZE, iter_fact
+
+LAPS_DIRNAME = "laps"
+LAPS_SCHEMA_VERSION = 1
+MAX_POINTS = 120       # per line, after decimation
+PACE_CUTOFF = 1.07     # laps slower than 107% of the median are pit/safety-car laps, not pace
+PIT_GUESS = 1.15       # without pit_stops.csv, a lap this much slower than the driver's median counts as a pit lap
+
+
+# ================================
+# Ingest: lap_times.csv → one .npy per race
+# ================================
+def laps_dir(data_dir: str = DATA_DIR) -> str:
+    return os.path.join(data_dir, CACHE_DIRNAME, LAPS_DIRNAME)
+
+
+def _sources(data_dir: str) -> dict:
+    out = {}
+    for name in ("lap_times", "pit_stops"):
+        path = os.path.join(data_dir, f"{name}.csv")
+        out[name] = source_fingerprint(path) if os.path.exists(path) else None
+    return out
+
+
+def _save_array(path: str, array: np.ndarray) -> None:
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        np.save(f, array)
+    os.replace(tmp, path)
+
+
+def _read_pits(data_dir: str) -> dict:
+    if not os.path.exists(os.path.join(data_dir, "pit_stops.csv")):
+        return {}
+    pits = load_table("pit_stops", data_dir)[["raceId", "driverId", "lap"]].dropna().to_numpy(dtype=np.int64)
+    return {int(r): pits[pits[:, 0] == r, 1:] for r in np.unique(pits[:, 0])}
+
+
+def ingest(data_dir: str = DATA_DIR, chunksize: int = DEFAULT_CHUNKSIZE, force: bool = False) -> dict:
+    out_dir = laps_dir(data_dir)
+    index_path = os.path.join(out_dir, "index.json")
+    sources = _sources(data_dir)
+    if sources["lap_times"] is None:
+        raise FileNotFoundError(f"{os.path.join(data_dir, 'lap_times.csv')} not found (it isn't shipped with the repo).")
+    if not force and os.path.exists(index_path):
+        index = _read_index(index_path)
+        if index.get("schema_version") == LAPS_SCHEMA_VERSION and index.get("sources") == sources:
+            return {"races": len(index["races"]), "rebuilt": False}
+
+    # Chunks hold a few columns as int32 blocks per race; races don't have to be contiguous in the CSV
+    blocks = {}
+    rows = 0
+    for chunk in iter_fact("lap_times", chunksize, data_dir, usecols=["raceId", "driverId", "lap", "milliseconds"]):
+        arr = chunk[["raceId", "driverId", "lap", "milliseconds"]].dropna().to_numpy(dtype=np.int64)
+        arr = arr[np.argsort(arr[:, 0], kind="stable")]
+        race_ids, starts = np.unique(arr[:, 0], return_index=True)
+        for race_id, block in zip(race_ids, np.split(arr[:, 1:], starts[1:])):
+            blocks.setdefault(int(race_id), []).append(block.astype(np.int32))
+        rows += len(arr)
+
+    pits = _read_pits(data_dir)
+    os.makedirs(out_dir, exist_ok=True)
+    races = {}
+    with span("laps.write", races=len(blocks), rows=rows):
+        for race_id, parts in blocks.items():
+            laps = np.concatenate(parts)
+            driver_ids, row = np.unique(laps[:, 0], return_inverse=True)
+            ms = np.zeros((len(driver_ids), int(laps[:, 1].max())), dtype=np.int32)
+            ms[row, laps[:, 1] - 1] = laps[:, 2]
+            _save_array(os.path.join(out_dir, f"{race_id}.npy"), ms)
+
+            if race_id in pits:
+                stops = pits[race_id]
+                pit_mask = np.zeros(ms.shape, dtype=bool)
+                known = np.isin(stops[:, 0], driver_ids) & (stops[:, 1] >= 1) & (stops[:, 1] <= ms.shape[1])
+                pit_mask[np.searchsorted(driver_ids, stops[known, 0]), stops[known, 1] - 1] = True
+                _save_array(os.path.join(out_dir, f"{race_id}.pits.npy"), pit_mask)
+            races[str(race_id)] = {"drivers": driver_ids.tolist(), "laps": ms.shape[1], "pits": race_id in pits}
+
+    tmp = index_path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump({"schema_version": LAPS_SCHEMA_VERSION, "sources": sources, "races": races}, f)
+    os.replace(tmp, index_path)
+    _cached_index.cache_clear()
+    return {"races": len(races), "rows": rows, "rebuilt": True}
+
+
+def _read_index(path: str) -> dict:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+@functools.lru_cache(maxsize=4)
+def _cached_index(path: str, mtime_ns: int) -> dict:
+    return _read_index(path)
+
+
+def load_index(data_dir: str = DATA_DIR) -> dict:
+    path = os.path.join(laps_dir(data_dir), "index.json")
+    if not os.path.exists(path):
+        raise NoDataError("No lap data yet: put lap_times.csv in data/ and run python lap_times.py ingest.")
+    return _cached_index(path, os.stat(path).st_mtime_ns)
+
+
+# ================================
+# One race, memory-mapped
+# ================================
+class RaceLaps:
+    def __init__(self, race_id: int, driver_ids: np.ndarray, ms: np.ndarray, pits: np.ndarray | None):
+        self.race_id = race_id
+        self.driver_ids = driver_ids
+        self.ms = ms
+        self.pits = pits
+
+    @classmethod
+    def open(cls, race_id: int, data_dir: str = DATA_DIR) -> "RaceLaps":
+        entry = load_index(data_dir)["races"].get(str(int(race_id)))
+        if entry is None:
+            raise NoDataError(f"No lap times for race {race_id}.")
+        base = os.path.join(laps_dir(data_dir), str(int(race_id)))
+        with span("laps.open", race=int(race_id)):
+            ms = np.load(base + ".npy", mmap_mode="r")
+            pits = np.load(base + ".pits.npy", mmap_mode="r") if entry["pits"] else None
+        return cls(int(race_id), np.asarray(entry["drivers"]), ms, pits)
+
+    @property
+    def laps(self) -> int:
+        return self.ms.shape[1]
+
+    def row(self, driver_id: int) -> int | None:
+        pos = np.searchsorted(self.driver_ids, driver_id)
+        return int(pos) if pos < len(self.driver_ids) and self.driver_ids[pos] == driver_id else None
+
+    def seconds(self, rows=None) -> np.ndarray:
+        ms = self.ms if rows is None else self.ms[rows]
+        return np.where(ms > 0, ms / 1000.0, np.nan)
+
+    def gaps_to_leader(self) -> np.ndarray:
+        elapsed = np.cumsum(self.ms, axis=1, dtype=np.int64) / 1000.0
+        # Race time is only known while every earlier lap is: from a driver's first missing lap on
+        # (retired, or a gap in the timing data) the total would be too low, so the driver drops out
+        elapsed[~np.cumprod(self.ms > 0, axis=1, dtype=bool)] = np.nan
+        # Lapped cars have no lap N while the leader is on it; the leader is whoever completed it first
+        return elapsed - np.fmin.reduce(elapsed, axis=0)
+
+    def pit_laps(self, row: int) -> np.ndarray:
+        if self.pits is not None:
+            return np.flatnonzero(self.pits[row]) + 1
+        lap_s = self.seconds(row)
+        if np.isnan(lap_s).all():
+            return np.empty(0, dtype=np.int64)
+        slow = lap_s > PIT_GUESS * np.nanmedian(lap_s)
+        slow[0] = False  # a slow lap 1 is the standing start
+        return np.flatnonzero(slow) + 1
+
+    def stints(self, row: int) -> list[tuple[int, int]]:
+        last = int(np.flatnonzero(self.ms[row]).max()) + 1 if self.ms[row].any() else 0
+        bounds = [0] + [int(p) for p in self.pit_laps(row) if p < last] + [last]
+        return [(lo + 1, hi) for lo, hi in zip(bounds[:-1], bounds[1:]) if hi > lo]
+
+
+def decimate(x: np.ndarray, y: np.ndarray, max_points: int = MAX_POINTS) -> tuple[np.ndarray, np.ndarray]:
+    if len(y) <= max_points:
+        return x, y
+    edges = np.linspace(0, len(y), max_points // 2 + 1).astype(int)
+    keep = []
+    for lo, hi in zip(edges[:-1], edges[1:]):
+        bucket = y[lo:hi]
+        if np.isnan(bucket).all():
+            continue
+        keep += sorted({lo + int(np.nanargmin(bucket)), lo + int(np.nanargmax(bucket))})
+    keep = np.asarray(keep, dtype=np.int64)
+    return x[keep], y[keep]
+
+
+# ================================
+# Charts (registered in charts.CHARTS)
+# ================================
+def find_race(data: ChartData, circuit: str, year: int, drivers: list[str]) -> tuple[int, dict]:
+    results = data.results
+    rows = results.rows(years=[int(year)], circuit_ids=results.find_circuits(circuit))
+    if rows.empty:
+        raise NoDataError(f"No race found for {circuit} in {year}.")
+    race_id = int(rows.sort_values("round")["raceId"].iloc[0])  # first one if the circuit hosted two races that year
+    race_rows = rows[rows["raceId"] == race_id]
+    by_name = {str(s).lower(): (str(s), int(d)) for s, d in zip(race_rows["surname"], race_rows["driverId"])}
+    picked = dict(by_name[d.strip().lower()] for d in drivers if d.strip().lower() in by_name)
+    if not picked:
+        raise NoDataError(f"None of {drivers} raced at {circuit} in {year}.")
+    return race_id, picked
+
+
+def _driver_rows(race: RaceLaps, driver_ids: dict) -> dict:
+    rows = {name: race.row(d) for name, d in driver_ids.items()}
+    rows = {name: r for name, r in rows.items() if r is not None}
+    if not rows:
+        raise NoDataError(f"No lap times for {', '.join(driver_ids)} in race {race.race_id}.")
+    return rows
+
+
+def plot_race_pace(data: ChartData, circuit: str, year: int, drivers: list[str], max_points: int = MAX_POINTS):
+    import matplotlib.pyplot as plt
+
+    stage = stages("chart.race-pace")
+    stage("filter")
+    race_id, driver_ids = find_race(data, circuit, year, drivers)
+    race = RaceLaps.open(race_id, data.data_dir)
+    rows = _driver_rows(race, driver_ids)
+
+    stage("plot")
+    fig = plt.figure(figsize=(12, 6))
+    lap_numbers = np.arange(1, race.laps + 1)
+    shown = race.seconds(list(rows.values()))
+    # Pit and safety-car laps would squash the scale; they run off the top and pit laps get a marker there
+    top = np.nanmedian(shown) * PACE_CUTOFF
+    for (driver, row), lap_s in zip(rows.items(), shown):
+        x, y = decimate(lap_numbers, lap_s, max_points)
+        line, = plt.plot(x, y, label=driver, linewidth=1.5)
+        pits = race.pit_laps(row)
+        plt.scatter(pits, np.full(len(pits), top), marker="v", color=line.get_color(), zorder=3, clip_on=False)
+
+    plt.ylim(np.nanmin(shown) - 0.5, top)
+    plt.title(f"Race Pace at {circuit} ({year}) — ▼ = pit lap, slower laps off scale")
+    plt.xlabel("Lap")
+    plt.ylabel("Lap time (s)")
+    plt.legend()
+    plt.grid(True, alpha=0.4)
+    stage.end()
+    return fig
+
+
+def plot_race_gaps(data: ChartData, circuit: str, year: int, drivers: list[str], max_points: int = MAX_POINTS):
+    import matplotlib.pyplot as plt
+
+    stage = stages("chart.race-gaps")
+    stage("filter")
+    race_id, driver_ids = find_race(data, circuit, year, drivers)
+    race = RaceLaps.open(race_id, data.data_dir)
+    rows = _driver_rows(race, driver_ids)
+
+    stage("build")
+    gaps = race.gaps_to_leader()  # whole field: the leader may not be one of the chosen drivers
+
+    stage("plot")
+    fig = plt.figure(figsize=(12, 6))
+    lap_numbers = np.arange(1, race.laps + 1)
+    for driver, row in rows.items():
+        x, y = decimate(lap_numbers, gaps[row], max_points)
+        plt.plot(x, y, label=driver, linewidth=1.5)
+
+    plt.title(f"Gap to Leader at {circuit} ({year})")
+    plt.xlabel("Lap")
+    plt.ylabel("Seconds behind the leader")
+    plt.gca().invert_yaxis()  # leader at the top
+    plt.legend()
+    plt.grid(True, alpha=0.4)
+    stage.end()
+    return fig
+
+
+def stint_fits(race: RaceLaps, row: int) -> list[dict]:
+    lap_s = race.seconds(row)
+    fits = []
+    for number, (first, last) in enumerate(race.stints(row), start=1):
+        laps = np.arange(first + 1, last)  # out-lap (or lap 1) and in-lap left out
+        values = lap_s[laps - 1]
+        ok = ~np.isnan(values)
+        if ok.sum() >= 3:
+            ok &= values <= PACE_CUTOFF * np.nanmedian(values)
+        if ok.sum() < 3:
+            continue
+        slope, intercept = np.polyfit(laps[ok], values[ok], 1)
+        fits.append({"stint": number, "laps": laps[ok], "seconds": values[ok], "slope": slope, "intercept": intercept})
+    return fits
+
+
+def plot_stint_degradation(data: ChartData, circuit: str, year: int, drivers: list[str], max_points: int = MAX_POINTS):
+    import matplotlib.pyplot as plt
+
+    stage = stages("chart.stint-degradation")
+    stage("filter")
+    race_id, driver_ids = find_race(data, circuit, year, drivers)
+    race = RaceLaps.open(race_id, data.data_dir)
+    rows = _driver_rows(race, driver_ids)
+
+    stage("build")
+    fits = {driver: stint_fits(race, row) for driver, row in rows.items()}
+    if not any(fits.values()):
+        raise NoDataError(f"No stint of 3+ clean laps for {', '.join(rows)} at {circuit} in {year}.")
+
+    stage("plot")
+    fig = plt.figure(figsize=(12, 6))
+    colors = plt.rcParams["axes.prop_cycle"].by_key()["color"]
+    for i, (driver, stints) in enumerate(fits.items()):
+        color = colors[i % len(colors)]
+        for stint in stints:
+            x, y = decimate(stint["laps"], stint["seconds"], max_points)
+            plt.scatter(x, y, s=12, color=color, alpha=0.5)
+            ends = np.array([stint["laps"][0], stint["laps"][-1]])
+            plt.plot(ends, stint["slope"] * ends + stint["intercept"], color=color, linewidth=2,
+                     label=f"{driver} stint {stint['stint']}: {stint['slope']:+.3f} s/lap")
+
+    source = "pit_stops.csv" if race.pits is not None else "inferred pit laps"
+    plt.title(f"Stint Degradation at {circuit} ({year}) — stints from {source}")
+    plt.xlabel("Lap")
+    plt.ylabel("Lap time (s)")
+    plt.legend(fontsize=8)
+    plt.grid(True, alpha=0.4)
+    stage.end()
+    return fig
+
+
+# ================================
+# CLI
+# ================================
+CHART_COMMANDS = {"pace": "race-pace", "gaps": "race-gaps", "degradation": "stint-degradation"}
+
+
+def print_info(data: ChartData, circuit: str, year: int) -> None:
+    results = data.results
+    rows = results.rows(years=[year], circuit_ids=results.find_circuits(circuit))
+    if rows.empty:
+        raise NoDataError(f"No race found for {circuit} in {year}.")
+    names = dict(zip(rows["driverId"].astype(int), rows["surname"].astype(str)))
+    for race_id in rows["raceId"].astype(int).unique():
+        race = RaceLaps.open(race_id, data.data_dir)
+        print(f"🏁 Race {race_id}: {len(race.driver_ids)} drivers, {race.laps} laps "
+              f"({'pit stops from pit_stops.csv' if race.pits is not None else 'pit laps inferred'})")
+        for row, driver_id in enumerate(race.driver_ids):
+            done = int((race.ms[row] > 0).sum())
+            print(f"   {names.get(int(driver_id), driver_id)!s:<16}{done:>4} laps   stints {race.stints(row)}")
+
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if argv and argv[0] in CHART_COMMANDS:
+        # Chart subcommands take the same options as cli.py
+        from cli import main as cli_main
+        return cli_main([CHART_COMMANDS[argv[0]]] + argv[1:])
+
+    parser = argparse.ArgumentParser(description="Lap-by-lap race data: ingest and inspect "
+                                                 f"(charts: {', '.join(CHART_COMMANDS)})")
+    sub = parser.add_subparsers(dest="command", required=True)
+    i = sub.add_parser("ingest", help="Build data/cache/laps/ from data/lap_times.csv (and pit_stops.csv)")
+    i.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    i.add_argument("--force", action="store_true", help="Rebuild even when the sources haven't changed")
+    info = sub.add_parser("info", help="Drivers, laps and stints of one race")
+    info.add_argument("--circuit", required=True)
+    info.add_argument("--year", required=True, type=int)
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "ingest":
+            summary = ingest(chunksize=args.chunksize, force=args.force)
+            if summary["rebuilt"]:
+                print(f"✅ {summary['rows']} laps of {summary['races']} races written to {laps_dir()}")
+            else:
+                print(f"✅ {laps_dir()} is up to date ({summary['races']} races)")
+        else:
+            print_info(ChartData(), args.circuit, args.year)
+    except (FileNotFoundError, NoDataError) as e:
+        print(f"❌ {e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,26 +1,14 @@
-import pandas as pd
+from enriched_tables import load_enriched_qualifying
 
-# Load datasets
-qualifying = pd.read_csv("data/qualifying.csv")
-races = pd.read_csv("data/races.csv")
-drivers = pd.read_csv("data/drivers.csv")
-constructors = pd.read_csv("data/constructors.csv")
+# Load pre-joined qualifying (races, drivers, constructors already merged in)
+qualifying = load_enriched_qualifying()
+print("✅ Loaded enriched qualifying:", qualifying.columns.tolist())
 
-# Merge races (to get year, circuitId)
-qualifying = qualifying.merge(races[['raceId', 'year', 'circuitId']], on='raceId', how='left')
-print("✅ After merging races:", qualifying.columns.tolist())
-
-# Merge drivers (get full name)
-drivers['driver_name'] = drivers['forename'] + " " + drivers['surname']
-qualifying = qualifying.merge(drivers[['driverId', 'driver_name']], on='driverId', how='left')
-print("✅ After merging drivers:", qualifying.columns.tolist())
-
-# Merge constructors
-qualifying = qualifying.merge(constructors[['constructorId', 'name']], on='constructorId', how='left')
-print("✅ After merging constructors:", qualifying.columns.tolist())
+# Build full driver name
+qualifying['driver_name'] = qualifying['forename'].astype(str) + " " + qualifying['surname'].astype(str)
 
 # Rename constructor column
-qualifying.rename(columns={'name': 'constructor_name'}, inplace=True)
+qualifying.rename(columns={'name_constructor': 'constructor_name'}, inplace=True)
 print("✅ After renaming constructor name:", qualifying.columns.tolist())
 
 # Drop rows without position
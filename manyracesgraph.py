@@ -1,83 +1,104 @@
 #This file gives you the stat graph of multiple driver's race finishing position across multiple years on 1 track.
+#Several tracks at once ("Monaco,Baku" or a group like "street") give one small panel per track.
 
-import pandas as pd
+import numpy as np
 import matplotlib.pyplot as plt
 
-# ================================
-# Load datasets
-# ================================
-races = pd.read_csv("data/races.csv", on_bad_lines="skip")
-results = pd.read_csv("data/results.csv")
-drivers = pd.read_csv("data/drivers.csv")
-constructors = pd.read_csv("data/constructors.csv")
-circuits = pd.read_csv("data/circuits.csv")
-
-# ================================
-# Merge datasets
-# ================================
-results = results.merge(races, on="raceId", how="left", suffixes=("", "_race"))
-results = results.merge(drivers, on="driverId", how="left", suffixes=("", "_driver"))
-results = results.merge(constructors, on="constructorId", how="left", suffixes=("", "_constructor"))
-results = results.merge(circuits, on="circuitId", how="left", suffixes=("", "_circuit"))
-
-# ================================
-# User input
-# ================================
-circuit_name = input("Enter circuit name (e.g. Monza, Silverstone): ").strip().lower()
-years = input("Enter years separated by commas (e.g. 2019,2020,2021): ").split(",")
-years = [int(y.strip()) for y in years]
-
-drivers_input = input("Enter driver names separated by commas (e.g. Lewis Hamilton, Max Verstappen): ").split(",")
-drivers_input = [d.strip().lower() for d in drivers_input]
-
-# --- Filter data ---
-filtered = results[
-    (results["name_circuit"].str.lower().str.contains(circuit_name)) &
-    (results["year"].isin(years))
-]
-
-if filtered.empty:
-    print("No data found for that circuit/year combination.")
-    exit()
-
-# --- Create driver label ---
-filtered["driverLabel"] = filtered["surname"]
-
-# --- Keep only selected drivers ---
-filtered = filtered[filtered["driverLabel"].str.lower().isin(drivers_input)]
-
-if filtered.empty:
-    print("No matching drivers found for that circuit/year combination.")
-    exit()
-
-# ================================
-# Plot
-# ================================
-plt.figure(figsize=(10, 6))
-
-for driver in filtered["driverLabel"].unique():
-    driver_data = filtered[filtered["driverLabel"] == driver].sort_values("year")
-
-    plt.plot(
-        driver_data["year"],
-        driver_data["positionOrder"],
-        marker="o",
-        label=driver
-    )
-
-    # Annotate each point with position
-    for x, y in zip(driver_data["year"], driver_data["positionOrder"]):
-        plt.text(x, y, str(y), fontsize=9, ha="center", va="bottom")
-
-# Invert Y axis (lower position = better result)
-plt.gca().invert_yaxis()
-plt.xlabel("Year")
-plt.ylabel("Finishing Position")
-plt.title(f"Driver Performance at {circuit_name.title()} Across Years")
-
-# Move legend outside on the right
-plt.legend(bbox_to_anchor=(1.05, 1), loc="upper left", borderaxespad=0.)
-
-plt.grid(True, linestyle="--", alpha=0.6)
-plt.tight_layout()
-plt.show()
+from annotations import batch_markers, point_labels
+from charts import ChartData, NoDataError
+from comparison import compare, is_multi, plot_small_multiples
+from instrumentation import stages
+
+
+def plot_race_years(data: ChartData, circuit: str, years: list[int], drivers: list[str]):
+    results = data.results  # pre-joined dataset, indexed by year, circuit, race and driver
+    circuit_name = circuit.strip().lower()
+    years = [int(y) for y in years]
+    drivers_input = [d.strip().lower() for d in drivers]
+    stage = stages("chart.race-years")
+
+    # --- Filter data ---
+    stage("filter")
+    if is_multi(circuit):
+        # Several circuits (or a group like "street"): one grouped query, one small panel per circuit
+        frame = compare(data, circuit, years, drivers_input, metric="race")
+        if frame.empty:
+            raise NoDataError("No matching drivers found for those circuits/years.")
+        stage("plot")
+        fig = plot_small_multiples(frame, "positionOrder", f"Driver Performance at {circuit.strip()} Across Years",
+                                   "Finishing Position", invert=True)
+        stage.end()
+        return fig
+
+    circuit_ids = results.find_circuits(circuit_name)
+    positions = results.lookup(years=years, circuit_ids=circuit_ids)
+
+    if len(positions) == 0:
+        raise NoDataError("No data found for that circuit/year combination.")
+
+    # --- Keep only selected drivers (narrows the same row positions, no second lookup) ---
+    positions = positions[np.isin(results.driver[positions], results.find_drivers(drivers_input, case=False))]
+    filtered = results.df.iloc[positions].copy()
+
+    # --- Create driver label ---
+    filtered["driverLabel"] = filtered["surname"]
+
+    if filtered.empty:
+        raise NoDataError("No matching drivers found for that circuit/year combination.")
+
+    # ================================
+    # Plot
+    # ================================
+    stage("plot")
+    fig = plt.figure(figsize=(10, 6))
+    labels = point_labels()
+
+    for driver in filtered["driverLabel"].unique():
+        driver_data = filtered[filtered["driverLabel"] == driver].sort_values("year")
+
+        plt.plot(
+            driver_data["year"],
+            driver_data["positionOrder"],
+            marker="o",
+            label=driver
+        )
+
+        # Annotate each point with position
+        for x, y in zip(driver_data["year"], driver_data["positionOrder"]):
+            labels.text(x, y, str(y), fontsize=9, ha="center", va="bottom")
+
+    batch_markers()
+
+    # Invert Y axis (lower position = better result)
+    plt.gca().invert_yaxis()
+    plt.xlabel("Year")
+    plt.ylabel("Finishing Position")
+    plt.title(f"Driver Performance at {circuit_name.title()} Across Years")
+
+    # Move legend outside on the right
+    plt.legend(bbox_to_anchor=(1.05, 1), loc="upper left", borderaxespad=0.)
+
+    plt.grid(True, linestyle="--", alpha=0.6)
+    plt.tight_layout()
+
+    stage.end()
+    return fig
+
+
+if __name__ == "__main__":
+    # ================================
+    # User input
+    # ================================
+    circuit_name = input("Enter circuit name(s) (e.g. Monza, or Monaco,Baku, or street): ").strip().lower()
+    years = input("Enter years separated by commas (e.g. 2019,2020,2021): ").split(",")
+    years = [int(y.strip()) for y in years]
+
+    drivers_input = input("Enter driver names separated by commas (e.g. Lewis Hamilton, Max Verstappen): ").split(",")
+
+    try:
+        plot_race_years(ChartData(), circuit_name, years, drivers_input)
+    except NoDataError as e:
+        print(e)
+        exit()
+
+    plt.show()
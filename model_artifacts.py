@@ -0,0 +1,265 @@
+#This file exports the qualifying model as pickle / compressed / flat (memory-mapped) / depth<N> artifacts and compares them.
+#Usage: python model_artifacts.py [--model-version latest] [--depths 10,14,18]
+
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from qualifying_predictor import FEATURES, MODEL_PATH
+
+ARTIFACT_DIR = "model/artifacts"
+DEFAULT_DEPTHS = [12, 16]
+
+
+# ================================
+# Flat (memory-mapped) forest
+# ================================
+# All trees share one node table and a leaf points at itself, so samples walk every tree in lock-step.
+class FlatForest:
+    ARRAYS = ["left", "right", "feature", "threshold", "value", "roots"]
+
+    def __init__(self, left, right, feature, threshold, value, roots, max_depth: int, feature_names):
+        self.left, self.right, self.feature = left, right, feature
+        self.threshold, self.value, self.roots = threshold, value, roots
+        self.max_depth = max_depth
+        self.feature_names_in_ = np.asarray(feature_names, dtype=object)
+        self.n_estimators = len(roots)
+
+    @classmethod
+    def from_forest(cls, forest) -> "FlatForest":
+        lefts, rights, features, thresholds, values, roots = [], [], [], [], [], []
+        offset = 0
+        for est in forest.estimators_:
+            tree = est.tree_
+            n = tree.node_count
+            ids = np.arange(offset, offset + n, dtype=np.int32)
+            leaf = tree.children_left == -1
+            lefts.append(np.where(leaf, ids, tree.children_left + offset).astype(np.int32))
+            rights.append(np.where(leaf, ids, tree.children_right + offset).astype(np.int32))
+            features.append(np.where(leaf, 0, tree.feature).astype(np.int8))
+            thresholds.append(tree.threshold.astype(np.float64))
+            values.append(tree.value[:, 0, 0].astype(np.float64))
+            roots.append(offset)
+            offset += n
+        names = getattr(forest, "feature_names_in_", FEATURES)
+        return cls(np.concatenate(lefts), np.concatenate(rights), np.concatenate(features),
+                   np.concatenate(thresholds), np.concatenate(values), np.asarray(roots, dtype=np.int32),
+                   max(est.tree_.max_depth for est in forest.estimators_), names)
+
+    def save(self, path: str) -> None:
+        # Each file is replaced (new inode), never rewritten in place: processes that still have the
+        # old arrays mapped keep reading them safely. meta.json goes last and marks the update.
+        os.makedirs(path, exist_ok=True)
+        for name in self.ARRAYS:
+            target = os.path.join(path, f"{name}.npy")
+            with open(target + ".tmp", "wb") as f:
+                np.save(f, getattr(self, name))
+            os.replace(target + ".tmp", target)
+        target = os.path.join(path, "meta.json")
+        with open(target + ".tmp", "w") as f:
+            json.dump({"max_depth": self.max_depth, "feature_names": list(self.feature_names_in_)}, f, indent=2)
+        os.replace(target + ".tmp", target)
+
+    @classmethod
+    def load(cls, path: str, mmap_mode: str | None = "r") -> "FlatForest":
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode) for name in cls.ARRAYS}
+        return cls(**arrays, max_depth=meta["max_depth"], feature_names=meta["feature_names"])
+
+    def predict_trees(self, X) -> np.ndarray:
+        if isinstance(X, pd.DataFrame):
+            X = X[list(self.feature_names_in_)]
+        # sklearn compares float32 inputs against float64 thresholds; do exactly the same
+        X = np.asarray(X, dtype=np.float32)
+        rows = np.arange(len(X))
+        nodes = np.repeat(self.roots[:, None], len(X), axis=1)  # (trees, samples)
+        for _ in range(self.max_depth):
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+        return self.value[nodes]
+
+    def predict(self, X) -> np.ndarray:
+        return self.predict_trees(X).mean(axis=0)
+
+
+def tree_predictions(model, X: pd.DataFrame) -> np.ndarray:
+    if hasattr(model, "predict_trees"):
+        return model.predict_trees(X)
+    # The trees were fitted on plain arrays (the forest strips the column names), so pass one
+    X = X[list(model.feature_names_in_)].to_numpy(dtype=np.float32)
+    return np.stack([est.predict(X) for est in model.estimators_])
+
+
+def load_model(path: str = MODEL_PATH):
+    # Only the flat directory is memory-mapped: sklearn copies a pickled tree's node arrays on load anyway
+    if os.path.isdir(path):
+        return FlatForest.load(path)
+    return joblib.load(path)
+
+
+# ================================
+# Export
+# ================================
+def path_size(path: str) -> int:
+    if os.path.isdir(path):
+        return sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+    return os.path.getsize(path)
+
+
+def export_artifacts(model, out_dir: str = ARTIFACT_DIR, depths=(), train=None) -> dict[str, str]:
+    from sklearn.base import clone
+
+    os.makedirs(out_dir, exist_ok=True)
+    paths = {
+        "pickle": os.path.join(out_dir, "qualifying_model.pkl"),
+        "compressed": os.path.join(out_dir, "qualifying_model.pkl.z"),
+        "flat": os.path.join(out_dir, "flat"),
+    }
+    joblib.dump(model, paths["pickle"])
+    joblib.dump(model, paths["compressed"], compress=3)
+    FlatForest.from_forest(model).save(paths["flat"])
+
+    for depth in depths:
+        if train is None:
+            raise ValueError("Depth-capped variants need the training data")
+        capped = clone(model).set_params(max_depth=depth, warm_start=False).fit(*train)
+        paths[f"depth{depth}"] = os.path.join(out_dir, f"depth{depth}")
+        FlatForest.from_forest(capped).save(paths[f"depth{depth}"])
+        joblib.dump(capped, os.path.join(out_dir, f"qualifying_model_depth{depth}.pkl"))
+    return paths
+
+
+# ================================
+# Report
+# ================================
+def memory_mb() -> dict:
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            fields = dict(line.split(":", 1) for line in f if ":" in line)
+    except OSError:
+        return {}
+    kb = lambda key: int(fields.get(key, "0 kB").split()[0])
+    return {
+        "rss_mb": round(kb("Rss") / 1024, 1),
+        "private_mb": round((kb("Private_Clean") + kb("Private_Dirty")) / 1024, 1),
+        "shared_mb": round((kb("Shared_Clean") + kb("Shared_Dirty")) / 1024, 1),
+    }
+
+
+def probe(path: str, X_test: np.ndarray, columns: list[str]) -> tuple[dict, np.ndarray]:
+    before = memory_mb()
+    start = time.perf_counter()
+    model = load_model(path)
+    load_seconds = time.perf_counter() - start
+
+    batch = pd.DataFrame(X_test[:20], columns=columns)
+    start = time.perf_counter()
+    model.predict(batch)
+    predict_ms = (time.perf_counter() - start) * 1000
+    y_pred = model.predict(pd.DataFrame(X_test, columns=columns))
+
+    after = memory_mb()
+    result = {"load_seconds": round(load_seconds, 4), "predict_ms": round(predict_ms, 3)}
+    for key in after:
+        result[f"{key}_delta"] = round(after[key] - before.get(key, 0), 1)
+    return result, y_pred
+
+
+def measure_artifact(path: str, X_test: pd.DataFrame, y_test: np.ndarray) -> dict:
+    # A fresh interpreter per artifact, so one format's pages can't make another's load look cheap
+    tmp = path.rstrip("/") + ".probe.npz"
+    np.savez(tmp, X=X_test.to_numpy(dtype=np.float64), columns=np.asarray(X_test.columns, dtype=str))
+    try:
+        out = subprocess.run([sys.executable, __file__, "--probe", path, tmp],
+                             capture_output=True, text=True, check=True)
+        result = json.loads(out.stdout.strip().splitlines()[-1])
+        y_pred = np.load(tmp + ".pred.npy")
+    finally:
+        for f in (tmp, tmp + ".pred.npy"):
+            if os.path.exists(f):
+                os.remove(f)
+    result["size_mb"] = round(path_size(path) / (1024 * 1024), 2)
+    result["mae"] = round(float(np.mean(np.abs(y_test - y_pred))), 4)
+    return result
+
+
+# The version's held-out rows against the rest, or the 80/20 split of a full retrain when there are none.
+def model_split(model, version=None):
+    from feature_store import FEATURE_COLUMNS
+    from model_registry import read_holdout
+    from train_qualifying_model import split_rows, training_frame
+
+    features = list(getattr(model, "feature_names_in_", FEATURES))
+    if features not in (FEATURES, FEATURES + FEATURE_COLUMNS):
+        raise ValueError(f"Don't know the training data for a model on {', '.join(features)}")
+    df, _ = training_frame(with_features=features != FEATURES)
+    return split_rows(df, features, read_holdout(version) if version is not None else None)
+
+
+def build_report(paths: dict[str, str], X_test, y_test) -> pd.DataFrame:
+    rows = []
+    for variant, path in paths.items():
+        rows.append({"variant": variant, "path": path, **measure_artifact(path, X_test, y_test.to_numpy())})
+    return pd.DataFrame(rows)
+
+
+def write_artifacts(model, depths=DEFAULT_DEPTHS, out_dir: str = ARTIFACT_DIR, split=None,
+                    report_path: str | None = None, version=None) -> pd.DataFrame:
+    X_train, X_test, y_train, y_test = split or model_split(model, version)
+    if depths and list(getattr(model, "feature_names_in_", FEATURES)) != FEATURES:
+        # Only the base features are refit like for like; skip rather than compare against a different model
+        print("⚠️ Depth-capped variants are only built for models on the base features; skipping them")
+        depths = ()
+    paths = export_artifacts(model, out_dir, depths, train=(X_train, y_train))
+    report = build_report(paths, X_test, y_test)
+    report_path = report_path or os.path.join(out_dir, "report.csv")
+    if report_path.endswith(".json"):
+        report.to_json(report_path, orient="records", indent=2)
+    else:
+        report.to_csv(report_path, index=False)
+    return report
+
+
+def main(argv=None) -> int:
+    if argv is None and len(sys.argv) == 4 and sys.argv[1] == "--probe":
+        with np.load(sys.argv[3]) as probe_data:
+            X, columns = probe_data["X"], probe_data["columns"].tolist()
+        result, y_pred = probe(sys.argv[2], X, columns)
+        np.save(sys.argv[3] + ".pred.npy", y_pred)
+        print(json.dumps(result))
+        return 0
+
+    parser = argparse.ArgumentParser(description="Export the qualifying model in alternative formats and compare them")
+    model_choice = parser.add_mutually_exclusive_group()
+    model_choice.add_argument("--model", help=f"Model file (default: {MODEL_PATH})")
+    model_choice.add_argument("--model-version", help='Registry version (e.g. 3 or "latest"); its held-out rows '
+                                                      "are used for the report and the rest to refit depth<N>")
+    parser.add_argument("--out-dir", default=ARTIFACT_DIR)
+    parser.add_argument("--depths", default=",".join(map(str, DEFAULT_DEPTHS)),
+                        help="Comma-separated max_depth values to retrain (empty = none)")
+    parser.add_argument("--report", help="Report path (.csv or .json, default <out-dir>/report.csv)")
+    args = parser.parse_args(argv)
+
+    depths = [int(d) for d in args.depths.split(",") if d.strip()]
+    version = None
+    if args.model_version is not None:
+        from model_registry import latest_version, parse_version, resolve_model_path
+
+        version = latest_version() if args.model_version.lower() == "latest" else parse_version(args.model_version)
+    model_path = args.model or (MODEL_PATH if version is None else resolve_model_path(version))
+    report = write_artifacts(joblib.load(model_path), depths, args.out_dir, report_path=args.report, version=version)
+    print(report.drop(columns="path").to_string(index=False))
+    print(f"\n✅ Artifacts written to {args.out_dir}/")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,143 @@
+#This file keeps every trained qualifying model as a numbered version under model/registry/ (model, meta, holdout rows).
+#Usage: python model_registry.py list | promote 3
+
+import os
+import sys
+import json
+import time
+import shutil
+import hashlib
+import argparse
+
+from qualifying_predictor import MODEL_PATH
+
+REGISTRY_DIR = "model/registry"
+
+
+def version_name(version: int) -> str:
+    return f"v{version:04d}"
+
+
+def parse_version(value) -> int:
+    # Accepts 3, "3" or "v0003"
+    return int(str(value).lstrip("vV"))
+
+
+def data_version(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()[:12]
+
+
+# ================================
+# Reading the registry
+# ================================
+def list_versions(registry_dir: str = REGISTRY_DIR) -> list[int]:
+    if not os.path.isdir(registry_dir):
+        return []
+    versions = []
+    for name in os.listdir(registry_dir):
+        if name.startswith("v") and name[1:].isdigit() and os.path.exists(os.path.join(registry_dir, name, "meta.json")):
+            versions.append(int(name[1:]))
+    return sorted(versions)
+
+
+def latest_version(registry_dir: str = REGISTRY_DIR) -> int | None:
+    versions = list_versions(registry_dir)
+    return versions[-1] if versions else None
+
+
+def version_dir(version: int, registry_dir: str = REGISTRY_DIR) -> str:
+    return os.path.join(registry_dir, version_name(version))
+
+
+def read_meta(version: int, registry_dir: str = REGISTRY_DIR) -> dict:
+    path = os.path.join(version_dir(version, registry_dir), "meta.json")
+    if not os.path.exists(path):
+        raise KeyError(f"Model version {version_name(version)} not found in {registry_dir}")
+    with open(path) as f:
+        return json.load(f)
+
+
+# None → model/qualifying_model.pkl, "latest" → newest version (or the default model), 3 / "v0003" → that version.
+def resolve_model_path(version=None, registry_dir: str = REGISTRY_DIR) -> str:
+    if version is None:
+        return MODEL_PATH
+    if str(version).lower() == "latest":
+        latest = latest_version(registry_dir)
+        return MODEL_PATH if latest is None else os.path.join(version_dir(latest, registry_dir), "model.pkl")
+    v = parse_version(version)
+    read_meta(v, registry_dir)  # raises KeyError for unknown versions
+    return os.path.join(version_dir(v, registry_dir), "model.pkl")
+
+
+# ================================
+# Writing to the registry
+# ================================
+def read_holdout(version: int, registry_dir: str = REGISTRY_DIR):
+    import pandas as pd
+
+    path = os.path.join(version_dir(version, registry_dir), "holdout.csv")
+    return pd.read_csv(path) if os.path.exists(path) else None
+
+
+def register(model, meta: dict, registry_dir: str = REGISTRY_DIR, holdout=None) -> int:
+    import joblib
+
+    os.makedirs(registry_dir, exist_ok=True)
+    version = (latest_version(registry_dir) or 0) + 1
+    final_dir = version_dir(version, registry_dir)
+    tmp_dir = final_dir + ".tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    joblib.dump(model, os.path.join(tmp_dir, "model.pkl"))
+    if holdout is not None:
+        holdout.to_csv(os.path.join(tmp_dir, "holdout.csv"), index=False)
+    meta = {"version": version, "created": time.strftime("%Y-%m-%dT%H:%M:%S"), **meta}
+    with open(os.path.join(tmp_dir, "meta.json"), "w") as f:
+        json.dump(meta, f, indent=2)
+    # The directory only appears under its real name once both files are complete
+    os.replace(tmp_dir, final_dir)
+    return version
+
+
+def promote(version, registry_dir: str = REGISTRY_DIR, model_path: str = MODEL_PATH) -> str:
+    src = resolve_model_path(version, registry_dir)
+    tmp = model_path + ".tmp"
+    shutil.copyfile(src, tmp)
+    os.replace(tmp, model_path)
+    return src
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Versioned qualifying model registry")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list", help="Show every registered version")
+    p = sub.add_parser("promote", help=f"Copy a version to {MODEL_PATH}")
+    p.add_argument("version", help='Version number, "v0003" or "latest"')
+    args = parser.parse_args(argv)
+
+    if args.command == "list":
+        versions = list_versions()
+        if not versions:
+            print(f"No models registered in {REGISTRY_DIR} yet")
+        for v in versions:
+            m = read_meta(v)
+            print(f"{version_name(v)}  {m['created']}  {m['mode']:<6}  trees={m['n_estimators']:<4} "
+                  f"rows={m['rows']:<6} data={m['data_version']}  MAE={m['mae']:.3f}  fit={m['fit_seconds']:.1f}s")
+        return 0
+
+    try:
+        src = promote(args.version)
+    except KeyError as e:
+        print(f"❌ {e.args[0]}")
+        return 1
+    print(f"✅ {src} is now {MODEL_PATH}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
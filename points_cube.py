@@ -0,0 +1,213 @@
+#This file precomputes cumulative championship points per (season, round, driver/constructor), cached in data/cache/.
+#Usage: python points_cube.py [--year 2021 --round 10] [--constructors]
+
+import os
+import json
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from data_cache import DATA_DIR, CACHE_FORMAT, cache_paths, load_table, read_frame, source_fingerprint, write_frame
+from enriched_tables import load_lean
+from instrumentation import span
+
+CUBE_VERSION = 1
+SOURCES = ["results", "races", "sprint_results"]
+ENTITIES = {"driver": "driverId", "constructor": "constructorId"}
+
+
+# ================================
+# Inputs
+# ================================
+def race_points(data_dir: str = DATA_DIR) -> pd.DataFrame:
+    df = load_lean("results", "points", data_dir)
+    sprint_path = os.path.join(data_dir, "sprint_results.csv")
+    if os.path.exists(sprint_path):
+        races = load_table("races", data_dir)[["raceId", "year", "round"]]
+        sprint = load_table("sprint_results", data_dir)[["raceId", "driverId", "constructorId", "points"]]
+        df = pd.concat([df, sprint.merge(races, on="raceId", how="inner")[df.columns]], ignore_index=True)
+    df = df.dropna(subset=["raceId", "year", "round"])
+    return df.astype({"raceId": "int64", "year": "int64", "round": "int64"}).assign(
+        points=df["points"].astype("float64").fillna(0.0))
+
+
+# ================================
+# Cube
+# ================================
+def build_cube(points: pd.DataFrame, key: str) -> pd.DataFrame:
+    points = points.dropna(subset=[key]).astype({key: "int64"})
+    # rounds × entities, all seasons at once; NaN = no result that round
+    wide = points.pivot_table(index=["year", "round", "raceId"], columns=key, values="points", aggfunc="sum")
+    wide = wide.fillna(0.0)
+    cumulative = wide.groupby(level="year").cumsum()
+
+    cube = pd.DataFrame({
+        "points": wide.stack(),
+        "cum_points": cumulative.stack(),
+    }).reset_index()
+    # Keep each season's own entrants only (the pivot has every entity of every season as a column)
+    entrants = points[["year", key]].drop_duplicates()
+    cube = cube.merge(entrants, on=["year", key], how="inner")
+    cube = cube.sort_values(["year", "round", key], kind="stable").reset_index(drop=True)
+    return cube.astype({"year": "int16", "round": "int16", "raceId": "int32", key: "int32"})[
+        ["year", "round", "raceId", key, "points", "cum_points"]]
+
+
+class PointsCube:
+    def __init__(self, drivers: pd.DataFrame, constructors: pd.DataFrame):
+        self.tables = {"driver": drivers, "constructor": constructors}
+        self._years = {e: t["year"].to_numpy() for e, t in self.tables.items()}
+
+    @classmethod
+    def load(cls, data_dir: str = DATA_DIR, rebuild: bool = False) -> "PointsCube":
+        return cls(*update_cube(data_dir, rebuild))
+
+    def _season_rows(self, year: int, entity: str) -> pd.DataFrame:
+        if entity not in self.tables:
+            raise ValueError(f"Unknown entity '{entity}'. Choose from: {', '.join(self.tables)}")
+        years = self._years[entity]
+        lo, hi = np.searchsorted(years, year, side="left"), np.searchsorted(years, year, side="right")
+        return self.tables[entity].iloc[lo:hi]
+
+    def seasons(self, entity: str = "driver") -> list[int]:
+        return np.unique(self._years[entity]).tolist()
+
+    def season(self, year: int, entity: str = "driver") -> pd.DataFrame:
+        rows = self._season_rows(int(year), entity)
+        return rows.pivot(index="raceId", columns=ENTITIES[entity], values="cum_points").reindex(
+            rows["raceId"].drop_duplicates())
+
+    def standings_after(self, year: int, round: int | None = None, entity: str = "driver") -> pd.DataFrame:
+        rows = self._season_rows(int(year), entity)
+        if rows.empty:
+            return rows.assign(position=pd.Series(dtype="int64"))
+        last = rows["round"].max() if round is None else rows.loc[rows["round"] <= round, "round"].max()
+        table = rows[rows["round"] == last][[ENTITIES[entity], "round", "cum_points"]]
+        table = table.sort_values("cum_points", ascending=False, kind="stable").reset_index(drop=True)
+        return table.assign(position=table["cum_points"].rank(method="min", ascending=False).astype("int64"))
+
+
+# ================================
+# Store (data/cache/points_<entity>.parquet)
+# ================================
+def _fingerprints(data_dir: str) -> dict:
+    out = {}
+    for name in SOURCES:
+        path = os.path.join(data_dir, f"{name}.csv")
+        out[name] = source_fingerprint(path) if os.path.exists(path) else None
+    return out
+
+
+def _read_store(data_dir: str) -> tuple | None:
+    frames = []
+    for entity in ENTITIES:
+        path, manifest_path = cache_paths(f"points_{entity}", data_dir)
+        if not (os.path.exists(path) and os.path.exists(manifest_path)):
+            return None
+        try:
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+            if (manifest.get("cube_version") != CUBE_VERSION or manifest.get("format") != CACHE_FORMAT
+                    or manifest.get("sources") != _fingerprints(data_dir)):
+                return None
+            frames.append(read_frame(path))
+        except Exception:
+            return None  # unreadable store → rebuild
+    return tuple(frames)
+
+
+def update_cube(data_dir: str = DATA_DIR, rebuild: bool = False) -> tuple[pd.DataFrame, pd.DataFrame]:
+    stored = None if rebuild else _read_store(data_dir)
+    if stored is not None:
+        return stored
+
+    points = race_points(data_dir)
+    frames = []
+    for entity, key in ENTITIES.items():
+        with span("points.cube", entity=entity, rows=len(points)):
+            cube = build_cube(points, key)
+        path, manifest_path = cache_paths(f"points_{entity}", data_dir)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        write_frame(cube, path)
+        with open(manifest_path, "w") as f:
+            json.dump({
+                "cube_version": CUBE_VERSION,
+                "format": CACHE_FORMAT,
+                "sources": _fingerprints(data_dir),
+                "rows": len(cube),
+            }, f, indent=2)
+        frames.append(cube)
+    return tuple(frames)
+
+
+# ================================
+# Validation against the official standings
+# ================================
+# Dropped-score seasons and missing sprint points show up here as mismatches.
+def validate(cube: PointsCube, data_dir: str = DATA_DIR, tolerance: float = 1e-6) -> pd.DataFrame:
+    reports = []
+    for entity, key in ENTITIES.items():
+        standings = load_table(f"{entity}_standings", data_dir)[["raceId", key, "points"]].dropna()
+        standings = standings.astype({"raceId": "int64", key: "int64", "points": "float64"})
+        ours = cube.tables[entity][["year", "raceId", key, "cum_points"]].astype({"raceId": "int64", key: "int64"})
+        merged = standings.merge(ours, on=["raceId", key], how="left")
+        races = load_table("races", data_dir)[["raceId", "year"]].dropna().astype("int64")
+        merged["year"] = merged["raceId"].map(races.set_index("raceId")["year"])
+        diff = (merged["points"] - merged["cum_points"]).abs()
+        merged["mismatch"] = diff.isna() | (diff > tolerance)
+        merged["diff"] = diff
+        per_season = merged.groupby("year").agg(rows=("mismatch", "size"), mismatched=("mismatch", "sum"),
+                                                max_diff=("diff", "max"))
+        reports.append(per_season.reset_index().assign(entity=entity))
+    report = pd.concat(reports, ignore_index=True)
+    report["year"] = report["year"].astype("int64")
+    return report[["entity", "year", "rows", "mismatched", "max_diff"]]
+
+
+def print_validation(report: pd.DataFrame) -> None:
+    for entity, block in report.groupby("entity", sort=False):
+        exact = block[block["mismatched"] == 0]
+        print(f"📊 {entity}: {len(exact)}/{len(block)} seasons match the official standings exactly "
+              f"({int(block['rows'].sum())} standings rows checked)")
+        off = block[block["mismatched"] > 0]
+        if len(off):
+            years = ", ".join(str(y) for y in off["year"])
+            print(f"   ⚠️ differ in: {years}")
+    if (report["mismatched"] > 0).any():
+        print("   (expected where not every result counted — dropped scores, best car only, penalties — "
+              "or where sprint points exist but data/sprint_results.csv doesn't)")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Cumulative points cube by season, round and driver/constructor")
+    parser.add_argument("--year", type=int, help="Print the standings of this season instead of validating")
+    parser.add_argument("--round", type=int, help="Standings after this round (default: the last one)")
+    parser.add_argument("--constructors", action="store_true")
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--rebuild", action="store_true")
+    args = parser.parse_args(argv)
+
+    cube = PointsCube.load(rebuild=args.rebuild)
+    if args.year is None:
+        print_validation(validate(cube))
+        return 0
+
+    entity = "constructor" if args.constructors else "driver"
+    table = cube.standings_after(args.year, args.round, entity)
+    if table.empty:
+        print(f"❌ No results for season {args.year}")
+        return 1
+    if entity == "driver":
+        names = load_table("drivers")[["driverId", "surname"]].rename(columns={"surname": "name"})
+    else:
+        names = load_table("constructors")[["constructorId", "name"]]
+    names = dict(zip(names[ENTITIES[entity]].astype("int64"), names["name"].astype(str)))
+    print(f"🏆 {entity.capitalize()} standings {args.year} after round {int(table['round'].iloc[0])}")
+    for row in table.head(args.top).itertuples(index=False):
+        print(f"{row.position:>3}. {names.get(getattr(row, ENTITIES[entity]), '?'):<24}{row.cum_points:>7.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,20 +1,30 @@
 #This is the main file to predict qualifying, just run it.
 
-import joblib
-import pandas as pd
+import argparse
 
-# Load model and encoders
-model = joblib.load("model/qualifying_model.pkl")
-le_driver = joblib.load("model/driver_encoder.pkl")
-le_constructor = joblib.load("model/constructor_encoder.pkl")
-le_circuit = joblib.load("model/circuit_encoder.pkl")
+from model_registry import resolve_model_path
+from qualifying_predictor import QualifyingPredictor, rank_predictions
 
-# Load current grid (driver/constructor pairs)
-grid_df = pd.read_csv("model/valid_pairs.csv")
+parser = argparse.ArgumentParser(description="Predict qualifying order for the current grid")
+model_choice = parser.add_mutually_exclusive_group()
+model_choice.add_argument("--model-version", help='Registry version to use (e.g. 3 or "latest"); default: model/qualifying_model.pkl')
+model_choice.add_argument("--model-path", help="Model file or flat directory written by model_artifacts.py")
+parser.add_argument("--simulate", type=int, metavar="DRAWS", nargs="?", const=10_000,
+                    help="Monte Carlo mode: pole / top-10 probability and expected position from the individual trees")
+args = parser.parse_args()
+
+# Load model, encoders and current grid (driver/constructor pairs)
+try:
+    model_path = args.model_path or resolve_model_path(args.model_version)
+except KeyError as e:
+    print(f"❌ {e.args[0]}")
+    raise SystemExit(1)
+predictor = QualifyingPredictor.load(model_path)
 
 # -------- Inputs --------
-circuitId_raw = int(input("Enter circuit ID (e.g., 14 for Spa): ").strip())
-year = int(input("Enter season year (e.g., 2025): ").strip() or "2025")
+# Several circuits/years can be given comma-separated; the whole batch is predicted in one call
+circuit_ids = [int(c.strip()) for c in input("Enter circuit ID (e.g., 14 for Spa): ").split(",") if c.strip()]
+years = [int(y.strip()) for y in (input("Enter season year (e.g., 2025): ").strip() or "2025").split(",") if y.strip()]
 
 top_k_raw = input("How many to show? (5 / 10 / all): ").strip().lower()
 
@@ -29,52 +39,54 @@ def parse_topk(s: str, max_len: int) -> int | None:
     except ValueError:
         return 10  # sensible default
 
-# Encode circuit ID
+# -------- Simulate (optional) --------
+if args.simulate:
+    from simulate_qualifying import print_simulation, simulation_frame
+
+    try:
+        sim = simulation_frame(predictor, circuit_ids, years, draws=args.simulate)
+    except KeyError as e:
+        print(f"❌ {e.args[0]}")
+        print("Available circuit IDs the model knows:", predictor.known_circuits())
+        raise SystemExit(1)
+    print_simulation(sim, parse_topk(top_k_raw, len(predictor.grid)), draws=args.simulate)
+    raise SystemExit(0)
+
+# -------- Predict --------
 try:
-    circuit_encoded = le_circuit.transform([circuitId_raw])[0]
-except Exception:
-    print(f"❌ Circuit ID '{circuitId_raw}' not found in training data.")
-    print("Available circuit IDs the model knows:", list(le_circuit.classes_))
+    ranked = rank_predictions(predictor.predict(circuit_ids, years))
+except KeyError as e:
+    print(f"❌ {e.args[0]}")
+    print("Available circuit IDs the model knows:", predictor.known_circuits())
     raise SystemExit(1)
 
-# -------- Predict --------
-predictions = []
+# -------- Output --------
+for (circuitId_raw, year), block in ranked.groupby(["circuitId", "year"], sort=False):
+    predictions = list(block[["driver_name", "constructor_name", "predicted_position"]].itertuples(index=False))
+    circuit_encoded = block["circuit_encoded"].iloc[0]
 
-for _, row in grid_df.iterrows():
-    driver, constructor = row["driver_name"], row["constructor_name"]
-    try:
-        X = pd.DataFrame([{
-            "driver_name": le_driver.transform([driver])[0],
-            "constructor_name": le_constructor.transform([constructor])[0],
-            "circuitId": circuit_encoded,
-            "year": year
-        }])
-        yhat = model.predict(X)[0]
-        predictions.append((driver, constructor, float(yhat)))
-    except Exception:
-        # skip unseen labels not in encoders
-        continue
-
-# Sort best (lowest predicted position first)
-predictions.sort(key=lambda x: x[2])
-
-# Determine how many to show
-k = parse_topk(top_k_raw, len(predictions))
-to_show = predictions if k is None else predictions[:k]
+    # Determine how many to show
+    k = parse_topk(top_k_raw, len(predictions))
+    to_show = predictions if k is None else predictions[:k]
 
-# -------- Output --------
-encoded_str = f"(Encoded ID {circuit_encoded})" if isinstance(circuit_encoded, (int, float)) else ""
-hdr = f"\n📍 Predicted Qualifying for Circuit ID {circuitId_raw} {encoded_str} — Year {year}"
-print(hdr)
-
-for i, (driver, constructor, pos) in enumerate(to_show, start=1):
-    rank_str = f"{i}."
-    print(f"{rank_str} {driver} ({constructor}) — Position: {pos:.2f}")
-
-# If user chose a small top-k, also show who was next (optional)
-if k is not None and len(predictions) > k:
-    next_up = predictions[k:min(k+3, len(predictions))]
-    if next_up:
-        print("\n…Next in order:")
-        for i, (driver, constructor, pos) in enumerate(next_up, start=k+1):
-            print(f"{i}. {driver} ({constructor}) — Position: {pos:.2f}")
+    encoded_str = f"(Encoded ID {circuit_encoded})" if isinstance(circuit_encoded, (int, float)) else ""
+    hdr = f"\n📍 Predicted Qualifying for Circuit ID {circuitId_raw} {encoded_str} — Year {year}"
+    print(hdr)
+
+    for i, (driver, constructor, pos) in enumerate(to_show, start=1):
+        rank_str = f"{i}."
+        print(f"{rank_str} {driver} ({constructor}) — Position: {pos:.2f}")
+
+    # If user chose a small top-k, also show who was next (optional)
+    if k is not None and len(predictions) > k:
+        next_up = predictions[k:min(k+3, len(predictions))]
+        if next_up:
+            print("\n…Next in order:")
+            for i, (driver, constructor, pos) in enumerate(next_up, start=k+1):
+                print(f"{i}. {driver} ({constructor}) — Position: {pos:.2f}")
+
+# Grid pairs the model can't encode are reported, not silently dropped
+if not predictor.skipped.empty:
+    print("\n⚠️ Not predicted (unknown to the model, retrain after ingesting their races):")
+    for driver, constructor, reason in predictor.skipped.itertuples(index=False):
+        print(f"   {driver} ({constructor}) — {reason}")
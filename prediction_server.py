@@ -0,0 +1,214 @@
+#This file runs a long-lived local prediction server: GET /predict?circuitId=14&year=2025&top_k=10, GET /health.
+#Usage: python prediction_server.py [--port 8765 | --socket /tmp/f1.sock]
+
+import os
+import json
+import argparse
+import threading
+import socketserver
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+from encoders import ENCODERS_PATH
+from instrumentation import span
+from model_registry import resolve_model_path
+from qualifying_predictor import (
+    QualifyingPredictor, rank_predictions, MODEL_PATH, GRID_PATH,
+)
+
+DEFAULT_CACHE_SIZE = 256
+
+
+# ================================
+# Warm predictor + LRU result cache
+# ================================
+class PredictionService:
+    # model_version="latest" follows the registry: a version registered later is picked up on the next request
+
+    def __init__(self, model_path: str = MODEL_PATH, grid_path: str = GRID_PATH,
+                 cache_size: int = DEFAULT_CACHE_SIZE, model_version: str | None = None):
+        self.model_version = model_version
+        self.model_path = resolve_model_path(model_version) if model_version else model_path
+        self.grid_path = grid_path
+        self.cache_size = cache_size
+        self.lock = threading.Lock()
+        self.reload_lock = threading.Lock()  # one reload at a time; other requests keep the loaded model meanwhile
+        self.failed = None  # (model_path, fingerprint) of the last load that failed, not retried until files change
+        self.cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.generation = 0  # bumped on every reload, so an answer from the old model is never cached
+        self._load(self.model_path)
+
+    def _watched(self, model_path: str) -> list[str]:
+        # A flat (memory-mapped) model is a directory; its meta.json is rewritten last on every save
+        model_file = os.path.join(model_path, "meta.json") if os.path.isdir(model_path) else model_path
+        return [model_file, self.grid_path, ENCODERS_PATH]
+
+    def _fingerprint(self, model_path: str) -> tuple:
+        return tuple((os.stat(p).st_mtime_ns, os.stat(p).st_size) for p in self._watched(model_path))
+
+    def _load(self, model_path: str) -> None:
+        fingerprint = self._fingerprint(model_path)
+        predictor = QualifyingPredictor.load(model_path, self.grid_path)
+        with self.lock:
+            self.predictor = predictor
+            self.model_path = model_path
+            self.fingerprint = fingerprint
+            self.generation += 1
+            self.cache.clear()
+
+    def _is_current(self, model_path: str, fingerprint: tuple) -> bool:
+        return (model_path, fingerprint) in ((self.model_path, self.fingerprint), self.failed)
+
+    def _refresh_if_changed(self) -> None:
+        # New "latest" version, or model (or encoders/grid) replaced on disk → reload and drop every cached answer
+        try:
+            model_path = resolve_model_path(self.model_version) if self.model_version else self.model_path
+            fingerprint = self._fingerprint(model_path)
+        except FileNotFoundError:
+            # Caught mid-replace (FlatForest.save / registry rename): keep serving the loaded model, retry next time
+            return
+        if self._is_current(model_path, fingerprint) or not self.reload_lock.acquire(blocking=False):
+            return
+        try:
+            if self._is_current(model_path, fingerprint):  # another request reloaded it meanwhile
+                return
+            print(f"🔄 Model files changed, reloading {model_path} and clearing cache")
+            self._load(model_path)
+        except Exception as e:
+            # Half-written or corrupt file: keep serving the loaded model until the files change again
+            self.failed = (model_path, fingerprint)
+            print(f"⚠️ Reloading {model_path} failed ({type(e).__name__}: {e}); still serving {self.model_path}")
+        finally:
+            self.reload_lock.release()
+
+    def predict(self, circuit_id: int, year: int) -> tuple[list[dict], bool]:
+        key = (circuit_id, year)
+        self._refresh_if_changed()
+        with self.lock:
+            if key in self.cache:
+                self.cache.move_to_end(key)
+                self.hits += 1
+                return self.cache[key], True
+            predictor, generation = self.predictor, self.generation
+
+        # Outside the lock: concurrent misses predict in parallel
+        with span("server.predict", circuit_id=circuit_id, year=year):
+            ranked = rank_predictions(predictor.predict([circuit_id], [year]))
+            rows = [
+                {"rank": i, "driver_name": d, "constructor_name": c, "predicted_position": round(float(p), 4)}
+                for i, (d, c, p) in enumerate(
+                    ranked[["driver_name", "constructor_name", "predicted_position"]].itertuples(index=False),
+                    start=1,
+                )
+            ]
+
+        with self.lock:
+            if generation == self.generation:
+                self.cache[key] = rows
+                if len(self.cache) > self.cache_size:
+                    self.cache.popitem(last=False)
+            self.misses += 1
+        return rows, False
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {"cached": len(self.cache), "hits": self.hits, "misses": self.misses,
+                    "skipped_pairs": self.predictor.skipped.to_dict(orient="records")}
+
+
+# ================================
+# HTTP layer
+# ================================
+class PredictionHandler(BaseHTTPRequestHandler):
+    service: PredictionService = None  # set by make_server
+
+    def _send(self, status: int, payload: dict) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def address_string(self) -> str:
+        # Unix-socket clients have no (host, port) address
+        return self.client_address[0] if self.client_address else "unix"
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == "/health":
+            self._send(200, {"status": "ok", **self.service.stats()})
+            return
+        if url.path != "/predict":
+            self._send(404, {"error": f"Unknown path {url.path}"})
+            return
+
+        params = parse_qs(url.query)
+        try:
+            circuit_id = int(params["circuitId"][0])
+            year = int(params.get("year", ["2025"])[0])
+            top_k = params.get("top_k", ["all"])[0].lower()
+            top_k = None if top_k in ("all", "", "a") else max(int(top_k), 1)
+        except (KeyError, ValueError):
+            self._send(400, {"error": "Expected ?circuitId=<int>&year=<int>&top_k=<int|all>"})
+            return
+
+        try:
+            rows, cached = self.service.predict(circuit_id, year)
+        except KeyError as e:
+            self._send(404, {"error": e.args[0]})
+            return
+
+        self._send(200, {
+            "circuitId": circuit_id,
+            "year": year,
+            "cached": cached,
+            "predictions": rows if top_k is None else rows[:top_k],
+        })
+
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def make_server(service: PredictionService, host: str = "127.0.0.1", port: int = 8765, socket_path: str | None = None):
+    handler = type("BoundPredictionHandler", (PredictionHandler,), {"service": service})
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        return UnixHTTPServer(socket_path, handler)
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Warm local qualifying prediction server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--socket", help="Serve on this Unix socket path instead of TCP")
+    parser.add_argument("--cache-size", type=int, default=DEFAULT_CACHE_SIZE)
+    model_choice = parser.add_mutually_exclusive_group()
+    model_choice.add_argument("--model-version", help='Pin a registry version (e.g. 3 or "latest"); default: ' + MODEL_PATH)
+    model_choice.add_argument("--model-path", help="Model file or flat directory from model_artifacts.py; "
+                                                   "flat models are memory-mapped and shared between processes")
+    args = parser.parse_args()
+
+    service = PredictionService(args.model_path or MODEL_PATH, cache_size=args.cache_size,
+                                model_version=None if args.model_path else args.model_version)
+    server = make_server(service, args.host, args.port, args.socket)
+    where = args.socket or f"http://{args.host}:{args.port}"
+    print(f"🏁 Prediction server ready on {where}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if args.socket and os.path.exists(args.socket):
+            os.remove(args.socket)
+
+
+if __name__ == "__main__":
+    main()
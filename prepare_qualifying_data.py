@@ -1,28 +1,39 @@
 #Don't run this unless you are manually changing the dataset!!!
 
+import argparse
 import pandas as pd
 import os
-import joblib
-from sklearn.preprocessing import LabelEncoder
 
-# Load data
-qualifying = pd.read_csv("data/qualifying.csv")
-races = pd.read_csv("data/races.csv")
-drivers = pd.read_csv("data/drivers.csv")
-constructors = pd.read_csv("data/constructors.csv")
-results = pd.read_csv("data/results.csv")
+from encoders import ENCODERS_PATH, EncoderSet
+from enriched_tables import load_lean
+from ingest_round import write_ledger
 
-# Merge necessary fields to qualifying
-df = qualifying.merge(races[['raceId', 'year', 'circuitId']], on='raceId', how='left')
-df = df.merge(drivers[['driverId', 'surname']], on='driverId', how='left')
-df = df.merge(constructors[['constructorId', 'name']], on='constructorId', how='left')
+parser = argparse.ArgumentParser(description="Rebuild model/cleaned_qualifying.csv, the encoders and the current grid")
+parser.add_argument("--chunksize", type=int, metavar="ROWS",
+                    help="Stream the source CSVs this many rows at a time instead of loading them whole (same outputs)")
+args = parser.parse_args()
+
+if args.chunksize:
+    from streaming import prepare_qualifying
+
+    summary = prepare_qualifying(args.chunksize)
+    print(f"✅ Cleaned qualifying dataset saved to model/cleaned_qualifying.csv ({summary['rows']} rows, {summary['races']} races)")
+    print(f"✅ Valid driver–constructor pairs saved to model/valid_pairs.csv ({summary['grid']} pairs)")
+    raise SystemExit(0)
+
+# Load pre-joined data (races, drivers, constructors already merged in), only the columns used here
+df = load_lean("qualifying", "training")
+results = load_lean("results", "training")
 
 # Rename for clarity
 df.rename(columns={
     'surname': 'driver_name',
-    'name': 'constructor_name'
+    'name_constructor': 'constructor_name'
 }, inplace=True)
 
+# Races covered by this build (ingest_round.py appends anything newer)
+race_ids = df['raceId'].dropna().unique()
+
 # Keep necessary columns
 df = df[['driver_name', 'constructor_name', 'circuitId', 'year', 'position']]
 
@@ -30,29 +41,22 @@ df = df[['driver_name', 'constructor_name', 'circuitId', 'year', 'position']]
 df['position'] = pd.to_numeric(df['position'], errors='coerce')
 df.dropna(subset=['position'], inplace=True)
 
-# Label encode
-le_driver = LabelEncoder()
-le_constructor = LabelEncoder()
-le_circuit = LabelEncoder()
+# Label encode (codes stay fixed when ingest_round.py later adds new drivers/teams)
+encoders = EncoderSet.fit(df)
 
-df['driver_name'] = le_driver.fit_transform(df['driver_name'])
-df['constructor_name'] = le_constructor.fit_transform(df['constructor_name'])
-df['circuitId'] = le_circuit.fit_transform(df['circuitId'])
+for col in encoders:
+    df[col] = encoders[col].transform(df[col])
 
 # Save encoders and cleaned dataset
 os.makedirs("model", exist_ok=True)
-joblib.dump(le_driver, "model/driver_encoder.pkl")
-joblib.dump(le_constructor, "model/constructor_encoder.pkl")
-joblib.dump(le_circuit, "model/circuit_encoder.pkl")
+encoders.save(ENCODERS_PATH)
 df.to_csv("model/cleaned_qualifying.csv", index=False)
+write_ledger(race_ids, len(df))
 
 # Extract only latest driver-constructor pairs from real race data
-results = results.merge(races[['raceId', 'year']], on='raceId', how='left')
 latest_year = results['year'].max()
 latest_results = results[results['year'] == latest_year]
-latest_results = latest_results.merge(drivers[['driverId', 'surname']], on='driverId', how='left')
-latest_results = latest_results.merge(constructors[['constructorId', 'name']], on='constructorId', how='left')
-valid_pairs = latest_results[['surname', 'name']].drop_duplicates()
+valid_pairs = latest_results[['surname', 'name_constructor']].drop_duplicates()
 valid_pairs.columns = ['driver_name', 'constructor_name']
 valid_pairs.to_csv("model/valid_pairs.csv", index=False)
 
@@ -7,15 +7,17 @@ import joblib
 
 data = pd.read_csv("data/clean_qualifying.csv")
 
-from sklearn.preprocessing import LabelEncoder
+from encoders import EncoderSet
 
-le_driver = LabelEncoder()
-le_constructor = LabelEncoder()
-le_circuit = LabelEncoder()
+# Full names from clean_qualifying.csv: a label space of its own, kept apart from model/encoders.json
+# (append-only, used by the regressor and ingest_round.py) and from the regressor's model file
+CLASSIFIER_PATH = "model/qualifying_classifier.pkl"
+CLASSIFIER_ENCODERS_PATH = "model/classifier_encoders.json"
 
-data['driver_name'] = le_driver.fit_transform(data['driver_name'])
-data['constructor_name'] = le_constructor.fit_transform(data['constructor_name'])
-data['circuitId'] = le_circuit.fit_transform(data['circuitId'])
+encoders = EncoderSet.fit(data)
+
+for col in encoders:
+    data[col] = encoders[col].transform(data[col])
 
 X = data[['driver_name', 'constructor_name', 'circuitId', 'year']]
 y = data['position'].astype(int)
@@ -31,7 +33,6 @@ y_pred = model.predict(X_test)
 print("\n🎯 Accuracy:", accuracy_score(y_test, y_pred))
 print("\n📊 Classification Report:\n", classification_report(y_test, y_pred))
 
-joblib.dump(model, "model/qualifying_model.pkl")
-joblib.dump(le_driver, "model/driver_encoder.pkl")
-joblib.dump(le_constructor, "model/constructor_encoder.pkl")
-joblib.dump(le_circuit, "model/circuit_encoder.pkl")
+encoders.save(CLASSIFIER_ENCODERS_PATH)
+joblib.dump(model, CLASSIFIER_PATH)
+print(f"✅ Classifier saved to {CLASSIFIER_PATH}, encoders to {CLASSIFIER_ENCODERS_PATH}")
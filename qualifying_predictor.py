@@ -0,0 +1,121 @@
+#This file holds the batched qualifying predictor used by predict_qualifying.py.
+
+import numpy as np
+import pandas as pd
+
+from encoders import ENCODERS_PATH, EncoderSet
+from instrumentation import span
+
+MODEL_PATH = "model/qualifying_model.pkl"
+GRID_PATH = "model/valid_pairs.csv"
+
+# Column order the model was trained on (see train_qualifying_model.py)
+FEATURES = ["driver_name", "constructor_name", "circuitId", "year"]
+
+
+class QualifyingPredictor:
+    def __init__(self, model, encoders: EncoderSet, grid_df: pd.DataFrame):
+        self.model = model
+        self.encoders = encoders
+        # Models trained with --with-features also need the feature store's columns
+        self.feature_names = list(getattr(model, "feature_names_in_", FEATURES))
+        self.extra_features = [f for f in self.feature_names if f not in FEATURES]
+        self._upcoming = None
+        self.set_grid(grid_df)
+
+    @classmethod
+    def load(cls, model_path: str = MODEL_PATH, grid_path: str = GRID_PATH,
+             encoders_path: str = ENCODERS_PATH) -> "QualifyingPredictor":
+        # model_path may be any format written by model_artifacts.py (pickle, compressed or a flat directory)
+        from model_artifacts import load_model
+
+        with span("model.load", path=model_path):
+            return cls(load_model(model_path), EncoderSet.load(encoders_path), pd.read_csv(grid_path))
+
+    def set_grid(self, grid_df: pd.DataFrame) -> None:
+        # Encode the grid once. Pairs the encoders never saw can't be predicted: they are kept in
+        # self.skipped (with the reason) so callers can report them instead of silently dropping them.
+        driver_codes, driver_ok = self.encoders.encode("driver_name", grid_df["driver_name"], unknown="mask")
+        constructor_codes, constructor_ok = self.encoders.encode("constructor_name", grid_df["constructor_name"], unknown="mask")
+        keep = driver_ok & constructor_ok
+
+        self.grid = grid_df.loc[keep, ["driver_name", "constructor_name"]].reset_index(drop=True)
+        skipped = grid_df.loc[~keep, ["driver_name", "constructor_name"]].reset_index(drop=True)
+        reasons = np.where(~driver_ok[~keep] & ~constructor_ok[~keep], "unknown driver and constructor",
+                           np.where(~driver_ok[~keep], "unknown driver", "unknown constructor"))
+        self.skipped = skipped.assign(reason=reasons)
+        self.driver_codes = driver_codes[keep]
+        self.constructor_codes = constructor_codes[keep]
+
+    def known_circuits(self) -> list:
+        return self.encoders["circuitId"].classes_.tolist()
+
+    def encode_circuits(self, circuit_ids) -> np.ndarray:
+        codes, known = self.encoders.encode("circuitId", circuit_ids, unknown="mask")
+        if not known.all():
+            unknown = ", ".join(str(c) for c in np.asarray(circuit_ids)[~known].tolist())
+            raise KeyError(f"Circuit ID '{unknown}' not found in training data.")
+        return codes
+
+    def upcoming_features(self, circuit_ids, years) -> pd.DataFrame:
+        if self._upcoming is None:
+            from feature_store import UpcomingFeatures
+            self._upcoming = UpcomingFeatures()
+        return self._upcoming.frame(self.grid, circuit_ids, years)
+
+    def features(self, circuit_ids, years) -> pd.DataFrame:
+        circuit_ids, years = list(circuit_ids), list(years)
+        circuit_codes = self.encode_circuits(circuit_ids)
+        n_c, n_y, n_d = len(circuit_ids), len(years), len(self.grid)
+
+        # Row order reshapes cleanly to (C, Y, D)
+        X = pd.DataFrame({
+            "driver_name": np.tile(self.driver_codes, n_c * n_y),
+            "constructor_name": np.tile(self.constructor_codes, n_c * n_y),
+            "circuitId": np.repeat(circuit_codes, n_y * n_d),
+            "year": np.tile(np.repeat(np.asarray(years, dtype=np.int64), n_d), n_c),
+        })
+        if self.extra_features:
+            X = pd.concat([X, self.upcoming_features(circuit_ids, years)[self.extra_features]], axis=1)
+        return X[self.feature_names]
+
+    def predict(self, circuit_ids, years) -> pd.DataFrame:
+        circuit_ids, years = list(circuit_ids), list(years)
+        n_c, n_y, n_d = len(circuit_ids), len(years), len(self.grid)
+        X = self.features(circuit_ids, years)
+        with span("model.predict", rows=len(X)):
+            yhat = self.model.predict(X) if len(X) else np.empty(0)
+
+        return pd.DataFrame({
+            "circuitId": np.repeat(circuit_ids, n_y * n_d),
+            "circuit_encoded": X["circuitId"].to_numpy(),
+            "year": X["year"].to_numpy(),
+            "driver_name": np.tile(self.grid["driver_name"].to_numpy(), n_c * n_y),
+            "constructor_name": np.tile(self.grid["constructor_name"].to_numpy(), n_c * n_y),
+            "predicted_position": yhat.astype(float),
+        })
+
+    def predict_matrix(self, circuit_ids, years) -> np.ndarray:
+        circuit_ids, years = list(circuit_ids), list(years)
+        preds = self.predict(circuit_ids, years)["predicted_position"].to_numpy()
+        return preds.reshape(len(circuit_ids), len(years), len(self.grid))
+
+    def predict_trees(self, circuit_ids, years) -> np.ndarray:
+        from model_artifacts import tree_predictions
+
+        circuit_ids, years = list(circuit_ids), list(years)
+        X = self.features(circuit_ids, years)
+        with span("model.predict_trees", rows=len(X)):
+            return tree_predictions(self.model, X).reshape(-1, len(circuit_ids), len(years), len(self.grid))
+
+
+def rank_predictions(preds: pd.DataFrame) -> pd.DataFrame:
+    # Best (lowest predicted position) first within each circuit/year block, keeping the blocks in
+    # the order they were asked for. Stable, so ties keep grid order.
+    block = preds.groupby(["circuitId", "year"], sort=False).ngroup()
+    return (
+        preds.assign(_block=block)
+        .sort_values(["_block", "predicted_position"], kind="stable")
+        .drop(columns="_block")
+        .reset_index(drop=True)
+    )
@@ -0,0 +1,80 @@
+#This file renders chart jobs headlessly, in this process or over a process pool (one worker per core).
+
+import os
+import time
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+import matplotlib
+matplotlib.use("Agg")  # headless; must run before pyplot is imported anywhere in this process
+
+from charts import ChartData, render, save_figure
+from data_cache import DATA_DIR
+
+# Data held by each worker process (inherited from the parent under fork, loaded once under spawn)
+_worker_data = None
+
+
+# Never raises; failures come back in the report.
+def render_job(job: dict, data: ChartData, dpi: int | None = None, fast: bool | None = None) -> dict:
+    import matplotlib.pyplot as plt
+
+    start = time.perf_counter()
+    params = {k: v for k, v in job.items() if k not in ("chart", "output", "fast")}
+    report = {"chart": job.get("chart"), "output": job.get("output"), "pid": os.getpid()}
+    try:
+        fig = render(job["chart"], data, fast=job.get("fast", fast), **params)
+        save_figure(fig, job["output"], dpi=dpi)
+        report["ok"] = True
+    except Exception as e:
+        plt.close("all")
+        report.update(ok=False, error=f"{type(e).__name__}: {e}")
+    report["seconds"] = round(time.perf_counter() - start, 4)
+    return report
+
+
+def render_serial(jobs: list[dict], data: ChartData, dpi: int | None = None,
+                  fast: bool | None = None) -> list[dict]:
+    return [render_job(job, data, dpi, fast) for job in jobs]
+
+
+# ================================
+# Process pool
+# ================================
+def _init_worker(data_dir: str) -> None:
+    global _worker_data
+    if _worker_data is None:
+        _worker_data = ChartData(data_dir).preload()
+
+
+def _pool_job(job: dict, dpi: int | None, fast: bool | None) -> dict:
+    return render_job(job, _worker_data, dpi, fast)
+
+
+def render_parallel(jobs: list[dict], workers: int | None = None, data: ChartData | None = None,
+                    dpi: int | None = None, data_dir: str = DATA_DIR, fast: bool | None = None) -> list[dict]:
+    global _worker_data
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(jobs) <= 1:
+        return render_serial(jobs, data or ChartData(data_dir).preload(), dpi, fast)
+
+    # Prefer fork so workers inherit the parent's already-loaded tables for free
+    methods = mp.get_all_start_methods()
+    ctx = mp.get_context("fork" if "fork" in methods else "spawn")
+    if ctx.get_start_method() == "fork":
+        _worker_data = (data or ChartData(data_dir)).preload()
+
+    reports = [None] * len(jobs)
+    with ProcessPoolExecutor(max_workers=min(workers, len(jobs)), mp_context=ctx,
+                             initializer=_init_worker, initargs=(data_dir,)) as pool:
+        futures = {pool.submit(_pool_job, job, dpi, fast): i for i, job in enumerate(jobs)}
+        for fut in as_completed(futures):
+            i = futures[fut]
+            try:
+                reports[i] = fut.result()
+            except BrokenProcessPool as e:
+                # A worker died hard (e.g. OOM-killed): the pool is gone, so every unfinished job fails
+                reports[i] = {"chart": jobs[i].get("chart"), "output": jobs[i].get("output"),
+                              "ok": False, "error": f"worker crashed: {e}"}
+    return reports
@@ -1,74 +1,90 @@
-import pandas as pd
+import os
+import sys
+import argparse
 
-# Load CSVs from data folder
-qualifying = pd.read_csv('data/qualifying.csv')
-results = pd.read_csv('data/results.csv')
-races = pd.read_csv('data/races.csv')
-drivers = pd.read_csv('data/drivers.csv')
-constructors = pd.read_csv('data/constructors.csv')
-circuits = pd.read_csv('data/circuits.csv')
-driver_standings = pd.read_csv('data/driver_standings.csv')
-constructor_standings = pd.read_csv('data/constructor_standings.csv')
+# Run from the repo root (python scripts/preprocess.py); make the top-level modules importable
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-# Create driver name
-drivers['driver_name'] = drivers['forename'] + ' ' + drivers['surname']
+from data_cache import load_table
+from enriched_tables import load_enriched_qualifying, load_enriched_results
+from feature_store import load_features
 
-# ---------------------------
-# PROCESS QUALIFYING DATASET
-# ---------------------------
-qdf = qualifying.merge(races[['raceId', 'year', 'round', 'circuitId']], on='raceId', how='left')
-qdf = qdf.merge(drivers[['driverId', 'driver_name']], on='driverId', how='left')
-qdf = qdf.merge(constructors[['constructorId', 'name']], on='constructorId', how='left')
-qdf = qdf.rename(columns={'name': 'team'})
-qdf = qdf.merge(circuits[['circuitId', 'name']], on='circuitId', how='left')
-qdf = qdf.rename(columns={'name': 'circuit'})
+parser = argparse.ArgumentParser(description="Write data/cleaned_qualifying.csv and data/cleaned_race.csv")
+parser.add_argument("--chunksize", type=int, metavar="ROWS",
+                    help="Stream qualifying/results this many rows at a time instead of loading them whole (same outputs)")
+args = parser.parse_args()
 
-# Merge driver standings
-qdf = qdf.merge(driver_standings[['raceId', 'driverId', 'points']], on=['raceId', 'driverId'], how='left')
-qdf = qdf.rename(columns={'points': 'driver_points'})
+# Pre-joined tables (races, drivers, constructors, circuits) and the cached feature store.
+# Qualifying points come from the store: championship points *before* each race, so they don't leak the result.
+points = load_features()[['raceId', 'driverId', 'driver_points_before', 'constructor_points_before']]
+points = points.rename(columns={'driver_points_before': 'driver_points', 'constructor_points_before': 'team_points'})
 
-qualifying_df = qdf(columns={'points': 'driver_points'})
 
-# Merge constructor standings
-qdf = qdf.merge(constructor_standings[['raceId', 'constructorId', 'points']], on=['raceId', 'constructorId'], how='left')
-qdf = qdf.rename(columns={'points': 'team_points'})
+def standings_before(table, key, column):
+    # Points going into each race: the standings after the entity's previous race that season (0 before its first).
+    # Only (raceId, key) pairs with a standings row, so race results keep the rows the standings join always kept.
+    races = load_table('races')[['raceId', 'year', 'round']]
+    standings = load_table(table)[['raceId', key, 'points']].dropna().merge(races, on='raceId')
+    standings = standings.sort_values(['year', 'round'], kind='stable')
+    standings[column] = standings.groupby(['year', key])['points'].shift(fill_value=0.0)
+    return standings[['raceId', key, column]]
 
-# Keep best qualifying time
-qdf['qualifying_time'] = qdf[['q1', 'q2', 'q3']].bfill(axis=1).iloc[:, 0]
 
-# Drop rows with missing important values
-qdf = qdf.dropna(subset=['position', 'qualifying_time', 'driver_points', 'team_points'])
+# The store only covers races with qualifying data; race results go back to 1958, so they use the standings
+race_points = (standings_before('driver_standings', 'driverId', 'driver_points'),
+               standings_before('constructor_standings', 'constructorId', 'team_points'))
 
-# Keep only top 10
-qdf = qdf[qdf['position'] <= 10]
 
-# Final cleaned qualifying data
-qdf_final = qdf[['year', 'round', 'driver_name', 'team', 'circuit', 'driver_points', 'team_points', 'position']]
-qdf_final.to_csv('data/cleaned_qualifying.csv', index=False)
+def readable(df):
+    df = df.copy()
+    df['driver_name'] = df['forename'].astype(str) + ' ' + df['surname'].astype(str)
+    return df.rename(columns={'name_constructor': 'team', 'name_circuit': 'circuit'})
 
-print("✅ cleaned_qualifying.csv saved!")
 
-# ------------------------
-# PROCESS RACE RESULT DATASET
-# ------------------------
-rdf = results.merge(races[['raceId', 'year', 'round', 'circuitId']], on='raceId', how='left')
-rdf = rdf.merge(drivers[['driverId', 'driver_name']], on='driverId', how='left')
-rdf = rdf.merge(constructors[['constructorId', 'name']], on='constructorId', how='left')
-rdf = rdf.rename(columns={'name': 'team'})
-rdf = rdf.merge(circuits[['circuitId', 'name']], on='circuitId', how='left')
-rdf = rdf.rename(columns={'name': 'circuit'})
+# ---------------------------
+# PROCESS QUALIFYING DATASET
+# ---------------------------
+def clean_qualifying(qualifying):
+    qdf = readable(qualifying).merge(points, on=['raceId', 'driverId'], how='left')
 
-rdf = rdf.merge(driver_standings[['raceId', 'driverId', 'points']], on=['raceId', 'driverId'], how='left')
-rdf = rdf.rename(columns={'points': 'driver_points'})
+    # Drop rows with missing important values (best_q_ms = best of Q1/Q2/Q3, already parsed)
+    qdf = qdf.dropna(subset=['position', 'best_q_ms', 'driver_points', 'team_points'])
 
-rdf = rdf.merge(constructor_standings[['raceId', 'constructorId', 'points']], on=['raceId', 'constructorId'], how='left')
-rdf = rdf.rename(columns={'points': 'team_points'})
+    # Keep only top 10
+    qdf = qdf[qdf['position'] <= 10]
 
-rdf = rdf.dropna(subset=['positionOrder', 'driver_points', 'team_points'])
-rdf = rdf[rdf['positionOrder'] <= 10]
+    # Final cleaned qualifying data
+    return qdf[['year', 'round', 'driver_name', 'team', 'circuit', 'driver_points', 'team_points', 'position']]
 
-rdf_final = rdf[['year', 'round', 'driver_name', 'team', 'circuit', 'driver_points', 'team_points', 'positionOrder']]
-rdf_final = rdf_final.rename(columns={'positionOrder': 'position'})
-rdf_final.to_csv('data/cleaned_race.csv', index=False)
 
-print("cleaned_race.csv saved!")
+# ------------------------
+# PROCESS RACE RESULT DATASET
+# ------------------------
+def clean_results(results):
+    rdf = readable(results)
+    rdf = rdf.merge(race_points[0], on=['raceId', 'driverId'], how='left')
+    rdf = rdf.merge(race_points[1], on=['raceId', 'constructorId'], how='left')
+
+    rdf = rdf.dropna(subset=['positionOrder', 'driver_points', 'team_points'])
+    rdf = rdf[rdf['positionOrder'] <= 10]
+
+    rdf_final = rdf[['year', 'round', 'driver_name', 'team', 'circuit', 'driver_points', 'team_points', 'positionOrder']]
+    return rdf_final.rename(columns={'positionOrder': 'position'})
+
+
+if args.chunksize:
+    # One joined chunk in memory at a time, appended to the output as it's cleaned
+    from streaming import ChunkWriter, iter_enriched
+
+    for kind, clean, path in [('qualifying', clean_qualifying, 'data/cleaned_qualifying.csv'),
+                              ('results', clean_results, 'data/cleaned_race.csv')]:
+        with ChunkWriter(path) as out:
+            for chunk in iter_enriched(kind, args.chunksize):
+                out.write(clean(chunk))
+        print(f"✅ {os.path.basename(path)} saved! ({out.rows} rows)")
+else:
+    clean_qualifying(load_enriched_qualifying()).to_csv('data/cleaned_qualifying.csv', index=False)
+    print("✅ cleaned_qualifying.csv saved!")
+
+    clean_results(load_enriched_results()).to_csv('data/cleaned_race.csv', index=False)
+    print("✅ cleaned_race.csv saved!")
@@ -0,0 +1,111 @@
+#This file builds the season (driver × round) position and status matrices that SeasonCompare.py plots from.
+
+import numpy as np
+import pandas as pd
+
+STATUS_CODES = ["Finished", "DNF", "DSQ", "DNS", "N/C"]
+NO_ENTRY = "N/A"  # driver wasn't entered for that round
+
+# Ergast positionText for non-classified results:
+# R = retired, D = disqualified, E = excluded, W = withdrawn, F = failed to qualify, N = not classified
+POSITION_TEXT_CODES = {
+    "R": "DNF", "RET": "DNF",
+    "D": "DSQ", "DQ": "DSQ", "DSQ": "DSQ", "E": "DSQ",
+    "W": "DNS", "F": "DNS", "DNS": "DNS",
+    "N": "N/C",
+    "\\N": "Finished",  # Ergast's null; the original scripts plotted these as classified
+}
+
+# Fallback for rows without positionText, using status.csv text when we have it
+STATUS_TEXT_PATTERNS = [
+    ("DSQ", r"DISQUALIF|EXCLUDED"),
+    ("DNS", r"DID NOT START|WITHDREW|DID NOT QUALIFY|DID NOT PREQUALIFY"),
+    ("N/C", r"NOT CLASSIFIED"),
+    ("Finished", r"^FINISHED$|^\+\d+ LAPS?$"),
+]
+
+
+# ================================
+# Vectorized status classification
+# ================================
+def classify_status(position_text: pd.Series, status_text: pd.Series | None = None) -> pd.Series:
+    pt = position_text.astype("string").str.strip().str.upper()
+    codes = pt.map(POSITION_TEXT_CODES).astype("object")
+    codes = codes.where(~pt.str.isdigit().fillna(False).astype(bool), "Finished")
+
+    if status_text is not None:
+        st = status_text.astype("string").str.upper()
+        conds = [st.str.contains(pat, regex=True).fillna(False).to_numpy(dtype=bool) for _, pat in STATUS_TEXT_PATTERNS]
+        from_text = np.select(conds, [code for code, _ in STATUS_TEXT_PATTERNS], default="DNF")
+        # "\N" (a real null once loaded through data_cache) counted as Finished in the original scripts
+        from_text = np.where((st.isna() | (st == "\\N")).fillna(True).to_numpy(dtype=bool), "Finished", from_text)
+        codes = codes.fillna(pd.Series(from_text, index=codes.index))
+
+    return pd.Categorical(codes.fillna("Finished"), categories=STATUS_CODES)
+
+
+# ================================
+# Season matrix
+# ================================
+class SeasonMatrix:
+    def __init__(self, races: pd.DataFrame, drivers: pd.DataFrame, positions: pd.DataFrame,
+                 status: pd.DataFrame, points: pd.Series):
+        self.races = races          # round, raceId, name — in calendar order
+        self.drivers = drivers      # driverId → forename, surname
+        self.positions = positions  # float, NaN where not classified / not entered
+        self.status = status        # STATUS_CODES, NO_ENTRY where not entered
+        self.points = points        # season points per driverId
+
+    @property
+    def race_labels(self) -> list[str]:
+        return self.races["name"].astype(str).tolist()
+
+    def driver_ids(self, surnames) -> list[int]:
+        keys = self.drivers["surname"].astype(str).str.lower()
+        ids = []
+        for s in surnames:
+            ids.extend(self.drivers.index[keys == s.strip().lower()].tolist())
+        return ids
+
+    def label(self, driver_id: int) -> str:
+        # Surname, or full name if another driver in the season shares it
+        surname = str(self.drivers.at[driver_id, "surname"])
+        if (self.drivers["surname"].astype(str) == surname).sum() > 1:
+            return f"{self.drivers.at[driver_id, 'forename']} {surname}"
+        return surname
+
+
+def build_season_matrix(results: pd.DataFrame, year: int) -> SeasonMatrix:
+    season = results[results["year"] == year]
+    if "status_code" not in season.columns:
+        season = season.assign(status_code=classify_status(season["positionText"], season.get("status")))
+
+    races = (
+        season[["round", "raceId", "name"]]
+        .drop_duplicates("raceId")
+        .sort_values("round")
+        .set_index("round")
+    )
+    drivers = (
+        season[["driverId", "forename", "surname"]]
+        .drop_duplicates("driverId")
+        .set_index("driverId")
+    )
+
+    # Shared drives (pre-60s) can give one driver two rows in a race: keep the first, like before
+    firsts = season.sort_values("round", kind="stable").drop_duplicates(["driverId", "raceId"])
+    classified = firsts["status_code"] == "Finished"
+    firsts = firsts.assign(
+        plot_position=firsts["positionOrder"].astype("Float64").where(classified).astype("float64"),
+        status_code=firsts["status_code"].astype(str),
+    )
+
+    positions = firsts.pivot(index="driverId", columns="round", values="plot_position").reindex(columns=races.index)
+    status = (
+        firsts.pivot(index="driverId", columns="round", values="status_code")
+        .reindex(columns=races.index)
+        .fillna(NO_ENTRY)
+    )
+    points = season.groupby("driverId")["points"].sum()
+
+    return SeasonMatrix(races, drivers, positions, status, points)
@@ -0,0 +1,143 @@
+#This file runs a Monte Carlo qualifying simulation from the forest's individual tree predictions.
+#Usage: python simulate_qualifying.py [--year 2025 --circuits 14,9 --draws 20000] [-o out.csv]
+
+import sys
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from data_cache import DATA_DIR, load_table
+from instrumentation import span
+from model_registry import resolve_model_path
+from qualifying_predictor import QualifyingPredictor
+
+DEFAULT_DRAWS = 10_000
+BATCH_DRAWS = 1_000  # draws sampled at once; bounds memory to BATCH × circuits × years × drivers values
+TOP_N = 10
+
+
+def season_calendar(year: int | None = None, data_dir: str = DATA_DIR) -> tuple[int, list[int]]:
+    races = load_table("races", data_dir)[["year", "round", "circuitId"]]
+    seasons = races["year"].dropna().astype(int)
+    if year is None or year not in set(seasons):
+        calendar_year = int(seasons.max())
+    else:
+        calendar_year = year
+    season = races[races["year"] == calendar_year].sort_values("round")
+    return calendar_year, season["circuitId"].astype(int).drop_duplicates().tolist()
+
+
+def simulate(tree_preds: np.ndarray, draws: int = DEFAULT_DRAWS, seed: int | None = 42,
+             batch: int = BATCH_DRAWS, top_n: int = TOP_N) -> dict[str, np.ndarray]:
+    n_trees = tree_preds.shape[0]
+    grid_shape = tree_preds.shape[1:]
+    # (C·Y·D, trees): one row per (circuit, year, driver), so a draw is one fancy-index per row
+    per_row = tree_preds.reshape(n_trees, -1).T
+    rows = np.arange(per_row.shape[0])
+    rng = np.random.default_rng(seed)
+
+    pole = np.zeros(grid_shape, dtype=np.int64)
+    top = np.zeros(grid_shape, dtype=np.int64)
+    position_sum = np.zeros(grid_shape, dtype=np.float64)
+    done = 0
+    while done < draws:
+        b = min(batch, draws - done)
+        picks = rng.integers(0, n_trees, size=(b, len(rows)))
+        values = per_row[rows, picks].reshape(b, *grid_shape)
+        # Trees often agree exactly; a tiny random jitter breaks ties fairly instead of by grid order
+        values = values + rng.uniform(0.0, 1e-6, size=values.shape)
+        positions = values.argsort(axis=-1).argsort(axis=-1) + 1
+        pole += (positions == 1).sum(axis=0)
+        top += (positions <= top_n).sum(axis=0)
+        position_sum += positions.sum(axis=0)
+        done += b
+
+    return {"pole_prob": pole / draws, "top10_prob": top / draws, "expected_position": position_sum / draws}
+
+
+def simulation_frame(predictor: QualifyingPredictor, circuit_ids, years, draws: int = DEFAULT_DRAWS,
+                     seed: int | None = 42) -> pd.DataFrame:
+    circuit_ids, years = list(circuit_ids), list(years)
+    tree_preds = predictor.predict_trees(circuit_ids, years)
+    with span("simulate.sample", draws=draws, rows=tree_preds[0].size):
+        stats = simulate(tree_preds, draws, seed)
+    n_c, n_y, n_d = len(circuit_ids), len(years), len(predictor.grid)
+
+    frame = pd.DataFrame({
+        "circuitId": np.repeat(circuit_ids, n_y * n_d),
+        "year": np.tile(np.repeat(years, n_d), n_c),
+        "driver_name": np.tile(predictor.grid["driver_name"].to_numpy(), n_c * n_y),
+        "constructor_name": np.tile(predictor.grid["constructor_name"].to_numpy(), n_c * n_y),
+        **{name: values.ravel() for name, values in stats.items()},
+    })
+    block = np.repeat(np.arange(n_c * n_y), n_d)
+    return (
+        frame.assign(_block=block)
+        .sort_values(["_block", "expected_position"], kind="stable")
+        .drop(columns="_block")
+        .reset_index(drop=True)
+    )
+
+
+def print_simulation(sim: pd.DataFrame, top_k: int | None = None, draws: int = DEFAULT_DRAWS) -> None:
+    for (circuit_id, year), block in sim.groupby(["circuitId", "year"], sort=False):
+        print(f"\n🎲 Simulated Qualifying for Circuit ID {circuit_id} — Year {year} ({draws:,} draws)")
+        print(f"{'':4}{'Driver':<28}{'Pole':>7}{'Top 10':>8}{'Exp. pos':>10}")
+        shown = block if top_k is None else block.head(top_k)
+        for i, row in enumerate(shown.itertuples(index=False), start=1):
+            name = f"{row.driver_name} ({row.constructor_name})"
+            print(f"{i:>2}. {name:<28}{row.pole_prob:>7.1%}{row.top10_prob:>8.1%}{row.expected_position:>10.2f}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Monte Carlo qualifying simulation from per-tree predictions")
+    parser.add_argument("--year", type=int, help="Season to simulate (default: the latest season in races.csv)")
+    parser.add_argument("--circuits", help="Comma-separated circuitIds (default: that season's calendar)")
+    parser.add_argument("--draws", type=int, default=DEFAULT_DRAWS)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--top", type=int, help="Only print the first N drivers per circuit")
+    parser.add_argument("-o", "--output", help="Write the full table to this CSV file")
+    model_choice = parser.add_mutually_exclusive_group()
+    model_choice.add_argument("--model-version", help='Registry version to use (e.g. 3 or "latest")')
+    model_choice.add_argument("--model-path", help="Model file or flat directory written by model_artifacts.py")
+    args = parser.parse_args(argv)
+
+    try:
+        predictor = QualifyingPredictor.load(args.model_path or resolve_model_path(args.model_version))
+    except KeyError as e:
+        print(f"❌ {e.args[0]}")
+        return 1
+
+    calendar_year, calendar = season_calendar(args.year)
+    year = args.year or calendar_year
+    if args.circuits:
+        circuit_ids = [int(c) for c in args.circuits.split(",") if c.strip()]
+    else:
+        # Calendar circuits the model never saw can't be predicted; say so instead of failing the whole run
+        known = set(int(c) for c in predictor.known_circuits())
+        circuit_ids = [c for c in calendar if c in known]
+        unknown = [c for c in calendar if c not in known]
+        if unknown:
+            print(f"⚠️ Skipping circuit(s) unknown to the model: {', '.join(map(str, unknown))}")
+
+    start = time.perf_counter()
+    try:
+        sim = simulation_frame(predictor, circuit_ids, [year], args.draws, args.seed)
+    except KeyError as e:
+        print(f"❌ {e.args[0]}")
+        print("Available circuit IDs the model knows:", predictor.known_circuits())
+        return 1
+    seconds = time.perf_counter() - start
+
+    print_simulation(sim, args.top, args.draws)
+    if args.output:
+        sim.to_csv(args.output, index=False)
+        print(f"\n✅ Saved {args.output}")
+    print(f"\n✅ {len(circuit_ids)} circuit(s) × {len(predictor.grid)} drivers × {args.draws:,} draws in {seconds:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
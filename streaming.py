@@ -0,0 +1,152 @@
+#This file reads the big fact tables in chunks joined against the small dimension tables (--chunksize / F1_CHUNKSIZE).
+
+import os
+
+import pandas as pd
+
+from data_cache import DATA_DIR, iter_csv_typed
+from enriched_tables import ENRICHED_TABLES, downcast, join_dimensions, load_dimensions
+from instrumentation import span
+from timing import winner_times
+
+DEFAULT_CHUNKSIZE = 50_000
+CHUNKSIZE_ENV = "F1_CHUNKSIZE"
+
+# Columns the enriched tables derive from raw time strings (see timing.py)
+DERIVED_COLUMNS = {
+    "qualifying": ["q1_ms", "q2_ms", "q3_ms", "best_q_ms", "session_reached"],
+    "results": ["fastest_lap_ms", "gap_ms", "race_time_ms"],
+}
+
+
+def env_chunksize() -> int | None:
+    value = os.environ.get(CHUNKSIZE_ENV, "").strip()
+    return int(value) if value and int(value) > 0 else None
+
+
+# ================================
+# Reading
+# ================================
+def iter_fact(name: str, chunksize: int = DEFAULT_CHUNKSIZE, data_dir: str = DATA_DIR, usecols=None):
+    path = os.path.join(data_dir, f"{name}.csv")
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Source table not found: {path}")
+    yield from iter_csv_typed(path, name, chunksize, usecols=usecols)
+
+
+def race_winner_times(chunksize: int = DEFAULT_CHUNKSIZE, data_dir: str = DATA_DIR) -> pd.Series:
+    parts = [winner_times(chunk) for chunk in iter_fact("results", chunksize, data_dir, usecols=["raceId", "time"])]
+    if not parts:
+        return pd.Series(dtype="Int64")
+    return pd.concat(parts).groupby(level=0).max()
+
+
+def iter_enriched(kind: str, chunksize: int = DEFAULT_CHUNKSIZE, data_dir: str = DATA_DIR,
+                  columns: list[str] | None = None, years=None):
+    spec = ENRICHED_TABLES[kind]
+    derive = columns is None or any(c in DERIVED_COLUMNS[kind] for c in columns)
+    fact_columns = spec["columns"] if derive else [c for c in spec["columns"] if c not in spec["drop"]]
+    dims = load_dimensions(data_dir)
+
+    race_ids = None
+    if years is not None:
+        races = dims["races"]
+        race_ids = races.loc[races["year"].isin(list(years)), "raceId"].dropna().astype(int).tolist()
+
+    # A race's rows can be spread over several chunks, so winner times come from a first, narrow pass
+    winners = race_winner_times(chunksize, data_dir) if derive and kind == "results" else None
+
+    for chunk in iter_fact(spec["fact"], chunksize, data_dir, usecols=fact_columns):
+        if race_ids is not None:
+            chunk = chunk[chunk["raceId"].isin(race_ids)]
+            if chunk.empty:
+                continue
+        with span("stream.join", table=kind, rows=len(chunk)):
+            df = join_dimensions(chunk, dims)
+            if derive:
+                df = spec["derive"](df) if winners is None else spec["derive"](df, winners)
+                df = df.drop(columns=spec["drop"])
+        yield df if columns is None else df[columns]
+
+
+def load_streamed(kind: str, years=None, chunksize: int = DEFAULT_CHUNKSIZE, data_dir: str = DATA_DIR,
+                  columns: list[str] | None = None) -> pd.DataFrame:
+    chunks = [downcast(chunk) for chunk in iter_enriched(kind, chunksize, data_dir, columns, years)]
+    if not chunks:
+        raise ValueError(f"No {kind} rows for season(s) {', '.join(map(str, years or []))}")
+    return downcast(pd.concat(chunks, ignore_index=True))
+
+
+# ================================
+# Writing
+# ================================
+# Rows go to <path>.tmp, which only replaces <path> when the with-block exits cleanly.
+class ChunkWriter:
+    def __init__(self, path: str):
+        self.path = path
+        self.tmp = path + ".tmp"
+        self.rows = 0
+        self._file = None
+
+    def __enter__(self) -> "ChunkWriter":
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._file = open(self.tmp, "w", encoding="utf-8", newline="")
+        return self
+
+    def write(self, df: pd.DataFrame) -> None:
+        df.to_csv(self._file, header=self.rows == 0 and self._file.tell() == 0, index=False)
+        self.rows += len(df)
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self._file.close()
+        if exc_type is None:
+            os.replace(self.tmp, self.path)
+        else:
+            os.remove(self.tmp)
+        return False
+
+
+# ================================
+# prepare_qualifying_data.py, streamed
+# ================================
+# Two passes: the first collects the encoder labels and race ids, the second encodes and appends each chunk.
+def prepare_qualifying(chunksize: int = DEFAULT_CHUNKSIZE, data_dir: str = DATA_DIR) -> dict:
+    from encoders import ENCODERS_PATH, EncoderSet
+    from ingest_round import CLEANED_COLUMNS, CLEANED_PATH, clean_rows, write_ledger
+    from qualifying_predictor import GRID_PATH
+
+    columns = ["raceId", "year", "round", "circuitId", "surname", "name_constructor", "position"]
+
+    # Pass 1: distinct labels per encoded column (small) and every race covered
+    race_ids, labels = set(), []
+    for chunk in iter_enriched("qualifying", chunksize, data_dir, columns=columns):
+        race_ids.update(chunk["raceId"].dropna().astype(int).tolist())
+        labels.append(clean_rows(chunk)[CLEANED_COLUMNS].drop_duplicates())
+    encoders = EncoderSet.fit(pd.concat(labels, ignore_index=True))
+    del labels
+
+    # Pass 2: encode and append. Encoders first, like ingest_round.py: the cleaned file must never
+    # reference codes that aren't saved yet
+    encoders.save(ENCODERS_PATH)
+    os.makedirs(os.path.dirname(CLEANED_PATH), exist_ok=True)
+    with ChunkWriter(CLEANED_PATH) as out:
+        for chunk in iter_enriched("qualifying", chunksize, data_dir, columns=columns):
+            rows = clean_rows(chunk)[CLEANED_COLUMNS]
+            for col in encoders:
+                rows[col] = encoders[col].transform(rows[col])
+            out.write(rows)
+    write_ledger(race_ids, out.rows)
+
+    # Driver/constructor pairs of the latest season in the results, in order of first appearance
+    latest_year, pairs = None, []
+    for chunk in iter_enriched("results", chunksize, data_dir, columns=["year", "surname", "name_constructor"]):
+        year = chunk["year"].max()
+        if pd.isna(year) or (latest_year is not None and year < latest_year):
+            continue
+        if latest_year is None or year > latest_year:
+            latest_year, pairs = year, []
+        pairs.append(chunk.loc[chunk["year"] == year, ["surname", "name_constructor"]].drop_duplicates())
+    grid = pd.concat(pairs, ignore_index=True).drop_duplicates()
+    grid.columns = ["driver_name", "constructor_name"]
+    grid.to_csv(GRID_PATH, index=False)
+    return {"rows": out.rows, "races": len(race_ids), "grid": len(grid)}
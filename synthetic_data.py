@@ -0,0 +1,69 @@
+#This file writes scaled-up synthetic copies of data/ for benchmark.py: python synthetic_data.py 10 100 → bench_data/x10/, x100/
+
+import os
+import sys
+import shutil
+import pandas as pd
+
+BENCH_DIR = "bench_data"
+
+# Fact tables get copied `scale` times with shifted ids (raceId, plus each table's own row id);
+# dimension tables are copied as-is
+SCALED_TABLES = {
+    "races": [],
+    "results": ["resultId"],
+    "qualifying": ["qualifyId"],
+    "driver_standings": ["driverStandingsId"],
+    "constructor_standings": ["constructorStandingsId"],
+}
+DIMENSION_TABLES = ["drivers", "constructors", "circuits", "status"]
+
+
+def _read_raw(path: str) -> pd.DataFrame:
+    # Keep every value as the exact source text ("\N" included) so copies round-trip unchanged
+    return pd.read_csv(path, dtype=str, keep_default_na=False, on_bad_lines="skip")
+
+
+def make_scaled_dataset(scale: int, src: str = "data", dst: str | None = None) -> str:
+    dst = dst or os.path.join(BENCH_DIR, f"x{scale}")
+    os.makedirs(dst, exist_ok=True)
+
+    races = _read_raw(os.path.join(src, "races.csv"))
+    years = races["year"].astype(int)
+    year_span = int(years.max() - years.min() + 1)
+    # One raceId shift for every table, so copy k of a result still points at copy k of its race
+    race_offset = int(races["raceId"].astype(int).max())
+
+    for name in DIMENSION_TABLES:
+        path = os.path.join(src, f"{name}.csv")
+        if os.path.exists(path):
+            shutil.copyfile(path, os.path.join(dst, f"{name}.csv"))
+
+    for name, row_ids in SCALED_TABLES.items():
+        path = os.path.join(src, f"{name}.csv")
+        if not os.path.exists(path):
+            continue
+        df = _read_raw(path)
+        id_cols = ["raceId"] + row_ids
+        ids = {c: df[c].astype(int) for c in id_cols}
+        # Each copy k shifts its ids past the previous copy (and its seasons past the real ones)
+        offsets = {"raceId": race_offset, **{c: int(ids[c].max()) for c in row_ids}}
+
+        copies = []
+        for k in range(scale):
+            part = df.copy()
+            for c in id_cols:
+                part[c] = (ids[c] + k * offsets[c]).astype(str)
+            if name == "races":
+                part["year"] = (years + k * year_span).astype(str)
+            copies.append(part)
+        pd.concat(copies, ignore_index=True).to_csv(os.path.join(dst, f"{name}.csv"), index=False)
+
+    return dst
+
+
+if __name__ == "__main__":
+    scales = [int(s) for s in sys.argv[1:]] or [10, 100]
+    for s in scales:
+        out = make_scaled_dataset(s)
+        print(f"✅ {s}× dataset written to {out}/")
@@ -0,0 +1,48 @@
+#This file holds the shared test fixtures: a scratch copy of data/ as the cwd, and a runner for the repo's scripts.
+
+import os
+import sys
+import glob
+import shutil
+import subprocess
+
+import joblib
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO)
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    # CSVs only (no cache), in the layout the scripts expect relative to the cwd
+    os.makedirs(tmp_path / "data")
+    os.makedirs(tmp_path / "model")
+    for csv in glob.glob(os.path.join(REPO, "data", "*.csv")):
+        shutil.copy(csv, tmp_path / "data")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("F1_CHUNKSIZE", raising=False)
+    return tmp_path
+
+
+@pytest.fixture
+def run_script(workdir):
+    def run(script, *args):
+        env = dict(os.environ, PYTHONPATH=REPO, MPLBACKEND="Agg")
+        return subprocess.run([sys.executable, os.path.join(REPO, script), *args], check=True, env=env,
+                              capture_output=True, text=True)
+    return run
+
+
+@pytest.fixture
+def trained_model(run_script):
+    # Cleaned rows, encoders and grid from prepare_qualifying_data.py, then a small forest on the base features
+    from qualifying_predictor import FEATURES, MODEL_PATH
+
+    run_script("prepare_qualifying_data.py")
+    df = pd.read_csv("model/cleaned_qualifying.csv")
+    model = RandomForestRegressor(n_estimators=5, max_depth=8, random_state=0).fit(df[FEATURES], df["position"])
+    joblib.dump(model, MODEL_PATH)
+    return model
@@ -0,0 +1,77 @@
+import threading
+
+import matplotlib
+
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+
+from annotations import LabelLayer, batch_markers, fast_enabled, label_mode, point_labels
+
+
+def plot(fig):
+    ax = fig.add_subplot()
+    ax.plot([1, 2, 3], [1, 2, 3], marker="o", label="a")
+    ax.plot([1, 2, 3], [3, 2, 1], marker="o", label="b")
+    ax.plot([1, 2, 3], [2, 2, 2], marker="s", label="c")
+    ax.plot([1, 2, 3], [0, 0, 0], label="no markers")
+    return ax
+
+
+def test_fast_batches_markers_and_labels():
+    fig = plt.figure()
+    try:
+        ax = plot(fig)
+        with label_mode(True):
+            scatters = batch_markers(ax)
+            labels = point_labels(ax)
+        assert len(scatters) == 2  # one per marker style
+        assert sorted(len(s.get_offsets()) for s in scatters) == [3, 6]
+        assert all(list(line.get_markevery()) == [] for line in ax.get_lines()[:3])
+        assert ax.get_lines()[3].get_markevery() is None
+
+        assert isinstance(labels, LabelLayer)
+        labels.text(1, 1, "A")
+        labels.text(1, 1, "A again")  # same spot → skipped
+        labels.text(3, 1, "B")
+        fig.canvas.draw()
+        assert labels.drawn == 2
+    finally:
+        plt.close(fig)
+
+
+def test_default_mode_leaves_the_axes_alone():
+    fig = plt.figure()
+    try:
+        ax = plot(fig)
+        with label_mode(False):
+            assert batch_markers(ax) == []
+            assert point_labels(ax) is ax
+        assert all(line.get_markevery() is None for line in ax.get_lines())
+        assert not ax.collections
+    finally:
+        plt.close(fig)
+
+
+def test_mode_is_scoped_per_thread():
+    default = fast_enabled()
+    with label_mode(None):
+        assert fast_enabled() == default
+
+    inside, seen = threading.Event(), {}
+
+    def other():
+        with label_mode(not default):
+            inside.set()
+            release.wait(5)
+            seen["other"] = fast_enabled()
+
+    release = threading.Event()
+    thread = threading.Thread(target=other)
+    thread.start()
+    inside.wait(5)
+    seen["main"] = fast_enabled()  # while the other thread is inside its label_mode
+    release.set()
+    thread.join()
+
+    assert seen == {"main": default, "other": not default}
+    assert fast_enabled() == default
@@ -0,0 +1,32 @@
+from charts import ChartData
+from comparison import compare, is_multi, main, parse_years, resolve_circuits, split_circuits
+
+
+def test_parsing():
+    assert parse_years("2014-2016, 2019") == [2014, 2015, 2016, 2019]
+    assert split_circuits(" Monaco, ,Silverstone ") == ["Monaco", "Silverstone"]
+    assert is_multi("street") and is_multi("Monaco,Silverstone") and not is_multi("Monaco")
+
+
+def test_compare_matches_a_direct_filter(workdir):
+    data = ChartData("data")
+    circuits, years, drivers = "Silverstone,Monaco", [2021, 2019], ["Hamilton", "Verstappen"]
+    frame = compare(data, circuits, years, drivers, metric="race")
+
+    df = data.results.df
+    circuit_ids = resolve_circuits(data.results, circuits)
+    direct = df[df["circuitId"].astype(int).isin(circuit_ids) & df["year"].astype(int).isin(years)
+                & df["surname"].astype(str).isin(drivers)]
+    assert len(frame) == len(direct) > 0
+    assert frame["points"].sum() == direct["points"].astype(float).sum()
+
+    # Circuits as asked, then years as asked
+    assert list(dict.fromkeys(frame["circuitId"])) == circuit_ids
+    for _, block in frame.groupby("circuitId", sort=False):
+        assert list(dict.fromkeys(block["year"])) == [y for y in years if y in set(block["year"])]
+
+
+def test_cli(workdir, capsys):
+    assert main(["--circuits", "Monaco", "--years", "2021", "--drivers", "Leclerc"]) == 0
+    assert main(["--circuits", "Nowhere", "--years", "2021", "--drivers", "Leclerc"]) == 1
+    assert "Nothing found" in capsys.readouterr().out
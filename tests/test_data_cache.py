@@ -0,0 +1,33 @@
+import os
+import glob
+
+import pandas as pd
+import pytest
+
+from data_cache import load_table, read_csv_typed
+
+
+@pytest.mark.parametrize("name", ["races", "drivers", "results", "qualifying"])
+def test_cache_round_trip(workdir, name):
+    expected = read_csv_typed(os.path.join("data", f"{name}.csv"), name)
+    built = load_table(name, "data")
+    cached = load_table(name, "data")  # second call reads the cache file back
+
+    assert glob.glob(os.path.join("data", "cache", f"{name}.*"))
+    pd.testing.assert_frame_equal(built, expected)
+    pd.testing.assert_frame_equal(cached, expected)
+
+
+def test_rebuilt_when_csv_changes(workdir):
+    load_table("circuits", "data")
+    circuits = pd.read_csv(os.path.join("data", "circuits.csv"))
+    circuits.iloc[:-1].to_csv(os.path.join("data", "circuits.csv"), index=False)
+
+    assert len(load_table("circuits", "data")) == len(circuits) - 1
+
+
+def test_null_markers(workdir):
+    results = load_table("results", "data")
+    raw = pd.read_csv(os.path.join("data", "results.csv"), dtype=str, keep_default_na=False)
+
+    assert (results["position"].isna().to_numpy() == (raw["position"] == "\\N").to_numpy()).all()
@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+from data_index import TableIndex
+from enriched_tables import load_lean
+
+
+@pytest.fixture
+def index(workdir):
+    return TableIndex(load_lean("results", "charts", "data"))
+
+
+@pytest.mark.parametrize("filters", [
+    {"years": [2021]},
+    {"years": [2019, 2021], "circuit_ids": [14, 6]},
+    {"circuit_ids": [14]},
+    {"driver_ids": [1, 830]},
+    {"years": [2020, 2021], "driver_ids": [1]},
+    {"race_ids": [1052, 1053], "driver_ids": [830]},
+    {"years": [1900]},
+])
+def test_lookup_matches_mask(index, filters):
+    df = index.df
+    mask = np.ones(len(df), dtype=bool)
+    for key, col in [("years", "year"), ("circuit_ids", "circuitId"), ("race_ids", "raceId"), ("driver_ids", "driverId")]:
+        if key in filters:
+            mask &= df[col].isin(filters[key]).to_numpy(dtype=bool)
+
+    np.testing.assert_array_equal(index.lookup(**filters), np.flatnonzero(mask))
+
+
+def test_find_names(index):
+    assert index.find_circuits("monza") == [14]
+    assert index.find_drivers(["hamilton"]) == []
+    assert index.find_drivers(["hamilton"], case=False) == index.find_drivers(["Hamilton"]) == [1, 708]  # Lewis, Duncan
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.preprocessing import LabelEncoder
+
+from encoders import ENCODERS_PATH, EncoderSet, StableLabelEncoder
+
+
+def test_extend_is_append_only():
+    encoder = StableLabelEncoder().fit(["Vettel", "Alonso", "Hamilton", "Alonso"])
+    before = encoder.transform(["Alonso", "Hamilton", "Vettel"]).tolist()
+
+    assert encoder.extend(["Piastri", "Alonso", "Bearman", "Piastri"]) == ["Piastri", "Bearman"]
+    assert encoder.transform(["Alonso", "Hamilton", "Vettel"]).tolist() == before == [0, 1, 2]
+    assert encoder.transform(["Piastri", "Bearman"]).tolist() == [3, 4]
+    assert encoder.inverse_transform([4, 0]).tolist() == ["Bearman", "Alonso"]
+    with pytest.raises(ValueError):
+        encoder.transform(["Nobody"])
+
+
+def test_encoder_set_save_load(workdir):
+    frame = pd.DataFrame({"driver_name": ["Hamilton", "Verstappen", "Alonso"],
+                          "constructor_name": ["Mercedes", "Red Bull", "Aston Martin"],
+                          "circuitId": [14, 9, 14]})
+    encoders = EncoderSet.fit(frame)
+    encoders["driver_name"].extend(["Antonelli-Longname"])
+    encoders.save("model/encoders.json")
+    loaded = EncoderSet.load("model/encoders.json")
+
+    for col in frame:
+        np.testing.assert_array_equal(loaded[col].classes_, encoders[col].classes_)
+        np.testing.assert_array_equal(loaded[col].transform(frame[col]), encoders[col].transform(frame[col]))
+    assert loaded["driver_name"].transform(["Antonelli-Longname"]).tolist() == [3]
+
+
+@pytest.mark.parametrize("column", ["driver_name", "constructor_name", "circuitId"])
+def test_same_codes_as_label_encoder(workdir, column):
+    labels = pd.read_csv("data/clean_qualifying.csv")[column].to_numpy()
+    legacy = LabelEncoder().fit(labels)
+    encoders = EncoderSet({column: legacy})
+
+    np.testing.assert_array_equal(StableLabelEncoder().fit(labels).classes_, legacy.classes_)
+    codes, known = encoders.encode(column, labels)
+    np.testing.assert_array_equal(codes, legacy.transform(labels))
+    assert known.all()
+
+
+def test_unknown_labels():
+    encoders = EncoderSet.fit(pd.DataFrame({"driver_name": ["Hamilton", "Alonso"], "constructor_name": ["a", "b"],
+                                            "circuitId": [1, 2]}))
+    codes, known = encoders.encode("driver_name", ["Hamilton", "Nobody"], unknown="mask")
+
+    assert codes.tolist() == [1, -1] and known.tolist() == [True, False]
+    with pytest.raises(ValueError):
+        encoders.encode("driver_name", ["Nobody"])
+    with pytest.raises(ValueError):
+        encoders.encode("driver_name", ["Hamilton"], unknown="skip")
+
+
+def test_classifier_leaves_shared_encoders_alone(run_script):
+    run_script("prepare_qualifying_data.py")
+    before = open(ENCODERS_PATH, "rb").read()
+    run_script("qualifying_model.py")
+
+    assert open(ENCODERS_PATH, "rb").read() == before
+    classifier = EncoderSet.load("model/classifier_encoders.json")
+    assert "Lewis Hamilton" in classifier["driver_name"].classes_
@@ -0,0 +1,31 @@
+import pandas as pd
+
+from feature_store import FEATURE_COLUMNS, update_features
+
+
+def by_key(df):
+    return df.sort_values(["raceId", "driverId"]).reset_index(drop=True)
+
+
+def test_incremental_matches_full(workdir):
+    quali = pd.read_csv("data/qualifying.csv", dtype=str, keep_default_na=False)
+    last = sorted(quali["raceId"].astype(int).unique())[-3:]
+    quali[~quali["raceId"].astype(int).isin(last)].to_csv("data/qualifying.csv", index=False)
+    assert update_features("data")[1]["mode"] == "full"
+
+    quali.to_csv("data/qualifying.csv", index=False)
+    incremental, info = update_features("data")
+    assert info == {"mode": "incremental", "races": 3}
+    assert update_features("data")[1]["mode"] == "fresh"
+
+    full, _ = update_features("data", rebuild=True)
+    assert len(incremental) == len(full)
+    pd.testing.assert_frame_equal(by_key(incremental), by_key(full), check_dtype=False)
+
+
+def test_points_before_the_race(workdir):
+    features, _ = update_features("data")
+    first_rounds = features[features["round"] == 1]
+
+    assert len(first_rounds) and (first_rounds[["driver_points_before", "constructor_points_before"]] == 0).all().all()
+    assert features[FEATURE_COLUMNS].notna().all().all()
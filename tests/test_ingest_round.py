@@ -0,0 +1,37 @@
+import pandas as pd
+
+from encoders import EncoderSet
+
+COLUMNS = ["driver_name", "constructor_name", "circuitId", "year", "position"]
+
+
+def decoded(path="model/cleaned_qualifying.csv"):
+    df = pd.read_csv(path)
+    encoders = EncoderSet.load()
+    for col in encoders:
+        df[col] = encoders[col].inverse_transform(df[col])
+    return df[COLUMNS].astype(str).sort_values(COLUMNS).reset_index(drop=True)
+
+
+def test_ingest_matches_full_prepare(run_script):
+    run_script("prepare_qualifying_data.py")
+    full = decoded()
+    full_codes = EncoderSet.load()
+
+    # Prepare without the last two races, then ingest them
+    quali = pd.read_csv("data/qualifying.csv", dtype=str, keep_default_na=False)
+    last = sorted(quali["raceId"].astype(int).unique())[-2:]
+    quali[~quali["raceId"].astype(int).isin(last)].to_csv("data/qualifying.csv", index=False)
+    run_script("prepare_qualifying_data.py")
+    run_script("ingest_round.py", "--init")
+    before = EncoderSet.load()
+    quali.to_csv("data/qualifying.csv", index=False)
+    run_script("ingest_round.py", "--latest")
+
+    pd.testing.assert_frame_equal(decoded(), full)
+    after = EncoderSet.load()
+    for col in after:
+        # Existing codes never move; new labels (if any) only ever come after them
+        n = len(before[col].classes_)
+        assert list(after[col].classes_[:n]) == list(before[col].classes_)
+        assert set(after[col].classes_) == set(full_codes[col].classes_)
@@ -0,0 +1,43 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from lap_times import RaceLaps, ingest
+
+# Driver 1 leads; driver 2 has no timing for lap 2; driver 3 retires after lap 2
+LAPS = [(1, 1, 90000), (1, 2, 90000), (1, 3, 90000),
+        (2, 1, 91000), (2, 3, 91000),
+        (3, 1, 92000), (3, 2, 92000)]
+
+
+def write_laps(race_id=1000):
+    rows = [{"raceId": race_id, "driverId": d, "lap": lap, "position": 1, "time": "1:30.000", "milliseconds": ms}
+            for d, lap, ms in reversed(LAPS)]  # out of order on purpose
+    pd.DataFrame(rows).to_csv("data/lap_times.csv", index=False)
+
+
+def test_ingest_aligns_laps(workdir):
+    write_laps()
+    assert ingest("data", chunksize=3)["races"] == 1
+    race = RaceLaps.open(1000, "data")
+
+    assert race.driver_ids.tolist() == [1, 2, 3] and race.laps == 3
+    np.testing.assert_array_equal(race.ms, [[90000, 90000, 90000], [91000, 0, 91000], [92000, 92000, 0]])
+
+
+def test_gaps_stop_at_a_missing_lap(workdir):
+    write_laps()
+    ingest("data")
+    gaps = RaceLaps.open(1000, "data").gaps_to_leader()
+
+    np.testing.assert_array_equal(gaps, [[0, 0, 0], [1, np.nan, np.nan], [2, 4, np.nan]])
+
+
+def test_gaps_without_any_complete_driver():
+    race = RaceLaps(1, np.array([1, 2]), np.array([[90000, 0, 90000], [91000, 0, 91000]]), None)
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        gaps = race.gaps_to_leader()
+
+    np.testing.assert_array_equal(gaps, [[0, np.nan, np.nan], [1, np.nan, np.nan]])
@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+
+from model_artifacts import FlatForest, export_artifacts, load_model, tree_predictions
+from qualifying_predictor import FEATURES
+
+
+def test_flat_forest_matches_sklearn(trained_model):
+    X = pd.read_csv("model/cleaned_qualifying.csv")[FEATURES]
+    flat = FlatForest.from_forest(trained_model)
+
+    np.testing.assert_allclose(tree_predictions(flat, X), tree_predictions(trained_model, X), rtol=0, atol=1e-9)
+    np.testing.assert_allclose(flat.predict(X), trained_model.predict(X), rtol=0, atol=1e-9)
+
+
+def test_every_format_loads_the_same_model(trained_model):
+    df = pd.read_csv("model/cleaned_qualifying.csv")
+    X = df[FEATURES]
+    paths = export_artifacts(trained_model, "model/artifacts", depths=(4,), train=(X, df["position"]))
+    expected = trained_model.predict(X)
+
+    for variant in ("pickle", "compressed", "flat"):
+        np.testing.assert_allclose(load_model(paths[variant]).predict(X), expected, rtol=0, atol=1e-9)
+    flat = load_model(paths["flat"])
+    assert isinstance(flat.value, np.memmap) and flat.value.mode == "r"
+
+    capped = load_model(paths["depth4"])
+    assert capped.max_depth <= 4
+    assert not np.allclose(capped.predict(X), expected)
@@ -0,0 +1,40 @@
+import pandas as pd
+
+from points_cube import PointsCube, race_points, validate
+
+
+def test_cube_matches_cumulative_results(workdir):
+    cube = PointsCube.load("data")
+    points = race_points("data").groupby(["year", "round", "driverId"], as_index=False)["points"].sum()
+    expected = points.sort_values(["year", "round"]).assign(
+        cum_points=lambda d: d.groupby(["year", "driverId"])["points"].cumsum())
+
+    merged = expected.merge(cube.tables["driver"], on=["year", "round", "driverId"], suffixes=("", "_cube"))
+    assert len(merged) == len(expected)
+    assert (merged["cum_points"] - merged["cum_points_cube"]).abs().max() < 1e-9
+
+
+def test_standings_and_season(workdir):
+    cube = PointsCube.load("data")
+    year = 2021
+    season = cube.season(year)
+    table = cube.standings_after(year)
+    final = season.iloc[-1].dropna().sort_values(ascending=False, kind="stable")
+
+    assert table["driverId"].tolist()[:5] == final.index.tolist()[:5]
+    assert table["position"].iloc[0] == 1
+
+    after_five = cube.standings_after(year, 5).set_index("driverId")["cum_points"]
+    pd.testing.assert_series_equal(after_five.sort_index(), season.iloc[4].dropna().sort_index(),
+                                   check_names=False, check_dtype=False)
+    assert cube.standings_after(1900).empty
+
+
+def test_store_reused_and_validated(workdir):
+    first = PointsCube.load("data")
+    again = PointsCube.load("data")
+    pd.testing.assert_frame_equal(first.tables["driver"], again.tables["driver"])
+
+    report = validate(again, "data")
+    assert set(report["entity"]) == {"driver", "constructor"}
+    assert (report.loc[report["year"] >= 2010, "mismatched"] == 0).mean() > 0.5
@@ -0,0 +1,44 @@
+import os
+
+import joblib
+
+from prediction_server import PredictionService
+from qualifying_predictor import MODEL_PATH
+
+
+def bump_mtime(path):
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+
+def test_cached_answers(trained_model):
+    service = PredictionService()
+    rows, cached = service.predict(14, 2025)
+
+    assert not cached and [r["rank"] for r in rows] == list(range(1, len(rows) + 1))
+    assert service.predict(14, 2025) == (rows, True)
+
+
+def test_reload_on_change(trained_model):
+    service = PredictionService()
+    service.predict(14, 2025)
+    joblib.dump(trained_model, MODEL_PATH)
+    bump_mtime(MODEL_PATH)
+
+    assert service.predict(14, 2025)[1] is False
+    assert service.generation == 2
+
+
+def test_corrupt_model_keeps_serving(trained_model):
+    service = PredictionService()
+    rows, _ = service.predict(14, 2025)
+    with open(MODEL_PATH, "r+b") as f:
+        f.truncate(100)  # half-written pickle
+
+    assert service.predict(14, 2025) == (rows, True)
+    assert service.generation == 1 and service.failed is not None
+
+    joblib.dump(trained_model, MODEL_PATH)
+    bump_mtime(MODEL_PATH)
+    assert service.predict(14, 2025)[0] == rows
+    assert service.generation == 2
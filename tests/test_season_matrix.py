@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+
+from season_matrix import NO_ENTRY, build_season_matrix, classify_status
+
+
+def test_classify_status():
+    position_text = pd.Series(["1", "12", "R", "D", "E", "W", "F", "N", "\\N", None, None, None])
+    status = pd.Series([None] * 9 + ["Disqualified", "+2 Laps", "Engine"])
+
+    assert classify_status(position_text, status).tolist() == [
+        "Finished", "Finished", "DNF", "DSQ", "DSQ", "DNS", "DNS", "N/C", "Finished", "DSQ", "Finished", "DNF"]
+    assert classify_status(pd.Series(["3", None])).tolist() == ["Finished", "Finished"]
+
+
+def test_build_season_matrix():
+    results = pd.DataFrame({
+        "year": 2021, "round": [1, 1, 1, 2, 2],
+        "raceId": [10, 10, 10, 11, 11], "name": ["Bahrain"] * 3 + ["Imola"] * 2,
+        "driverId": [1, 2, 1, 1, 3], "forename": ["Max", "Lewis", "Max", "Max", "Mick"],
+        "surname": ["Verstappen", "Hamilton", "Verstappen", "Verstappen", "Schumacher"],
+        "positionText": ["2", "1", "5", "R", "\\N"], "positionOrder": [2, 1, 5, 18, 16],
+        "points": [18.0, 25.0, 0.0, 0.0, 0.0],
+    })
+    matrix = build_season_matrix(results, 2021)
+
+    assert matrix.race_labels == ["Bahrain", "Imola"]
+    assert matrix.driver_ids(["verstappen", "Schumacher"]) == [1, 3]
+    # Shared drive: the driver's first row in a race wins; a retirement has no plotted position
+    np.testing.assert_array_equal(matrix.positions.loc[1].to_numpy(), [2.0, np.nan])
+    assert matrix.status.loc[1].tolist() == ["Finished", "DNF"]
+    assert matrix.status.loc[3].tolist() == [NO_ENTRY, "Finished"]
+    assert matrix.positions.at[3, 2] == 16.0
+    assert matrix.points[2] == 25.0
@@ -0,0 +1,38 @@
+import numpy as np
+
+from qualifying_predictor import QualifyingPredictor
+from simulate_qualifying import simulate, simulation_frame
+
+
+def test_unanimous_trees():
+    # 3 trees, 1 circuit, 1 year, 4 drivers that every tree ranks the same way
+    tree_preds = np.tile(np.array([3.0, 1.0, 4.0, 2.0]), (3, 1, 1, 1))
+    stats = simulate(tree_preds, draws=50, top_n=2)
+
+    np.testing.assert_array_equal(stats["expected_position"][0, 0], [3, 1, 4, 2])
+    np.testing.assert_array_equal(stats["pole_prob"][0, 0], [0, 1, 0, 0])
+    np.testing.assert_array_equal(stats["top10_prob"][0, 0], [0, 1, 0, 1])
+
+
+def test_probabilities_add_up():
+    rng = np.random.default_rng(0)
+    tree_preds = rng.uniform(1, 20, size=(25, 2, 3, 20))  # trees, circuits, years, drivers
+    stats = simulate(tree_preds, draws=2_500, batch=1_000)
+
+    np.testing.assert_allclose(stats["pole_prob"].sum(axis=-1), 1.0)
+    np.testing.assert_allclose(stats["top10_prob"].sum(axis=-1), 10.0)
+    np.testing.assert_allclose(stats["expected_position"].sum(axis=-1), 20 * 21 / 2)
+    assert all(np.array_equal(stats[k], simulate(tree_preds, draws=2_500, batch=1_000)[k]) for k in stats)
+
+
+def test_simulation_frame(trained_model):
+    predictor = QualifyingPredictor.load()
+    circuits, years = [14, 9], [2025]
+    tree_preds = predictor.predict_trees(circuits, years)
+
+    np.testing.assert_allclose(tree_preds.mean(axis=0), predictor.predict_matrix(circuits, years))
+    frame = simulation_frame(predictor, circuits, years, draws=500)
+    assert len(frame) == len(circuits) * len(predictor.grid)
+    for _, block in frame.groupby("circuitId"):
+        assert block["expected_position"].is_monotonic_increasing
+        assert abs(block["pole_prob"].sum() - 1) < 1e-9
@@ -0,0 +1,53 @@
+import json
+
+import pandas as pd
+import pytest
+
+from enriched_tables import load_lean
+from encoders import EncoderSet
+from streaming import load_streamed, prepare_qualifying
+
+
+def read_outputs(paths):
+    return {path: open(path, "rb").read() for path in paths}
+
+
+def test_prepare_qualifying_streamed_matches_full(run_script):
+    outputs = ["model/cleaned_qualifying.csv", "model/encoders.json", "model/valid_pairs.csv",
+               "model/ingested_races.json"]
+    run_script("prepare_qualifying_data.py")
+    full = read_outputs(outputs)
+    run_script("prepare_qualifying_data.py", "--chunksize", "5000")
+
+    assert json.loads(full["model/ingested_races.json"])["rows"] > 0
+    for path, content in read_outputs(outputs).items():
+        assert content == full[path], path
+
+
+def test_preprocess_streamed_matches_full(run_script):
+    outputs = ["data/cleaned_qualifying.csv", "data/cleaned_race.csv"]
+    run_script("scripts/preprocess.py")
+    full = read_outputs(outputs)
+    run_script("scripts/preprocess.py", "--chunksize", "5000")
+
+    for path, content in read_outputs(outputs).items():
+        assert content == full[path], path
+
+
+@pytest.mark.parametrize("kind", ["qualifying", "results"])
+def test_streamed_season_matches_cached_table(workdir, kind):
+    cached = load_lean(kind, "charts", "data")
+    cached = cached[cached["year"] == 2021].reset_index(drop=True)
+    streamed = load_streamed(kind, years=[2021], chunksize=3000, data_dir="data", columns=list(cached.columns))
+
+    pd.testing.assert_frame_equal(streamed, cached, check_dtype=False, check_categorical=False)
+
+
+def test_failed_encoder_save_leaves_cleaned_rows_alone(workdir, monkeypatch):
+    def fail(self, path):
+        raise OSError("disk full")
+    monkeypatch.setattr(EncoderSet, "save", fail)
+
+    with pytest.raises(OSError):
+        prepare_qualifying(5000, "data")
+    assert not (workdir / "model" / "cleaned_qualifying.csv").exists()
@@ -0,0 +1,25 @@
+import os
+
+import pandas as pd
+import pytest
+
+from synthetic_data import make_scaled_dataset
+
+
+@pytest.mark.parametrize("name", ["results", "qualifying", "driver_standings"])
+def test_copies_point_at_their_own_races(workdir, name):
+    # A calendar with a race not run yet: the fact table's max raceId is below the races max
+    raw = pd.read_csv(f"data/{name}.csv", dtype=str, keep_default_na=False)
+    raw[raw["raceId"].astype(int) < raw["raceId"].astype(int).max()].to_csv(f"data/{name}.csv", index=False)
+    dst = make_scaled_dataset(3, "data", "x3")
+    src_races, races = pd.read_csv("data/races.csv"), pd.read_csv(os.path.join(dst, "races.csv"))
+    src, scaled = pd.read_csv(f"data/{name}.csv"), pd.read_csv(os.path.join(dst, f"{name}.csv"))
+    span = src_races["year"].max() - src_races["year"].min() + 1
+
+    assert len(scaled) == 3 * len(src) and len(races) == 3 * len(src_races)
+    original = src.merge(src_races[["raceId", "year", "circuitId"]], on="raceId", how="left")
+    copied = scaled.merge(races[["raceId", "year", "circuitId"]], on="raceId", how="left")
+    copy = pd.Series(range(len(scaled))) // len(src)
+    assert copied["year"].notna().all()
+    assert (copied["year"] == pd.concat([original["year"]] * 3, ignore_index=True) + copy * span).all()
+    assert (copied["circuitId"] == pd.concat([original["circuitId"]] * 3, ignore_index=True)).all()
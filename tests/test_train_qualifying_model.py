@@ -0,0 +1,42 @@
+import filecmp
+import subprocess
+
+import pandas as pd
+import pytest
+
+from model_registry import latest_version, promote, read_holdout, read_meta, resolve_model_path
+from qualifying_predictor import MODEL_PATH
+
+
+def sorted_rows(df):
+    return df.sort_values(list(df.columns)).reset_index(drop=True)
+
+
+@pytest.fixture
+def full_then_update(run_script):
+    run_script("prepare_qualifying_data.py")
+    run_script("train_qualifying_model.py", "--n-estimators", "5")
+    run_script("train_qualifying_model.py", "--update", "--add-trees", "2")
+
+
+def test_update_evaluates_on_base_holdout(full_then_update):
+    base, update = read_meta(1), read_meta(2)
+
+    assert (update["mode"], update["parent"], update["n_estimators"]) == ("update", 1, 7)
+    assert update["test_rows"] == base["test_rows"] == len(read_holdout(1))
+    pd.testing.assert_frame_equal(sorted_rows(read_holdout(2)), sorted_rows(read_holdout(1)))
+    # Same held-out rows and unchanged data: the base model scores what it scored when it was trained
+    assert update["parent_mae"] == base["mae"]
+    assert filecmp.cmp(MODEL_PATH, resolve_model_path("latest"), shallow=False)
+
+
+def test_promote_rolls_back(full_then_update):
+    assert latest_version() == 2
+    promote(1)
+    assert filecmp.cmp(MODEL_PATH, resolve_model_path(1), shallow=False)
+
+
+def test_update_refuses_other_features(full_then_update, run_script):
+    with pytest.raises(subprocess.CalledProcessError) as e:
+        run_script("train_qualifying_model.py", "--update", "--with-features")
+    assert "can't be updated" in e.value.stderr
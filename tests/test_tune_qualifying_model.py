@@ -0,0 +1,32 @@
+import json
+import subprocess
+
+import joblib
+import pytest
+from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+
+from model_registry import read_holdout, read_meta
+from qualifying_predictor import MODEL_PATH
+
+GRID = json.dumps({"n_estimators": [5], "max_depth": [4, 6]})
+
+
+def test_save_best_registers_regressor(run_script):
+    run_script("prepare_qualifying_data.py")
+    run_script("tune_qualifying_model.py", "--grid", GRID, "--jobs", "1", "--save-best")
+
+    assert isinstance(joblib.load(MODEL_PATH), RandomForestRegressor)
+    meta = read_meta(1)
+    assert meta["mode"] == "tuned" and len(read_holdout(1)) == meta["test_rows"]
+
+
+def test_classifier_needs_own_path(run_script):
+    run_script("prepare_qualifying_data.py")
+    for path in ([], [MODEL_PATH]):
+        with pytest.raises(subprocess.CalledProcessError) as e:
+            run_script("tune_qualifying_model.py", "--task", "classification", "--grid", GRID, "--save-best", *path)
+        assert "needs a PATH" in e.value.stderr
+
+    run_script("tune_qualifying_model.py", "--task", "classification", "--grid", GRID, "--jobs", "1",
+               "--save-best", "model/classifier.pkl")
+    assert isinstance(joblib.load("model/classifier.pkl"), RandomForestClassifier)
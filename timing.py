@@ -0,0 +1,77 @@
+#This file holds the vectorized lap/race time parsing shared by the enriched tables and the graph scripts.
+
+import numpy as np
+import pandas as pd
+
+# Matches "1:34:50.616", "1:26.572", "59.1" and gaps like "+5.478" (the "+" is dropped).
+# Anything else ("+1 Lap", "\N", empty) becomes a null.
+TIME_PATTERN = r"^\+?(?:(?:(\d+):)?(\d+):)?(\d+(?:\.\d+)?)$"
+
+QUALI_SESSIONS = ["q1", "q2", "q3"]
+
+
+# ================================
+# Parsing
+# ================================
+def parse_time_ms(times: pd.Series) -> pd.Series:
+    parts = times.astype("string").str.strip().str.extract(TIME_PATTERN)
+    hours = pd.to_numeric(parts[0], errors="coerce").fillna(0)
+    mins = pd.to_numeric(parts[1], errors="coerce").fillna(0)
+    secs = pd.to_numeric(parts[2], errors="coerce")
+    total = (hours * 3600 + mins * 60 + secs) * 1000
+    return total.round().astype("Int64")
+
+
+def add_qualifying_times(df: pd.DataFrame) -> pd.DataFrame:
+    for q in QUALI_SESSIONS:
+        df[f"{q}_ms"] = parse_time_ms(df[q])
+
+    # best_q_ms keeps the old QualiCompare rule: time from the furthest session reached (Q3 > Q2 > Q1)
+    df["best_q_ms"] = df["q3_ms"].fillna(df["q2_ms"]).fillna(df["q1_ms"])
+
+    conditions = [df[f"{q}_ms"].notna().to_numpy() for q in reversed(QUALI_SESSIONS)]
+    df["session_reached"] = np.select(conditions, [3, 2, 1], default=0).astype("int8")
+    return df
+
+
+def _race_time_parts(df: pd.DataFrame) -> tuple[pd.Series, pd.Series]:
+    parsed = parse_time_ms(df["time"])
+    is_gap = df["time"].astype("string").str.startswith("+").fillna(False)
+    return parsed, is_gap
+
+
+def winner_times(df: pd.DataFrame) -> pd.Series:
+    parsed, is_gap = _race_time_parts(df)
+    return parsed.where(~is_gap).groupby(df["raceId"]).max()
+
+
+# winners (raceId → ms, see winner_times) is only needed when df doesn't hold every row of its races.
+def add_race_times(df: pd.DataFrame, winners: pd.Series | None = None) -> pd.DataFrame:
+    df["fastest_lap_ms"] = parse_time_ms(df["fastestLapTime"])
+
+    parsed, is_gap = _race_time_parts(df)
+
+    # Only the winner's "time" is absolute; everyone else's is "+gap" to the winner
+    if winners is None:
+        winner_ms = parsed.where(~is_gap).groupby(df["raceId"]).transform("max")
+    else:
+        winner_ms = pd.Series(df["raceId"].map(winners), index=df.index).astype("Int64")
+    df["gap_ms"] = parsed.where(is_gap, 0).where(parsed.notna())
+    df["race_time_ms"] = parsed.where(~is_gap, winner_ms + parsed)
+    return df
+
+
+# ================================
+# Formatting helpers
+# ================================
+def ms_to_seconds(ms: pd.Series) -> pd.Series:
+    # Plain float64 with NaN gaps, which is what matplotlib wants
+    return ms.astype("Float64").div(1000).astype("float64")
+
+
+def seconds_to_time(s):
+    if s is None or pd.isna(s):
+        return None
+    mins = int(s // 60)
+    secs = s % 60
+    return f"{mins}:{secs:06.3f}"
@@ -24,31 +24,164 @@
   #Lawson,RB F1 Team
 
 
+#Usage:
+#   python train_qualifying_model.py                       → full retrain (100 trees), registered as a new version
+#   python train_qualifying_model.py --update              → warm start: add 20 trees to the latest model
+#   python train_qualifying_model.py --update --add-trees 30 --since-year 2024
+#                                                          → the new trees only see 2024+ rows (e.g. a new round)
+#   python train_qualifying_model.py --with-features      → also train on the feature store (feature_store.py)
+#   python train_qualifying_model.py --artifacts          → also write compressed / memory-mapped variants
+#Every run is stored in model/registry/ (see model_registry.py) and also saved as model/qualifying_model.pkl.
+
+import time
+import argparse
+
 import pandas as pd
 import joblib
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import mean_absolute_error
 
-# Load cleaned data
-df = pd.read_csv("model/cleaned_qualifying.csv")
+from instrumentation import span
+from model_registry import (
+    data_version, latest_version, parse_version, promote, read_holdout, register, resolve_model_path, version_name,
+)
+from qualifying_predictor import FEATURES, MODEL_PATH
+
+CLEANED_PATH = "model/cleaned_qualifying.csv"
+# Identifies a qualifying row in both cleaned_qualifying.csv and the feature-store frame
+# (occurrence tells apart the rare rows that are otherwise identical, e.g. two races at one circuit in 2020)
+HOLDOUT_KEY = FEATURES + ["position", "occurrence"]
+
+
+def base_model(version):
+    parent = latest_version() if str(version).lower() == "latest" else parse_version(version)
+    path = MODEL_PATH if parent is None else resolve_model_path(parent)
+    return joblib.load(path), parent
+
+
+def row_keys(df: pd.DataFrame) -> pd.DataFrame:
+    keys = df[FEATURES + ["position"]].astype("int64")
+    return keys.assign(occurrence=keys.groupby(list(keys.columns)).cumcount())
+
+
+def holdout_mask(df: pd.DataFrame, holdout: pd.DataFrame) -> pd.Series:
+    keys = pd.MultiIndex.from_frame(row_keys(df))
+    return pd.Series(keys.isin(pd.MultiIndex.from_frame(holdout[HOLDOUT_KEY].astype("int64"))), index=df.index)
+
+
+def training_frame(with_features: bool = False) -> tuple[pd.DataFrame, list[str]]:
+    if with_features:
+        from encoders import EncoderSet
+        from feature_store import FEATURE_COLUMNS, training_frame as feature_frame
+
+        return feature_frame(EncoderSet.load()), FEATURES + FEATURE_COLUMNS
+    return pd.read_csv(CLEANED_PATH), FEATURES
+
+
+def split_rows(df: pd.DataFrame, features: list[str], holdout: pd.DataFrame | None = None):
+    X, y = df[features], df["position"]
+    if holdout is None:
+        return train_test_split(X, y, test_size=0.2, random_state=42)
+    test = holdout_mask(df, holdout)
+    if not test.any():
+        raise SystemExit("❌ None of the held-out rows are in the current data")
+    return X[~test], X[test], y[~test], y[test]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train (or warm-start update) the qualifying model")
+    parser.add_argument("--update", action="store_true", help="Add trees to an existing model instead of retraining")
+    parser.add_argument("--from-version", default="latest",
+                        help='Model to update: registry version, "latest" (default) or falls back to ' + MODEL_PATH)
+    parser.add_argument("--add-trees", type=int, default=20, help="Trees added by --update")
+    parser.add_argument("--since-year", type=int, help="With --update: fit the new trees on rows from this year on")
+    parser.add_argument("--n-estimators", type=int, default=100, help="Forest size for a full retrain")
+    parser.add_argument("--with-features", action="store_true",
+                        help="Add the feature store's columns (points, form, teammate gap, circuit history)")
+    parser.add_argument("--artifacts", action="store_true",
+                        help="Also write compressed / flat memory-mapped / depth-capped variants (model_artifacts.py)")
+    args = parser.parse_args(argv)
+
+    # Load cleaned data
+    with span("train.load", with_features=args.with_features):
+        df, features = training_frame(args.with_features)
+
+    parent_mae = None
+    if args.update:
+        model, parent = base_model(args.from_version)
+        label = version_name(parent) if parent else MODEL_PATH
+        trained_on = list(getattr(model, "feature_names_in_", features))
+        if trained_on != features:
+            raise SystemExit(f"❌ {label} was trained on {', '.join(trained_on)}; it can't be updated with "
+                             f"{', '.join(features)}. Match its --with-features setting or do a full retrain.")
+
+        # Evaluate on the rows the base model was evaluated on, so it never saw any of them
+        holdout = read_holdout(parent) if parent else None
+        if holdout is None:
+            print(f"⚠️ {label} has no recorded held-out rows: the test split may overlap its training rows")
+        X_train, X_test, y_train, y_test = split_rows(df, features, holdout)
+        parent_mae = mean_absolute_error(y_test, model.predict(X_test))
+
+        # Warm start keeps every existing tree and only grows the extra ones
+        model.set_params(warm_start=True, n_estimators=model.n_estimators + args.add_trees)
+        if args.since_year is not None:
+            recent = X_train['year'] >= args.since_year
+            X_fit, y_fit = X_train[recent], y_train[recent]
+        else:
+            X_fit, y_fit = X_train, y_train
+        if X_fit.empty:
+            raise SystemExit(f"❌ No training rows from {args.since_year} onwards")
+        print(f"🔁 Updating {label}: "
+              f"+{args.add_trees} trees on {len(X_fit)} rows")
+    else:
+        # Split data
+        X_train, X_test, y_train, y_test = split_rows(df, features)
+        # Train model
+        model = RandomForestRegressor(n_estimators=args.n_estimators, random_state=42)
+        parent, X_fit, y_fit = None, X_train, y_train
+
+    start = time.perf_counter()
+    with span("train.fit", rows=len(X_fit), trees=model.n_estimators):
+        model.fit(X_fit, y_fit)
+    fit_seconds = time.perf_counter() - start
+    model.set_params(warm_start=False)
+
+    # Evaluate
+    with span("train.evaluate", rows=len(X_test)):
+        y_pred = model.predict(X_test)
+    mae = mean_absolute_error(y_test, y_pred)
+    print(f"\n📊 Mean Absolute Error on Test Set: {mae:.2f}")
+    if parent_mae is not None:
+        print(f"   (before the update, same {len(X_test)} rows: {parent_mae:.2f})")
 
-# Define features and target
-X = df[['driver_name', 'constructor_name', 'circuitId', 'year']]
-y = df['position']
+    # Register and save model
+    with span("train.save"):
+        version = register(model, {
+            "mode": "update" if args.update else "full",
+            "parent": parent,
+            "n_estimators": model.n_estimators,
+            "rows": len(X_fit),
+            "total_rows": len(df),
+            "since_year": args.since_year if args.update else None,
+            "data_version": data_version(CLEANED_PATH),
+            "features": features,
+            "mae": round(float(mae), 4),
+            "parent_mae": None if parent_mae is None else round(float(parent_mae), 4),
+            "test_rows": len(X_test),
+            "fit_seconds": round(fit_seconds, 3),
+        }, holdout=row_keys(df).loc[X_test.index])
+        # Copied from the registry via a temp file + rename, so the server never reads a half-written pickle
+        promote(version)
+    print(f"✅ Model saved to {MODEL_PATH} (registered as {version_name(version)})")
 
-# Split data
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    if args.artifacts:
+        from model_artifacts import ARTIFACT_DIR, write_artifacts
 
-# Train model
-model = RandomForestRegressor(n_estimators=100, random_state=42)
-model.fit(X_train, y_train)
+        report = write_artifacts(model, split=(X_train, X_test, y_train, y_test))
+        print(report.drop(columns="path").to_string(index=False))
+        print(f"✅ Artifacts written to {ARTIFACT_DIR}/")
 
-# Evaluate
-y_pred = model.predict(X_test)
-mae = mean_absolute_error(y_test, y_pred)
-print(f"\n📊 Mean Absolute Error on Test Set: {mae:.2f}")
 
-# Save model
-joblib.dump(model, "model/qualifying_model.pkl")
-print("✅ Model saved to model/qualifying_model.pkl")
+if __name__ == "__main__":
+    main()
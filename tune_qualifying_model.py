@@ -0,0 +1,232 @@
+#This file searches RandomForest hyperparameters for the qualifying model in parallel across all CPU cores.
+#Usage: python tune_qualifying_model.py [--folds 5 --jobs 8] [--task classification] [--save-best]
+
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+
+import joblib
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+from sklearn.metrics import accuracy_score, mean_absolute_error
+from sklearn.model_selection import KFold, ParameterGrid, train_test_split
+
+from data_cache import source_fingerprint
+from instrumentation import span
+from qualifying_predictor import FEATURES, MODEL_PATH
+
+CLEANED_PATH = "model/cleaned_qualifying.csv"
+FEATURE_CACHE = "model/cache/features.npz"
+REPORT_PATH = "model/tuning_report.csv"
+
+DEFAULT_GRID = {
+    "n_estimators": [100, 200],
+    "max_depth": [None, 12, 20],
+    "min_samples_leaf": [1, 3],
+    "max_features": [1.0, "sqrt"],
+}
+
+# Rows in one predict call when measuring latency (one grid of drivers, like predict_qualifying.py)
+LATENCY_BATCH = 20
+LATENCY_REPEAT = 5
+
+
+# ================================
+# Feature matrix (read once, cached)
+# ================================
+def load_features(path: str = CLEANED_PATH, cache_path: str = FEATURE_CACHE) -> tuple[np.ndarray, np.ndarray]:
+    fingerprint = json.dumps(source_fingerprint(path), sort_keys=True)
+    if os.path.exists(cache_path):
+        with np.load(cache_path) as cached:
+            if str(cached["fingerprint"]) == fingerprint:
+                return cached["X"], cached["y"]
+
+    df = pd.read_csv(path)
+    X = np.ascontiguousarray(df[FEATURES].to_numpy(dtype=np.float32))
+    y = df["position"].to_numpy(dtype=np.float64)
+
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    tmp = cache_path + ".tmp.npz"
+    np.savez(tmp, X=X, y=y, fingerprint=np.array(fingerprint))
+    os.replace(tmp, cache_path)
+    return X, y
+
+
+def target_for(task: str, y: np.ndarray) -> np.ndarray:
+    if task == "classification":
+        # Same classes as qualifying_model.py: positions 1–10 stay, the rest become 11
+        return np.minimum(y.astype(int), 11)
+    return y
+
+
+def make_splits(y: np.ndarray, folds: int) -> list[tuple[np.ndarray, np.ndarray]]:
+    idx = np.arange(len(y))
+    if folds <= 1:
+        # The split train_qualifying_model.py reports its MAE on
+        train, test = train_test_split(idx, test_size=0.2, random_state=42)
+        return [(train, test)]
+    return list(KFold(n_splits=folds, shuffle=True, random_state=42).split(idx))
+
+
+# ================================
+# One candidate on one split
+# ================================
+def evaluate(task: str, params: dict, X: np.ndarray, y: np.ndarray, train: np.ndarray, test: np.ndarray) -> dict:
+    # n_jobs=1 inside: the parallelism is across candidates, so cores aren't oversubscribed
+    Model = RandomForestClassifier if task == "classification" else RandomForestRegressor
+    model = Model(random_state=42, n_jobs=1, **params)
+
+    start = time.perf_counter()
+    model.fit(X[train], y[train])
+    fit_seconds = time.perf_counter() - start
+
+    y_pred = model.predict(X[test])
+    batch = X[test[:LATENCY_BATCH]]
+    latencies = []
+    for _ in range(LATENCY_REPEAT):
+        start = time.perf_counter()
+        model.predict(batch)
+        latencies.append(time.perf_counter() - start)
+
+    result = {
+        "mae": mean_absolute_error(y[test], y_pred),
+        "fit_seconds": fit_seconds,
+        "predict_ms": statistics.median(latencies) * 1000,
+        "nodes": int(sum(est.tree_.node_count for est in model.estimators_)),
+    }
+    if task == "classification":
+        result["accuracy"] = accuracy_score(y[test], y_pred)
+    return result
+
+
+def summarize(candidates: list[dict], fold_results: list[list[dict]]) -> pd.DataFrame:
+    rows = []
+    for params, folds in zip(candidates, fold_results):
+        row = {k: ("None" if v is None else v) for k, v in params.items()}
+        maes = [f["mae"] for f in folds]
+        row["mae"] = round(statistics.mean(maes), 4)
+        row["mae_std"] = round(statistics.pstdev(maes), 4)
+        row["fit_seconds"] = round(statistics.mean(f["fit_seconds"] for f in folds), 3)
+        row["predict_ms"] = round(statistics.mean(f["predict_ms"] for f in folds), 3)
+        row["nodes"] = int(statistics.mean(f["nodes"] for f in folds))
+        if "accuracy" in folds[0]:
+            row["accuracy"] = round(statistics.mean(f["accuracy"] for f in folds), 4)
+        rows.append(row)
+    return pd.DataFrame(rows).sort_values(["mae", "fit_seconds"], kind="stable").reset_index(drop=True)
+
+
+def search(X: np.ndarray, y: np.ndarray, grid: dict, task: str = "regression", folds: int = 1, jobs: int = -1) -> pd.DataFrame:
+    y = target_for(task, y)
+    candidates = list(ParameterGrid(grid))
+    splits = make_splits(y, folds)
+
+    # One task per (candidate, split); joblib memmaps X/y so every worker reads the same matrix
+    tasks = [(c, s) for c in range(len(candidates)) for s in range(len(splits))]
+    results = Parallel(n_jobs=jobs)(
+        delayed(evaluate)(task, candidates[c], X, y, *splits[s]) for c, s in tasks
+    )
+
+    fold_results = [[] for _ in candidates]
+    for (c, _), result in zip(tasks, results):
+        fold_results[c].append(result)
+    return summarize(candidates, fold_results)
+
+
+def save_best(report: pd.DataFrame, grid: dict, X: np.ndarray, y: np.ndarray, task: str, path: str | None = None,
+              data_path: str = CLEANED_PATH) -> str:
+    # Refit the winner on the standard 80% split with named features, as train_qualifying_model.py would
+    params = {k: (None if report.loc[0, k] == "None" else report.loc[0, k]) for k in grid}
+    params = {k: (v.item() if hasattr(v, "item") else v) for k, v in params.items()}
+    Model = RandomForestClassifier if task == "classification" else RandomForestRegressor
+    X_df = pd.DataFrame(X, columns=FEATURES).astype({"year": "int64"})
+    train, test = make_splits(y, 1)[0]
+    start = time.perf_counter()
+    model = Model(random_state=42, **params).fit(X_df.iloc[train], target_for(task, y)[train])
+    fit_seconds = time.perf_counter() - start
+
+    if task == "classification":
+        # Not a drop-in for the regressor every predictor loads, so only ever written to the path asked for
+        tmp = path + ".tmp"
+        joblib.dump(model, tmp)
+        os.replace(tmp, path)
+        print(f"✅ Best classifier ({params}) saved to {path}")
+        return path
+
+    # Regressors are registered like any training run, then copied over the default model (or `path`)
+    from model_registry import data_version, promote, register, version_name
+    from train_qualifying_model import row_keys
+
+    mae = mean_absolute_error(y[test], model.predict(X_df.iloc[test]))
+    version = register(model, {
+        "mode": "tuned",
+        "parent": None,
+        "n_estimators": model.n_estimators,
+        "rows": len(train),
+        "total_rows": len(y),
+        "since_year": None,
+        "data_version": data_version(data_path),
+        "features": FEATURES,
+        "mae": round(float(mae), 4),
+        "parent_mae": None,
+        "test_rows": len(test),
+        "fit_seconds": round(fit_seconds, 3),
+        "params": params,
+    }, holdout=row_keys(X_df.assign(position=y)).iloc[test])
+    path = path or MODEL_PATH
+    promote(version, model_path=path)
+    print(f"✅ Best model ({params}) saved to {path} (registered as {version_name(version)})")
+    return path
+
+
+def write_report(report: pd.DataFrame, path: str) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    if path.endswith(".json"):
+        report.to_json(path, orient="records", indent=2)
+    else:
+        report.to_csv(path, index=False)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Parallel hyperparameter search for the qualifying model")
+    parser.add_argument("--task", choices=["regression", "classification"], default="regression")
+    parser.add_argument("--grid", type=json.loads, help="JSON dict of parameter lists (default: built-in grid)")
+    parser.add_argument("--folds", type=int, default=1, help="1 = the usual 80/20 split, >1 = K-fold")
+    parser.add_argument("--jobs", type=int, default=-1, help="Parallel workers (-1 = all cores)")
+    parser.add_argument("--data", default=CLEANED_PATH)
+    parser.add_argument("--report", default=REPORT_PATH, help=".csv or .json")
+    parser.add_argument("--save-best", nargs="?", const=True, metavar="PATH",
+                        help=f"Refit the best candidate, register it and save it (default path: {MODEL_PATH}); "
+                             "classifiers need an explicit PATH and are not registered")
+    args = parser.parse_args(argv)
+    if args.task == "classification" and args.save_best and (
+            args.save_best is True or os.path.abspath(args.save_best) == os.path.abspath(MODEL_PATH)):
+        parser.error(f"--task classification --save-best needs a PATH other than {MODEL_PATH}: "
+                     "predictors load that file as the position regressor")
+
+    grid = args.grid or DEFAULT_GRID
+    with span("tune.load_features"):
+        X, y = load_features(args.data)
+    n_candidates = len(ParameterGrid(grid))
+    print(f"🔎 {n_candidates} candidate(s) × {max(args.folds, 1)} split(s) on {len(y)} rows")
+
+    start = time.perf_counter()
+    with span("tune.search", candidates=n_candidates, folds=args.folds, jobs=args.jobs):
+        report = search(X, y, grid, task=args.task, folds=args.folds, jobs=args.jobs)
+    print(report.to_string(index=False))
+    print(f"\n⏱️ Search took {time.perf_counter() - start:.1f}s")
+
+    write_report(report, args.report)
+    print(f"✅ Report saved to {args.report}")
+
+    if args.save_best:
+        save_best(report, grid, X, y, args.task, None if args.save_best is True else args.save_best, args.data)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())